@@ -1,6 +1,9 @@
-from ._async.base import AsyncByteStream, AsyncHTTPTransport
-from ._async.connection_pool import AsyncConnectionPool
-from ._async.http_proxy import AsyncHTTPProxy
+import importlib
+import sys
+from typing import TYPE_CHECKING, Any, List
+
+from ._config import CoalescingSettings, HedgingSettings, HTTP2Settings
+from ._eventlog import ConnectionEvent, EventLog
 from ._exceptions import (
     CloseError,
     ConnectError,
@@ -11,23 +14,80 @@ from ._exceptions import (
     ProxyError,
     ReadError,
     ReadTimeout,
+    ResponseTooLarge,
     TimeoutException,
     WriteError,
     WriteTimeout,
 )
-from ._sync.base import SyncByteStream, SyncHTTPTransport
-from ._sync.connection_pool import SyncConnectionPool
-from ._sync.http_proxy import SyncHTTPProxy
+from ._latency import Histogram, LatencyHistograms
+from ._profiling import Profiler
+
+# The async and sync halves of the package are only imported once one of
+# their classes is first accessed, so that `import httpcore` stays cheap.
+_LAZY_IMPORTS = {
+    "AsyncByteStream": "._async.base",
+    "AsyncFileByteStream": "._async.base",
+    "AsyncHTTPTransport": "._async.base",
+    "AsyncConnectionPool": "._async.connection_pool",
+    "AsyncHTTPProxy": "._async.http_proxy",
+    "AsyncCacheTransport": "._async.cache",
+    "SyncByteStream": "._sync.base",
+    "SyncFileByteStream": "._sync.base",
+    "SyncHTTPTransport": "._sync.base",
+    "SyncConnectionPool": "._sync.connection_pool",
+    "SyncHTTPProxy": "._sync.http_proxy",
+    "SyncCacheTransport": "._sync.cache",
+    "RequestTemplate": "._templates",
+    "CacheStorage": "._cache",
+    "CachedResponse": "._cache",
+    "InMemoryCache": "._cache",
+    "FileCache": "._cache",
+}
+
+if TYPE_CHECKING or sys.version_info < (3, 7):  # pragma: nocover
+    # Module level `__getattr__` is not supported on Python 3.6.
+    from ._async.base import AsyncByteStream, AsyncFileByteStream, AsyncHTTPTransport
+    from ._async.cache import AsyncCacheTransport
+    from ._async.connection_pool import AsyncConnectionPool
+    from ._async.http_proxy import AsyncHTTPProxy
+    from ._cache import CachedResponse, CacheStorage, FileCache, InMemoryCache
+    from ._sync.base import SyncByteStream, SyncFileByteStream, SyncHTTPTransport
+    from ._sync.cache import SyncCacheTransport
+    from ._sync.connection_pool import SyncConnectionPool
+    from ._sync.http_proxy import SyncHTTPProxy
+    from ._templates import RequestTemplate
+else:
+
+    def __getattr__(name: str) -> Any:
+        module_name = _LAZY_IMPORTS.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        globals()[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "AsyncHTTPTransport",
     "AsyncByteStream",
+    "AsyncFileByteStream",
     "AsyncConnectionPool",
     "AsyncHTTPProxy",
+    "AsyncCacheTransport",
     "SyncHTTPTransport",
     "SyncByteStream",
+    "SyncFileByteStream",
     "SyncConnectionPool",
     "SyncHTTPProxy",
+    "SyncCacheTransport",
+    "RequestTemplate",
+    "CacheStorage",
+    "CachedResponse",
+    "InMemoryCache",
+    "FileCache",
     "TimeoutException",
     "PoolTimeout",
     "ConnectTimeout",
@@ -38,5 +98,14 @@ __all__ = [
     "ReadError",
     "WriteError",
     "CloseError",
+    "ResponseTooLarge",
+    "Profiler",
+    "Histogram",
+    "LatencyHistograms",
+    "EventLog",
+    "ConnectionEvent",
+    "HTTP2Settings",
+    "CoalescingSettings",
+    "HedgingSettings",
 ]
 __version__ = "0.7.0"
@@ -0,0 +1,165 @@
+import time
+from typing import AsyncIterator, List, Tuple, Union
+
+from .._cache import (
+    CachedResponse,
+    CacheStorage,
+    InMemoryCache,
+    cache_key,
+    conditional_headers,
+    get_header,
+    is_fresh,
+    is_storable,
+    parse_cache_control,
+    update_headers,
+    vary_values,
+)
+from .._types import URL, Headers, TimeoutDict
+from .base import AsyncByteStream, AsyncHTTPTransport
+from .connection_pool import read_up_to
+
+SAFE_METHODS = {b"GET", b"HEAD", b"OPTIONS", b"TRACE"}
+CACHED_CHUNK_SIZE = 65536
+
+
+async def iter_content(
+    content: Union[bytes, memoryview], chunk_size: int
+) -> AsyncIterator[bytes]:
+    for offset in range(0, len(content), chunk_size):
+        yield bytes(content[offset : offset + chunk_size])
+
+
+class AsyncCacheTransport(AsyncHTTPTransport):
+    """
+    Wraps another transport, such as a connection pool, and caches its
+    responses to `GET` requests as a private cache, following RFC 7234.
+
+    Fresh responses are served from the cache. Stale responses with an `ETag`
+    or `Last-Modified` header are revalidated with a conditional request, and
+    served from the cache if the server responds with `304 Not Modified`. The
+    `Cache-Control` directives of both requests and responses are honoured,
+    and successful unsafe requests, such as `POST`, invalidate any stored
+    response for their URL.
+
+    **Parameters:**
+
+    * **transport** - `AsyncHTTPTransport` - The transport to send requests
+    with, which is closed along with this one.
+    * **storage** - `Optional[CacheStorage]` - Where to store responses, such
+    as an `InMemoryCache` or a `FileCache`. Defaults to an `InMemoryCache`.
+    * **max_body_size** - `int` - Larger responses are not stored.
+    """
+
+    def __init__(
+        self,
+        transport: AsyncHTTPTransport,
+        storage: CacheStorage = None,
+        max_body_size: int = 2 ** 24,
+    ) -> None:
+        self.transport = transport
+        self.storage = InMemoryCache() if storage is None else storage
+        self.max_body_size = max_body_size
+
+    async def request(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Headers = None,
+        stream: AsyncByteStream = None,
+        timeout: TimeoutDict = None,
+    ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]], AsyncByteStream]:
+        headers = [] if headers is None else headers
+        key = cache_key(url)
+
+        if method != b"GET":
+            response = await self.transport.request(
+                method, url, headers, stream, timeout
+            )
+            if method not in SAFE_METHODS and 200 <= response[1] < 400:
+                # https://tools.ietf.org/html/rfc7234#section-4.4
+                self.storage.delete(key)
+            return response
+
+        request_cache_control = parse_cache_control(headers)
+        if not request_cache_control and get_header(headers, b"pragma") == b"no-cache":
+            request_cache_control = {b"no-cache": None}
+        if b"no-store" in request_cache_control:
+            return await self.transport.request(method, url, headers, stream, timeout)
+
+        now = time.time()
+        cached = self.storage.get(key)
+        if cached is not None and not cached.matches(headers):
+            cached.close()
+            cached = None
+
+        if cached is not None and is_fresh(cached, request_cache_control, now):
+            return self._cached_response(cached, now)
+
+        if b"only-if-cached" in request_cache_control:
+            if cached is not None:
+                cached.close()
+            headers = [(b"content-length", b"0")]
+            return (b"HTTP/1.1", 504, b"Gateway Timeout", headers, AsyncByteStream())
+
+        request_headers = headers
+        if cached is not None:
+            request_headers = headers + conditional_headers(cached)
+        try:
+            response = await self.transport.request(
+                method, url, request_headers, stream, timeout
+            )
+        except BaseException:
+            if cached is not None:
+                cached.close()
+            raise
+
+        if cached is not None:
+            if response[1] == 304:
+                await response[4].aread()
+                cached = CachedResponse(
+                    cached.http_version,
+                    cached.status_code,
+                    cached.reason_phrase,
+                    update_headers(cached.headers, response[3]),
+                    cached.content,
+                    cached.vary,
+                    stored_at=now,
+                    close_func=cached.close_func,
+                )
+                self.storage.set(key, cached)
+                return self._cached_response(cached, now)
+            cached.close()
+
+        if not is_storable(headers, response[1], response[3]):
+            return response
+        vary = vary_values(headers, response[3])
+        if vary is None:
+            return response
+
+        content, body = await read_up_to(response, self.max_body_size)
+        if content is not None:
+            cached = CachedResponse(
+                response[0], response[1], response[2], response[3], content, vary, now
+            )
+            self.storage.set(key, cached)
+        return response[0], response[1], response[2], response[3], body
+
+    def _cached_response(
+        self, cached: CachedResponse, now: float
+    ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]], AsyncByteStream]:
+        # https://tools.ietf.org/html/rfc7234#section-5.1
+        headers = [(k, v) for k, v in cached.headers if k.lower() != b"age"]
+        headers.append((b"age", b"%d" % cached.age(now)))
+
+        async def close() -> None:
+            cached.close()
+
+        stream = AsyncByteStream(
+            iterator=iter_content(cached.content, CACHED_CHUNK_SIZE), close_func=close
+        )
+        status_code, reason_phrase = cached.status_code, cached.reason_phrase
+        return cached.http_version, status_code, reason_phrase, headers, stream
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        self.storage.close()
@@ -1,15 +1,25 @@
 from http import HTTPStatus
 from ssl import SSLContext
-from typing import AsyncIterator, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import h2.connection
 import h2.events
 from h2.config import H2Configuration
-from h2.exceptions import NoAvailableStreamIDError
+from h2.errors import ErrorCodes
+from h2.exceptions import NoAvailableStreamIDError, StreamClosedError
 from h2.settings import SettingCodes, Settings
 
-from .._backends.auto import AsyncLock, AsyncSocketStream, AutoBackend
-from .._exceptions import ProtocolError
+from .._backends.auto import AsyncEvent, AsyncLock, AsyncSocketStream, AutoBackend
+from .._config import HTTP2Settings
+from .._exceptions import (
+    NetworkError,
+    ProtocolError,
+    ReadError,
+    ReadTimeout,
+    TimeoutException,
+)
+from .._templates import PreparedHeaders
+from .._threadlock import ThreadLock
 from .._types import URL, Headers, TimeoutDict
 from .base import (
     AsyncByteStream,
@@ -26,7 +36,111 @@ def get_reason_phrase(status_code: int) -> bytes:
         return b""
 
 
+def get_priority_weight(headers: Headers) -> Optional[int]:
+    """
+    Map the urgency of an RFC 9218 `Priority` request header onto an HTTP/2
+    stream weight, from 128 for `u=0` down to 1 for `u=7`. The default
+    urgency of 3 maps onto the default weight of 16.
+    """
+    for key, value in headers:
+        if key == b"priority":
+            for param in value.split(b","):
+                name, _, urgency = param.strip().partition(b"=")
+                if name == b"u" and urgency.isdigit() and int(urgency) <= 7:
+                    return 1 << (7 - int(urgency))
+    return None
+
+
+def build_header_block(
+    method: bytes, url: URL, headers: Headers
+) -> Tuple[Headers, bool, Optional[int]]:
+    """
+    Return the HTTP/2 header list for a request, including its pseudo-headers,
+    along with whether a body follows and the stream weight to send it with.
+    """
+    scheme, hostname, port, path = url
+    default_port = {b"http": 80, b"https": 443}.get(scheme)
+    authority = b"%s:%d" % (hostname, port) if port != default_port else hostname
+
+    headers = [(k.lower(), v) for (k, v) in headers]
+    seen_headers = set(key for key, value in headers)
+    has_body = b"content-length" in seen_headers or b"transfer-encoding" in seen_headers
+
+    header_block = [
+        (b":method", method),
+        (b":authority", authority),
+        (b":scheme", scheme),
+        (b":path", path),
+    ] + [(k, v) for k, v in headers if k not in (b"host", b"transfer-encoding")]
+    return (header_block, has_body, get_priority_weight(header_block))
+
+
+# The h2 versions whose private `_receive_goaway_frame()` is known to behave
+# as `GracefulH2Connection` expects.
+GRACEFUL_GOAWAY_H2_VERSIONS = ("3.", "4.")
+
+
+class GracefulH2Connection(h2.connection.H2Connection):
+    """
+    h2 treats any GOAWAY frame as closing the connection outright, and rejects
+    all further frames. A graceful GOAWAY still allows streams up to the
+    `last_stream_id` to complete, so we keep the connection open for them.
+
+    h2 has no public API for this, so only use it through
+    `create_h2_connection()`, which checks the h2 version.
+    """
+
+    def _receive_goaway_frame(self, frame: Any) -> Tuple[list, list]:
+        state = self.state_machine.state
+        frames, events = super()._receive_goaway_frame(frame)
+        if frame.error_code == ErrorCodes.NO_ERROR:
+            self.state_machine.state = state
+        return frames, events
+
+
+def create_h2_connection(config: H2Configuration) -> h2.connection.H2Connection:
+    """
+    Return a `GracefulH2Connection` if the installed h2 supports it, or else
+    a plain connection, on which any GOAWAY fails the unfinished streams.
+    """
+    if h2.__version__.startswith(GRACEFUL_GOAWAY_H2_VERSIONS) and hasattr(
+        h2.connection.H2Connection, "_receive_goaway_frame"
+    ):
+        return GracefulH2Connection(config=config)
+    return h2.connection.H2Connection(config=config)
+
+
 class AsyncHTTP2Connection(AsyncHTTPTransport):
+    __slots__ = (
+        "socket",
+        "ssl_context",
+        "settings",
+        "backend",
+        "h2_state",
+        "sent_connection_init",
+        "streams",
+        "events",
+        "unacknowledged_data",
+        "unacknowledged_stream_data",
+        "last_received",
+        "ping_count",
+        "ping_sent_at",
+        "rtt",
+        "goaway_last_stream_id",
+        "stream_weights",
+        "send_passes",
+        "send_waiters",
+        "send_virtual_time",
+        "send_reserved",
+        "is_sending",
+        "send_thread_lock",
+        "state_thread_lock",
+        "state",
+        "_initialization_lock",
+        "_read_lock",
+        "__dict__",
+    )
+
     READ_NUM_BYTES = 4096
     CONFIG = H2Configuration(validate_inbound_headers=False)
 
@@ -35,24 +149,54 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
         socket: AsyncSocketStream,
         backend: AutoBackend,
         ssl_context: SSLContext = None,
+        settings: HTTP2Settings = None,
     ):
         self.socket = socket
         self.ssl_context = SSLContext() if ssl_context is None else ssl_context
+        self.settings = HTTP2Settings() if settings is None else settings
 
         self.backend = backend
-        self.h2_state = h2.connection.H2Connection(config=self.CONFIG)
+        config = self.settings.h2_config
+        self.h2_state = create_h2_connection(
+            self.CONFIG if config is None else config
+        )
 
         self.sent_connection_init = False
         self.streams = {}  # type: Dict[int, AsyncHTTP2Stream]
         self.events = {}  # type: Dict[int, List[h2.events.Event]]
+        # Flow-controlled bytes that we've processed, but not yet returned to
+        # the server with a WINDOW_UPDATE, for the connection and per-stream.
+        self.unacknowledged_data = 0
+        self.unacknowledged_stream_data = {}  # type: Dict[int, int]
+        # Liveness checking. `rtt` is the most recently measured round trip
+        # time for a PING, in seconds.
+        self.last_received = 0.0
+        self.ping_count = 0
+        self.ping_sent_at = None  # type: Optional[float]
+        self.rtt = None  # type: Optional[float]
+        # Set once the server has sent GOAWAY. No new streams may be opened.
+        self.goaway_last_stream_id = None  # type: Optional[int]
+        # Outgoing DATA frames are scheduled across streams by weight.
+        self.stream_weights = {}  # type: Dict[int, int]
+        self.send_passes = {}  # type: Dict[int, float]
+        self.send_waiters = {}  # type: Dict[int, AsyncEvent]
+        self.send_virtual_time = 0.0
+        self.send_reserved = None  # type: Optional[int]
+        self.is_sending = False
+        self.send_thread_lock = ThreadLock()
+        # The h2 state is not thread-safe, so updates to it, and the writes of
+        # the frames that they produce, are serialized across threads.
+        self.state_thread_lock = ThreadLock()
 
         self.state = ConnectionState.ACTIVE
+        self._initialization_lock = None  # type: Optional[AsyncLock]
+        self._read_lock = None  # type: Optional[AsyncLock]
 
     @property
     def init_lock(self) -> AsyncLock:
         # We do this lazily, to make sure backend autodetection always
         # runs within an async context.
-        if not hasattr(self, "_initialization_lock"):
+        if self._initialization_lock is None:
             self._initialization_lock = self.backend.create_lock()
         return self._initialization_lock
 
@@ -60,7 +204,7 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
     def read_lock(self) -> AsyncLock:
         # We do this lazily, to make sure backend autodetection always
         # runs within an async context.
-        if not hasattr(self, "_read_lock"):
+        if self._read_lock is None:
             self._read_lock = self.backend.create_lock()
         return self._read_lock
 
@@ -88,6 +232,19 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
                 await self.send_connection_init(timeout)
                 self.sent_connection_init = True
 
+            if self.needs_liveness_check():
+                try:
+                    await self.ping(timeout)
+                except (NetworkError, TimeoutException):
+                    await self.aclose()
+                    raise NewConnectionRequired()
+
+            # Checked after any PING, which may have delivered a GOAWAY.
+            if self.goaway_last_stream_id is not None:
+                if not self.streams:
+                    await self.aclose()
+                raise NewConnectionRequired()
+
             try:
                 stream_id = self.h2_state.get_next_available_stream_id()
             except NoAvailableStreamIDError:
@@ -96,10 +253,13 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
             else:
                 self.state = ConnectionState.ACTIVE
 
-        h2_stream = AsyncHTTP2Stream(stream_id=stream_id, connection=self)
-        self.streams[stream_id] = h2_stream
-        self.events[stream_id] = []
-        return await h2_stream.request(method, url, headers, stream, timeout)
+            h2_stream = AsyncHTTP2Stream(stream_id=stream_id, connection=self)
+            self.streams[stream_id] = h2_stream
+            self.events[stream_id] = []
+            # Streams must be opened in the order that their IDs were allocated.
+            has_body = await h2_stream.send_headers(method, url, headers, timeout)
+
+        return await h2_stream.request(has_body, stream, timeout)
 
     async def send_connection_init(self, timeout: TimeoutDict) -> None:
         """
@@ -115,9 +275,14 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
                 # Disable PUSH_PROMISE frames from the server since we don't do anything
                 # with them for now.  Maybe when we support caching?
                 SettingCodes.ENABLE_PUSH: 0,
-                # These two are taken from h2 for safe defaults
-                SettingCodes.MAX_CONCURRENT_STREAMS: 100,
-                SettingCodes.MAX_HEADER_LIST_SIZE: 65536,
+                # The defaults for these are taken from h2.
+                SettingCodes.MAX_CONCURRENT_STREAMS: (
+                    self.settings.max_concurrent_streams
+                ),
+                SettingCodes.MAX_HEADER_LIST_SIZE: self.settings.max_header_list_size,
+                SettingCodes.HEADER_TABLE_SIZE: self.settings.header_table_size,
+                SettingCodes.MAX_FRAME_SIZE: self.settings.max_frame_size,
+                SettingCodes.INITIAL_WINDOW_SIZE: self.settings.stream_window_size,
             },
         )
 
@@ -128,10 +293,55 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
             h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL
         ]
 
+        # Initial values take effect immediately, rather than once they have
+        # been acknowledged, so apply the ones that h2 would otherwise only
+        # pick up from an acknowledged settings change.
+        self.h2_state.max_inbound_frame_size = self.settings.max_frame_size
+        self.h2_state.decoder.max_header_list_size = self.settings.max_header_list_size
+        self.h2_state.decoder.max_allowed_table_size = self.settings.header_table_size
+
         self.h2_state.initiate_connection()
-        self.h2_state.increment_flow_control_window(2 ** 24)
+        # The connection window always starts at the protocol default.
+        increment = self.settings.connection_window_size - 65535
+        if increment:
+            self.h2_state.increment_flow_control_window(increment)
         data_to_send = self.h2_state.data_to_send()
         await self.socket.write(data_to_send, timeout)
+        self.last_received = self.backend.time()
+
+    def needs_liveness_check(self) -> bool:
+        """
+        Returns `True` if this is an idle connection that we've not heard
+        from for long enough that it should be checked before reuse.
+        """
+        ping_interval = self.settings.ping_interval
+        return (
+            ping_interval is not None
+            and not self.streams
+            and self.backend.time() - self.last_received >= ping_interval
+        )
+
+    async def ping(self, timeout: TimeoutDict) -> Optional[float]:
+        """
+        Send a PING frame and wait for it to be acknowledged, returning the
+        measured round trip time in seconds.
+        """
+        timeout = dict(timeout, read=self.settings.ping_timeout)
+        async with self.read_lock:
+            await self.send_ping(timeout)
+            while self.ping_sent_at is not None:
+                await self.receive_events(timeout)
+        return self.rtt
+
+    async def send_ping(self, timeout: TimeoutDict) -> None:
+        if self.ping_sent_at is not None:
+            return
+        self.ping_count += 1
+        self.ping_sent_at = self.backend.time()
+        async with self.state_thread_lock:
+            self.h2_state.ping(self.ping_count.to_bytes(8, "big"))
+            data_to_send = self.h2_state.data_to_send()
+            await self.socket.write(data_to_send, timeout)
 
     @property
     def is_closed(self) -> bool:
@@ -153,15 +363,42 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
         WindowUpdated frames have increased the flow rate.
         https://tools.ietf.org/html/rfc7540#section-6.9
         """
+        while not self.is_upload_rejected(stream_id):
+            flow = self.outgoing_flow(stream_id)
+            if flow:
+                return flow
+            if self.events[stream_id] and isinstance(
+                self.events[stream_id][-1], h2.events.ConnectionTerminated
+            ):
+                # The connection is going away before we could send the body.
+                raise ProtocolError(self.events[stream_id][-1])
+            # Only one stream reads from the network at a time, and any other
+            # stream may have received the WINDOW_UPDATE we were waiting for.
+            async with self.read_lock:
+                if not self.is_upload_rejected(stream_id) and (
+                    self.outgoing_flow(stream_id) == 0
+                ):
+                    await self.receive_events(timeout)
+        return 0
+
+    def is_upload_rejected(self, stream_id: int) -> bool:
+        """
+        Return `True` if the server has already responded with an error, or
+        reset the stream, so the rest of the request body should not be sent.
+        https://tools.ietf.org/html/rfc7540#section-8.1
+        """
+        for event in self.events[stream_id]:
+            if isinstance(event, h2.events.StreamReset):
+                return True
+            elif isinstance(event, h2.events.ResponseReceived):
+                status_code = dict(event.headers).get(b":status", b"200")
+                return int(status_code.decode("ascii", errors="ignore")) >= 400
+        return False
+
+    def outgoing_flow(self, stream_id: int) -> int:
         local_flow = self.h2_state.local_flow_control_window(stream_id)
         connection_flow = self.h2_state.max_outbound_frame_size
-        flow = min(local_flow, connection_flow)
-        while flow == 0:
-            await self.receive_events(timeout)
-            local_flow = self.h2_state.local_flow_control_window(stream_id)
-            connection_flow = self.h2_state.max_outbound_frame_size
-            flow = min(local_flow, connection_flow)
-        return flow
+        return min(local_flow, connection_flow)
 
     async def wait_for_event(
         self, stream_id: int, timeout: TimeoutDict
@@ -176,54 +413,281 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
                 await self.receive_events(timeout)
         return self.events[stream_id].pop(0)
 
+    async def receive_available_events(self, timeout: TimeoutDict) -> None:
+        """
+        Process any data that has already arrived on the network, without
+        waiting for more.
+        """
+        if self.read_lock.locked():
+            # Another stream is reading from the network, and will receive any
+            # events for this one too.
+            return
+        async with self.read_lock:
+            data = await self.socket.read_available(self.READ_NUM_BYTES)
+            if data is not None:
+                await self.receive_data(data, timeout)
+
     async def receive_events(self, timeout: TimeoutDict) -> None:
         """
         Read some data from the network, and update the H2 state.
         """
-        data = await self.socket.read(self.READ_NUM_BYTES, timeout)
-        events = self.h2_state.receive_data(data)
-        for event in events:
-            event_stream_id = getattr(event, "stream_id", 0)
+        if self.settings.ping_interval is None:
+            data = await self.socket.read(self.READ_NUM_BYTES, timeout)
+        else:
+            data = await self.read_with_liveness_check(timeout)
+        await self.receive_data(data, timeout)
 
-            if hasattr(event, "error_code"):
-                raise ProtocolError(event)
+    async def receive_data(self, data: bytes, timeout: TimeoutDict) -> None:
+        """
+        Update the H2 state with data received from the network.
+        """
+        self.last_received = self.backend.time()
+
+        async with self.state_thread_lock:
+            events = self.h2_state.receive_data(data)
+            for event in events:
+                event_stream_id = getattr(event, "stream_id", 0)
+
+                if isinstance(event, h2.events.ConnectionTerminated):
+                    self.receive_goaway(event)
+                    continue
+
+                if (
+                    isinstance(event, h2.events.StreamReset)
+                    and event.error_code == ErrorCodes.NO_ERROR
+                ):
+                    # The server may reset the stream once it has sent a complete
+                    # response, rather than read the rest of the request body.
+                    if event_stream_id in self.events:
+                        self.events[event_stream_id].append(event)
+                    continue
+
+                if hasattr(event, "error_code"):
+                    raise ProtocolError(event)
+
+                if isinstance(event, h2.events.PingAckReceived):
+                    if event.ping_data == self.ping_count.to_bytes(8, "big"):
+                        assert self.ping_sent_at is not None
+                        self.rtt = self.last_received - self.ping_sent_at
+                        self.ping_sent_at = None
+                elif event_stream_id in self.events:
+                    self.events[event_stream_id].append(event)
+
+            data_to_send = self.h2_state.data_to_send()
+            await self.socket.write(data_to_send, timeout)
+
+    def receive_goaway(self, event: h2.events.ConnectionTerminated) -> None:
+        """
+        Stop accepting new streams, and pass the event to any streams that
+        will not be completed: those that the server never processed, or
+        all of them if the connection was not shut down gracefully, or h2
+        will not keep it open.
+        https://tools.ietf.org/html/rfc7540#section-6.8
+        """
+        self.goaway_last_stream_id = event.last_stream_id
+        if self.state != ConnectionState.CLOSED:
+            self.state = ConnectionState.FULL
+        is_graceful = event.error_code == ErrorCodes.NO_ERROR and isinstance(
+            self.h2_state, GracefulH2Connection
+        )
+        for stream_id, events in self.events.items():
+            if stream_id > event.last_stream_id or not is_graceful:
+                events.append(event)
 
-            if event_stream_id in self.events:
-                self.events[event_stream_id].append(event)
+    async def read_with_liveness_check(self, timeout: TimeoutDict) -> bytes:
+        """
+        Read from the network, sending a PING once nothing has been received
+        for `ping_interval` seconds, and failing the connection if it is not
+        acknowledged within `ping_timeout` seconds. A dropped connection is
+        then detected long before the read timeout of any waiting streams.
+        """
+        assert self.settings.ping_interval is not None
+        read_timeout = timeout.get("read")
+        now = self.backend.time()
+        deadline = None if read_timeout is None else now + read_timeout
 
-        data_to_send = self.h2_state.data_to_send()
-        await self.socket.write(data_to_send, timeout)
+        while True:
+            if self.ping_sent_at is None:
+                wait = self.last_received + self.settings.ping_interval - now
+            else:
+                wait = self.ping_sent_at + self.settings.ping_timeout - now
+            if deadline is not None:
+                wait = min(wait, deadline - now)
+
+            try:
+                # Never a zero timeout, which would make sync sockets non-blocking.
+                read_timeouts = dict(timeout, read=max(wait, 0.001))
+                return await self.socket.read(self.READ_NUM_BYTES, read_timeouts)
+            except ReadTimeout:
+                now = self.backend.time()
+                if deadline is not None and now >= deadline:
+                    raise
+                if self.ping_sent_at is None:
+                    await self.send_ping(timeout)
+                elif now - self.ping_sent_at >= self.settings.ping_timeout:
+                    await self.aclose()
+                    raise ReadError("HTTP/2 PING was not acknowledged")
 
     async def send_headers(
-        self, stream_id: int, headers: Headers, end_stream: bool, timeout: TimeoutDict,
+        self,
+        stream_id: int,
+        headers: Headers,
+        end_stream: bool,
+        timeout: TimeoutDict,
+        weight: int = None,
     ) -> None:
-        self.h2_state.send_headers(stream_id, headers, end_stream=end_stream)
-        self.h2_state.increment_flow_control_window(2 ** 24, stream_id=stream_id)
-        data_to_send = self.h2_state.data_to_send()
-        await self.socket.write(data_to_send, timeout)
+        if weight is not None:
+            self.stream_weights[stream_id] = weight
+        async with self.state_thread_lock:
+            self.h2_state.send_headers(
+                stream_id, headers, end_stream=end_stream, priority_weight=weight
+            )
+            data_to_send = self.h2_state.data_to_send()
+            await self.socket.write(data_to_send, timeout)
+
+    async def send_data(self, stream_id: int, data: bytes, timeout: TimeoutDict) -> int:
+        """
+        Send a DATA frame with as much of `data` as flow control allows, once
+        it is this stream's turn, returning the number of bytes sent. Nothing
+        is sent once the server has rejected the upload.
+        """
+        while True:
+            chunk = b""
+            await self.acquire_send_turn(stream_id)
+            try:
+                if not self.h2_state.outbound_flow_control_window:
+                    # Every stream is waiting on the connection window, so keep
+                    # our turn, and the window goes to the highest priority.
+                    await self.wait_for_outgoing_flow(stream_id, timeout)
+                if self.is_upload_rejected(stream_id):
+                    return 0
+                chunk = data[: self.outgoing_flow(stream_id)]
+                if chunk:
+                    async with self.state_thread_lock:
+                        self.h2_state.send_data(stream_id, chunk)
+                        data_to_send = self.h2_state.data_to_send()
+                        await self.socket.write(data_to_send, timeout)
+            finally:
+                await self.release_send_turn(stream_id, len(chunk))
+            if chunk:
+                return len(chunk)
+            # Only this stream's window is used up. Let the others send.
+            await self.wait_for_outgoing_flow(stream_id, timeout)
+
+    async def acquire_send_turn(self, stream_id: int) -> None:
+        """
+        Wait until this stream may send a DATA frame. When several streams are
+        uploading, the next turn goes to the stream that has sent the least
+        data relative to its weight, so bandwidth is shared by weight.
+        """
+        while True:
+            async with self.send_thread_lock:
+                reserved = self.send_reserved
+                if not self.is_sending and (
+                    reserved is None
+                    or reserved == stream_id
+                    or self.send_pass(stream_id) < self.send_pass(reserved)
+                ):
+                    if reserved is not None or self.send_waiters:
+                        self.send_virtual_time = self.send_pass(stream_id)
+                    if reserved == stream_id:
+                        self.send_reserved = None
+                    self.is_sending = True
+                    return
+                if reserved == stream_id:
+                    # Another stream with a better claim took the turn first.
+                    self.send_reserved = None
+                event = self.backend.create_event()
+                self.send_waiters[stream_id] = event
 
-    async def send_data(
-        self, stream_id: int, chunk: bytes, timeout: TimeoutDict
-    ) -> None:
-        self.h2_state.send_data(stream_id, chunk)
-        data_to_send = self.h2_state.data_to_send()
-        await self.socket.write(data_to_send, timeout)
+            try:
+                await event.wait()
+            except BaseException:
+                async with self.send_thread_lock:
+                    self.send_waiters.pop(stream_id, None)
+                    if self.send_reserved == stream_id:
+                        self.send_reserved = None
+                        self.wake_next_sender()
+                raise
+
+    async def release_send_turn(self, stream_id: int, amount: int) -> None:
+        async with self.send_thread_lock:
+            weight = self.stream_weights.get(stream_id, 16)
+            self.send_passes[stream_id] = self.send_pass(stream_id) + amount / weight
+            self.is_sending = False
+            self.wake_next_sender()
+
+    def send_pass(self, stream_id: int) -> float:
+        return max(self.send_passes.get(stream_id, 0.0), self.send_virtual_time)
+
+    def wake_next_sender(self) -> None:
+        """
+        Reserve the next turn for the waiting stream with the lowest pass,
+        unless a reservation is already outstanding. The releasing stream may
+        still take the turn first, if it has the better claim.
+        """
+        if self.send_reserved is None and self.send_waiters:
+            next_stream_id = min(self.send_waiters, key=self.send_pass)
+            self.send_reserved = next_stream_id
+            self.send_waiters.pop(next_stream_id).set()
 
     async def end_stream(self, stream_id: int, timeout: TimeoutDict) -> None:
-        self.h2_state.end_stream(stream_id)
-        data_to_send = self.h2_state.data_to_send()
-        await self.socket.write(data_to_send, timeout)
+        async with self.state_thread_lock:
+            self.h2_state.end_stream(stream_id)
+            data_to_send = self.h2_state.data_to_send()
+            await self.socket.write(data_to_send, timeout)
 
     async def acknowledge_received_data(
         self, stream_id: int, amount: int, timeout: TimeoutDict
     ) -> None:
-        self.h2_state.acknowledge_received_data(amount, stream_id)
-        data_to_send = self.h2_state.data_to_send()
-        await self.socket.write(data_to_send, timeout)
+        """
+        Record that we've processed some received data, sending WINDOW_UPDATE
+        frames only once enough of the stream or connection window has been
+        consumed, rather than for every DATA frame.
+        """
+        ratio = self.settings.window_update_ratio
+
+        async with self.state_thread_lock:
+            stream_data = self.unacknowledged_stream_data.get(stream_id, 0) + amount
+            if stream_data >= self.settings.stream_window_size * ratio:
+                try:
+                    self.h2_state.increment_flow_control_window(
+                        stream_data, stream_id=stream_id
+                    )
+                except StreamClosedError:
+                    # No need to replenish the window of a finished stream.
+                    pass
+                stream_data = 0
+            self.unacknowledged_stream_data[stream_id] = stream_data
+
+            self.unacknowledged_data += amount
+            if self.unacknowledged_data >= self.settings.connection_window_size * ratio:
+                self.h2_state.increment_flow_control_window(self.unacknowledged_data)
+                self.unacknowledged_data = 0
+
+            data_to_send = self.h2_state.data_to_send()
+            if data_to_send:
+                await self.socket.write(data_to_send, timeout)
+
+    async def reset_stream(self, stream_id: int, timeout: TimeoutDict) -> None:
+        """
+        Cancel a stream which the server has not already closed.
+        """
+        async with self.state_thread_lock:
+            try:
+                self.h2_state.reset_stream(stream_id, error_code=ErrorCodes.CANCEL)
+            except StreamClosedError:
+                # The server has already reset the stream.
+                return
+            data_to_send = self.h2_state.data_to_send()
+            await self.socket.write(data_to_send, timeout)
 
     async def close_stream(self, stream_id: int) -> None:
         del self.streams[stream_id]
         del self.events[stream_id]
+        self.unacknowledged_stream_data.pop(stream_id, None)
+        self.stream_weights.pop(stream_id, None)
+        self.send_passes.pop(stream_id, None)
 
         if not self.streams:
             if self.state == ConnectionState.ACTIVE:
@@ -233,34 +697,49 @@ class AsyncHTTP2Connection(AsyncHTTPTransport):
 
 
 class AsyncHTTP2Stream:
+    __slots__ = ("stream_id", "connection", "upload_rejected")
+
     def __init__(self, stream_id: int, connection: AsyncHTTP2Connection) -> None:
         self.stream_id = stream_id
         self.connection = connection
+        # Set if the server responded before the request body was sent.
+        self.upload_rejected = False
 
-    async def request(
-        self,
-        method: bytes,
-        url: URL,
-        headers: Headers = None,
-        stream: AsyncByteStream = None,
-        timeout: TimeoutDict = None,
-    ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]], AsyncByteStream]:
-        headers = [] if headers is None else [(k.lower(), v) for (k, v) in headers]
-        stream = AsyncByteStream() if stream is None else stream
-        timeout = {} if timeout is None else timeout
+    async def send_headers(
+        self, method: bytes, url: URL, headers: Optional[Headers], timeout: TimeoutDict
+    ) -> bool:
+        """
+        Open the stream by sending the request headers, returning `True` if a
+        request body follows.
+        """
+        headers = [] if headers is None else headers
+        if isinstance(headers, PreparedHeaders):
+            if headers.h2_request is None or headers.h2_request[0] != (method, url):
+                headers.h2_request = ((method, url),) + build_header_block(
+                    method, url, headers
+                )
+            _key, header_block, has_body, weight = headers.h2_request
+        else:
+            header_block, has_body, weight = build_header_block(method, url, headers)
 
-        # Send the request.
-        seen_headers = set(key for key, value in headers)
-        has_body = (
-            b"content-length" in seen_headers or b"transfer-encoding" in seen_headers
+        await self.connection.send_headers(
+            self.stream_id, header_block, not has_body, timeout, weight=weight
         )
+        return has_body
 
-        await self.send_headers(method, url, headers, has_body, timeout)
+    async def request(
+        self, has_body: bool, stream: Optional[AsyncByteStream], timeout: TimeoutDict
+    ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]], AsyncByteStream]:
+        """
+        Send the request body, if any, once the headers have been sent, and
+        then receive the response.
+        """
+        stream = AsyncByteStream() if stream is None else stream
         if has_body:
             await self.send_body(stream, timeout)
 
         # Receive the response.
-        status_code, headers = await self.receive_response(timeout)
+        status_code, headers = await self.receive_response(has_body, timeout)
         reason_phrase = get_reason_phrase(status_code)
         stream = AsyncByteStream(
             iterator=self.body_iter(timeout), close_func=self._response_closed
@@ -268,42 +747,22 @@ class AsyncHTTP2Stream:
 
         return (b"HTTP/2", status_code, reason_phrase, headers, stream)
 
-    async def send_headers(
-        self,
-        method: bytes,
-        url: URL,
-        headers: Headers,
-        has_body: bool,
-        timeout: TimeoutDict,
-    ) -> None:
-        scheme, hostname, port, path = url
-        default_port = {b"http": 80, b"https": 443}.get(scheme)
-        authority = b"%s:%d" % (hostname, port) if port != default_port else hostname
-
-        headers = [
-            (b":method", method),
-            (b":authority", authority),
-            (b":scheme", scheme),
-            (b":path", path),
-        ] + [(k, v) for k, v in headers if k not in (b"host", b"transfer-encoding")]
-        end_stream = not has_body
-
-        await self.connection.send_headers(self.stream_id, headers, end_stream, timeout)
-
     async def send_body(self, stream: AsyncByteStream, timeout: TimeoutDict) -> None:
         async for data in stream:
+            if data:
+                await self.connection.receive_available_events(timeout)
             while data:
-                max_flow = await self.connection.wait_for_outgoing_flow(
-                    self.stream_id, timeout
-                )
-                chunk_size = min(len(data), max_flow)
-                chunk, data = data[:chunk_size], data[chunk_size:]
-                await self.connection.send_data(self.stream_id, chunk, timeout)
+                sent = await self.connection.send_data(self.stream_id, data, timeout)
+                if not sent:
+                    # The stream is reset once the response has been read.
+                    self.upload_rejected = True
+                    return
+                data = data[sent:]
 
         await self.connection.end_stream(self.stream_id, timeout)
 
     async def receive_response(
-        self, timeout: TimeoutDict
+        self, has_body: bool, timeout: TimeoutDict
     ) -> Tuple[int, List[Tuple[bytes, bytes]]]:
         """
         Read the response status and headers from the network.
@@ -312,6 +771,16 @@ class AsyncHTTP2Stream:
             event = await self.connection.wait_for_event(self.stream_id, timeout)
             if isinstance(event, h2.events.ResponseReceived):
                 break
+            elif isinstance(event, h2.events.StreamReset):
+                await self._response_closed()
+                raise ProtocolError(event)
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                await self._response_closed()
+                if self.stream_id > event.last_stream_id and not has_body:
+                    # The server never processed this request, so it can be
+                    # safely sent again on a new connection.
+                    raise NewConnectionRequired()
+                raise ProtocolError(event)
 
         status_code = 200
         headers = []
@@ -334,6 +803,11 @@ class AsyncHTTP2Stream:
                 yield event.data
             elif isinstance(event, (h2.events.StreamEnded, h2.events.StreamReset)):
                 break
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                raise ProtocolError(event)
 
     async def _response_closed(self) -> None:
+        if self.upload_rejected:
+            # Let the server know that the rest of the body will not be sent.
+            await self.connection.reset_stream(self.stream_id, {})
         await self.connection.close_stream(self.stream_id)
@@ -1,7 +1,10 @@
 from ssl import SSLContext
 from typing import Tuple
 
+from .._eventlog import EventLog
 from .._exceptions import ProxyError
+from .._latency import LatencyHistograms
+from .._profiling import Profiler
 from .._types import URL, Headers, Origin, TimeoutDict
 from .base import AsyncByteStream
 from .connection import AsyncHTTPConnection
@@ -27,6 +30,17 @@ class AsyncHTTPProxy(AsyncConnectionPool):
     * **max_keepalive** - `Optional[int]` - The maximum number of connections
     to allow before closing keep-alive connections.
     * **http2** - `bool` - Enable HTTP/2 support.
+    * **profiler** - `Optional[Profiler]` - Collect call counts and timings
+    for the transport hot paths.
+    * **latencies** - `Optional[LatencyHistograms]` - Record per-origin
+    connect, time-to-first-byte, and total request latencies. For tunnelled
+    requests, the connect latency includes the `CONNECT` request.
+    * **event_log** - `Optional[EventLog]` - Keep a bounded log of recent
+    connection events, for post-mortem debugging.
+
+    Connections through a proxy are always HTTP/1.1, so the `pipelining`,
+    `http2_prior_knowledge` and `http2_settings` options of
+    `AsyncConnectionPool` are not supported.
     """
 
     def __init__(
@@ -39,6 +53,9 @@ class AsyncHTTPProxy(AsyncConnectionPool):
         max_keepalive: int = None,
         keepalive_expiry: float = None,
         http2: bool = False,
+        profiler: Profiler = None,
+        latencies: LatencyHistograms = None,
+        event_log: EventLog = None,
     ):
         assert proxy_mode in ("DEFAULT", "FORWARD_ONLY", "TUNNEL_ONLY")
 
@@ -51,6 +68,9 @@ class AsyncHTTPProxy(AsyncConnectionPool):
             max_keepalive=max_keepalive,
             keepalive_expiry=keepalive_expiry,
             http2=http2,
+            profiler=profiler,
+            latencies=latencies,
+            event_log=event_log,
         )
 
     async def request(
@@ -89,12 +109,20 @@ class AsyncHTTPProxy(AsyncConnectionPool):
         Forwarded proxy requests include the entire URL as the HTTP target,
         rather than just the path.
         """
+        if self._latencies is not None:
+            started = self._backend.time()
+
         origin = self.proxy_origin
         connection = await self._get_connection_from_pool(origin)
+        is_new_connection = connection is None
 
         if connection is None:
             connection = AsyncHTTPConnection(
-                origin=origin, http2=False, ssl_context=self._ssl_context,
+                origin=origin,
+                http2=False,
+                ssl_context=self._ssl_context,
+                profiler=self._profiler,
+                event_log=self._event_log,
             )
             async with self._thread_lock:
                 self._connections.setdefault(origin, set())
@@ -106,14 +134,23 @@ class AsyncHTTPProxy(AsyncConnectionPool):
         # [proxy headers]
         # [headers]
         target = b"%b://%b:%d%b" % url
-        url = self.proxy_origin + (target,)
+        proxy_url = self.proxy_origin + (target,)
         headers = self.proxy_headers + ([] if headers is None else headers)
 
+        if self._latencies is not None:
+            sent = self._backend.time()
+
         response = await connection.request(
-            method, url, headers=headers, stream=stream, timeout=timeout
+            method, proxy_url, headers=headers, stream=stream, timeout=timeout
         )
+
+        callback = self._response_closed
+        if self._latencies is not None:
+            callback = self._record_latencies(
+                url[:3], connection, started, sent, is_new_connection
+            )
         wrapped_stream = ResponseByteStream(
-            response[4], connection=connection, callback=self._response_closed
+            response[4], connection=connection, callback=callback
         )
         return response[0], response[1], response[2], response[3], wrapped_stream
 
@@ -129,10 +166,16 @@ class AsyncHTTPProxy(AsyncConnectionPool):
         Tunnelled proxy requests require an initial CONNECT request to
         establish the connection, and then send regular requests.
         """
+        if self._latencies is not None:
+            started = self._backend.time()
+
         origin = url[:3]
         connection = await self._get_connection_from_pool(origin)
+        is_new_connection = connection is None
 
         if connection is None:
+            tunnel_started = self._backend.time()
+
             # First, create a connection to the proxy server
             proxy_connection = AsyncHTTPConnection(
                 origin=self.proxy_origin, http2=False, ssl_context=self._ssl_context,
@@ -169,15 +212,28 @@ class AsyncHTTPProxy(AsyncConnectionPool):
                 http2=False,
                 ssl_context=self._ssl_context,
                 socket=proxy_connection.socket,
+                profiler=self._profiler,
+                event_log=self._event_log,
             )
+            connection.connect_time = self._backend.time() - tunnel_started
             await self._add_to_pool(connection)
 
+        if self._latencies is not None:
+            # The connect latency of a new tunnel is taken out of its ttfb.
+            sent = tunnel_started if is_new_connection else self._backend.time()
+
         # Once the connection has been established we can send requests on
         # it as normal.
         response = await connection.request(
             method, url, headers=headers, stream=stream, timeout=timeout,
         )
+
+        callback = self._response_closed
+        if self._latencies is not None:
+            callback = self._record_latencies(
+                origin, connection, started, sent, is_new_connection
+            )
         wrapped_stream = ResponseByteStream(
-            response[4], connection=connection, callback=self._response_closed
+            response[4], connection=connection, callback=callback
         )
         return response[0], response[1], response[2], response[3], wrapped_stream
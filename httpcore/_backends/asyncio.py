@@ -1,6 +1,17 @@
 import asyncio
 from ssl import SSLContext
-from typing import Optional
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Type,
+)
 
 from .._exceptions import (
     CloseError,
@@ -13,10 +24,20 @@ from .._exceptions import (
     map_exceptions,
 )
 from .._types import TimeoutDict
-from .base import AsyncBackend, AsyncLock, AsyncSemaphore, AsyncSocketStream
+from .base import (
+    AsyncBackend,
+    AsyncEvent,
+    AsyncLock,
+    AsyncSemaphore,
+    AsyncSocketStream,
+    AsyncTaskGroup,
+)
 
 SSL_MONKEY_PATCH_APPLIED = False
 
+# The event loop only keeps weak references to tasks.
+BACKGROUND_TASKS: Set[asyncio.Future] = set()
+
 
 def ssl_monkey_patch() -> None:
     """
@@ -77,6 +98,15 @@ async def backport_start_tls(
 
 
 class SocketStream(AsyncSocketStream):
+    __slots__ = (
+        "stream_reader",
+        "stream_writer",
+        "read_lock",
+        "write_lock",
+        "_inner",
+        "__dict__",
+    )
+
     def __init__(
         self, stream_reader: asyncio.StreamReader, stream_writer: asyncio.StreamWriter,
     ):
@@ -128,7 +158,10 @@ class SocketStream(AsyncSocketStream):
         return ssl_stream
 
     async def read(self, n: int, timeout: TimeoutDict) -> bytes:
-        exc_map = {asyncio.TimeoutError: ReadTimeout, OSError: ReadError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            asyncio.TimeoutError: ReadTimeout,
+            OSError: ReadError,
+        }
         async with self.read_lock:
             with map_exceptions(exc_map):
                 return await asyncio.wait_for(
@@ -139,7 +172,10 @@ class SocketStream(AsyncSocketStream):
         if not data:
             return
 
-        exc_map = {asyncio.TimeoutError: WriteTimeout, OSError: WriteError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            asyncio.TimeoutError: WriteTimeout,
+            OSError: WriteError,
+        }
         async with self.write_lock:
             with map_exceptions(exc_map):
                 self.stream_writer.write(data)
@@ -147,6 +183,26 @@ class SocketStream(AsyncSocketStream):
                     self.stream_writer.drain(), timeout.get("write")
                 )
 
+    async def sendfile(
+        self, file: BinaryIO, offset: int, count: int, timeout: TimeoutDict
+    ) -> None:
+        loop = asyncio.get_event_loop()
+        if not hasattr(loop, "sendfile"):  # pragma: nocover
+            # `loop.sendfile()` is not available on Python 3.6.
+            return await super().sendfile(file, offset, count, timeout)
+
+        # The loop falls back to reading the file itself for TLS transports.
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            asyncio.TimeoutError: WriteTimeout,
+            OSError: WriteError,
+        }
+        async with self.write_lock:
+            with map_exceptions(exc_map):
+                await asyncio.wait_for(
+                    loop.sendfile(self.stream_writer.transport, file, offset, count),
+                    timeout.get("write"),
+                )
+
     async def aclose(self) -> None:
         # NOTE: StreamWriter instances expose a '.wait_closed()' coroutine function,
         # but using it has caused compatibility issues with certain sites in
@@ -175,6 +231,21 @@ class SocketStream(AsyncSocketStream):
         # https://github.com/encode/httpx/pull/143#issuecomment-515202982)
         return self.stream_reader.at_eof()
 
+    async def read_available(self, n: int) -> Optional[bytes]:
+        exc_map: Dict[Type[Exception], Type[Exception]] = {OSError: ReadError}
+        async with self.read_lock:
+            with map_exceptions(exc_map):
+                # The read completes within a single pass of the event loop
+                # only if data has already been received. Cancelling it leaves
+                # any data that arrives later in the stream reader's buffer.
+                read = asyncio.ensure_future(self.stream_reader.read(n))
+                try:
+                    await asyncio.sleep(0)
+                finally:
+                    read.cancel()
+                await asyncio.wait([read])
+                return None if read.cancelled() else read.result()
+
 
 class Lock(AsyncLock):
     def __init__(self) -> None:
@@ -186,6 +257,9 @@ class Lock(AsyncLock):
     async def acquire(self) -> None:
         await self._lock.acquire()
 
+    def locked(self) -> bool:
+        return self._lock.locked()
+
 
 class Semaphore(AsyncSemaphore):
     def __init__(self, max_value: int, exc_class: type) -> None:
@@ -208,6 +282,50 @@ class Semaphore(AsyncSemaphore):
         self.semaphore.release()
 
 
+class Event(AsyncEvent):
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+
+    def set(self) -> None:
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    async def wait(self, timeout: float = None) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class TaskGroup(AsyncTaskGroup):
+    def __init__(self) -> None:
+        self._tasks: List[asyncio.Future] = []
+
+    async def __aenter__(self) -> "TaskGroup":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        if exc_type is not None:
+            for task in self._tasks:
+                task.cancel()
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+        if exc_type is None:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+
+    def start_soon(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        self._tasks.append(asyncio.ensure_future(func(*args)))
+
+
 class AsyncioBackend(AsyncBackend):
     def __init__(self) -> None:
         global SSL_MONKEY_PATCH_APPLIED
@@ -225,7 +343,10 @@ class AsyncioBackend(AsyncBackend):
     ) -> SocketStream:
         host = hostname.decode("ascii")
         connect_timeout = timeout.get("connect")
-        exc_map = {asyncio.TimeoutError: ConnectTimeout, OSError: ConnectError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            asyncio.TimeoutError: ConnectTimeout,
+            OSError: ConnectError,
+        }
         with map_exceptions(exc_map):
             stream_reader, stream_writer = await asyncio.wait_for(
                 asyncio.open_connection(host, port, ssl=ssl_context), connect_timeout,
@@ -240,6 +361,22 @@ class AsyncioBackend(AsyncBackend):
     def create_semaphore(self, max_value: int, exc_class: type) -> AsyncSemaphore:
         return Semaphore(max_value, exc_class=exc_class)
 
+    def create_event(self) -> AsyncEvent:
+        return Event()
+
+    def create_task_group(self) -> AsyncTaskGroup:
+        return TaskGroup()
+
+    def start_background_task(
+        self, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> None:
+        task = asyncio.ensure_future(func(*args))
+        BACKGROUND_TASKS.add(task)
+        task.add_done_callback(BACKGROUND_TASKS.discard)
+
     def time(self) -> float:
         loop = asyncio.get_event_loop()
         return loop.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
@@ -1,13 +1,27 @@
 from ssl import SSLContext
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
 import sniffio
 
 from .._types import TimeoutDict
-from .base import AsyncBackend, AsyncLock, AsyncSemaphore, AsyncSocketStream
+from .base import (
+    AsyncBackend,
+    AsyncEvent,
+    AsyncLock,
+    AsyncSemaphore,
+    AsyncSocketStream,
+    AsyncTaskGroup,
+)
 
 # The following line is imported from the _sync modules
-from .sync import SyncBackend, SyncLock, SyncSemaphore, SyncSocketStream  # noqa
+from .sync import (  # noqa
+    SyncBackend,
+    SyncEvent,
+    SyncLock,
+    SyncSemaphore,
+    SyncSocketStream,
+    SyncTaskGroup,
+)
 
 
 class AutoBackend(AsyncBackend):
@@ -43,5 +57,19 @@ class AutoBackend(AsyncBackend):
     def create_semaphore(self, max_value: int, exc_class: type) -> AsyncSemaphore:
         return self.backend.create_semaphore(max_value, exc_class=exc_class)
 
+    def create_event(self) -> AsyncEvent:
+        return self.backend.create_event()
+
+    def create_task_group(self) -> AsyncTaskGroup:
+        return self.backend.create_task_group()
+
+    def start_background_task(
+        self, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> None:
+        self.backend.start_background_task(func, *args)
+
     def time(self) -> float:
         return self.backend.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
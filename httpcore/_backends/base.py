@@ -1,6 +1,6 @@
 from ssl import SSLContext
 from types import TracebackType
-from typing import Optional, Type
+from typing import Any, Awaitable, BinaryIO, Callable, Optional, Type
 
 from .._types import TimeoutDict
 
@@ -12,6 +12,8 @@ class AsyncSocketStream:
     backends, or for stand-alone test cases.
     """
 
+    __slots__ = ()
+
     def get_http_version(self) -> str:
         raise NotImplementedError()  # pragma: no cover
 
@@ -26,12 +28,36 @@ class AsyncSocketStream:
     async def write(self, data: bytes, timeout: TimeoutDict) -> None:
         raise NotImplementedError()  # pragma: no cover
 
+    async def sendfile(
+        self, file: BinaryIO, offset: int, count: int, timeout: TimeoutDict
+    ) -> None:
+        """
+        Send `count` bytes of `file`, starting from `offset`. Backends which
+        support zero-copy transfers override this, and otherwise the file is
+        read and written in chunks.
+        """
+        file.seek(offset)
+        while count > 0:
+            chunk = file.read(min(count, 65536))
+            if not chunk:
+                break
+            await self.write(chunk, timeout)
+            count -= len(chunk)
+
     async def aclose(self) -> None:
         raise NotImplementedError()  # pragma: no cover
 
     def is_connection_dropped(self) -> bool:
         raise NotImplementedError()  # pragma: no cover
 
+    async def read_available(self, n: int) -> Optional[bytes]:
+        """
+        Return data that has already been received, without waiting for more,
+        or `None` if there is none. On TLS connections only decrypted data
+        counts, and not records such as session tickets, which carry none.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
 
 class AsyncLock:
     """
@@ -55,6 +81,9 @@ class AsyncLock:
     async def acquire(self) -> None:
         raise NotImplementedError()  # pragma: no cover
 
+    def locked(self) -> bool:
+        raise NotImplementedError()  # pragma: no cover
+
 
 class AsyncSemaphore:
     """
@@ -69,6 +98,47 @@ class AsyncSemaphore:
         raise NotImplementedError()  # pragma: no cover
 
 
+class AsyncEvent:
+    """
+    An abstract interface for Event classes.
+    Abstracts away any asyncio-specific interfaces.
+    """
+
+    def set(self) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def is_set(self) -> bool:
+        raise NotImplementedError()  # pragma: no cover
+
+    async def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until the event is set, returning `False` if the timeout expired.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+
+class AsyncTaskGroup:
+    """
+    An abstract interface for running tasks concurrently. All of the tasks
+    have finished once the `async with` block exits, and any still running
+    when it exits with an exception are cancelled.
+    """
+
+    async def __aenter__(self) -> "AsyncTaskGroup":
+        raise NotImplementedError()  # pragma: no cover
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def start_soon(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+
 class AsyncBackend:
     async def open_tcp_stream(
         self,
@@ -85,5 +155,22 @@ class AsyncBackend:
     def create_semaphore(self, max_value: int, exc_class: type) -> AsyncSemaphore:
         raise NotImplementedError()  # pragma: no cover
 
+    def create_event(self) -> AsyncEvent:
+        raise NotImplementedError()  # pragma: no cover
+
+    def create_task_group(self) -> AsyncTaskGroup:
+        raise NotImplementedError()  # pragma: no cover
+
+    def start_background_task(
+        self, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> None:
+        """
+        Run a task which is not waited on. It must handle its own exceptions.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
     def time(self) -> float:
         raise NotImplementedError()  # pragma: no cover
+
+    async def sleep(self, seconds: float) -> None:
+        raise NotImplementedError()  # pragma: no cover
@@ -2,9 +2,9 @@ import select
 import socket
 import threading
 import time
-from ssl import SSLContext
+from ssl import SSLContext, SSLSocket, SSLWantReadError
 from types import TracebackType
-from typing import Optional, Type
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Type
 
 from .._exceptions import (
     CloseError,
@@ -26,6 +26,8 @@ class SyncSocketStream:
     backends, or for stand-alone test cases.
     """
 
+    __slots__ = ("sock", "read_lock", "write_lock", "__dict__")
+
     def __init__(self, sock: socket.socket) -> None:
         self.sock = sock
         self.read_lock = threading.Lock()
@@ -42,7 +44,10 @@ class SyncSocketStream:
         self, hostname: bytes, ssl_context: SSLContext, timeout: TimeoutDict,
     ) -> "SyncSocketStream":
         connect_timeout = timeout.get("connect")
-        exc_map = {socket.timeout: ConnectTimeout, socket.error: ConnectError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            socket.timeout: ConnectTimeout,
+            socket.error: ConnectError,
+        }
 
         with map_exceptions(exc_map):
             self.sock.settimeout(connect_timeout)
@@ -54,7 +59,10 @@ class SyncSocketStream:
 
     def read(self, n: int, timeout: TimeoutDict) -> bytes:
         read_timeout = timeout.get("read")
-        exc_map = {socket.timeout: ReadTimeout, socket.error: ReadError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            socket.timeout: ReadTimeout,
+            socket.error: ReadError,
+        }
 
         with self.read_lock:
             with map_exceptions(exc_map):
@@ -63,7 +71,10 @@ class SyncSocketStream:
 
     def write(self, data: bytes, timeout: TimeoutDict) -> None:
         write_timeout = timeout.get("write")
-        exc_map = {socket.timeout: WriteTimeout, socket.error: WriteError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            socket.timeout: WriteTimeout,
+            socket.error: WriteError,
+        }
 
         with self.write_lock:
             with map_exceptions(exc_map):
@@ -72,15 +83,50 @@ class SyncSocketStream:
                     n = self.sock.send(data)
                     data = data[n:]
 
+    def sendfile(
+        self, file: BinaryIO, offset: int, count: int, timeout: TimeoutDict
+    ) -> None:
+        # `socket.sendfile()` falls back to reading the file itself if
+        # `os.sendfile()` can't be used, such as for TLS sockets.
+        write_timeout = timeout.get("write")
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            socket.timeout: WriteTimeout,
+            socket.error: WriteError,
+        }
+
+        with self.write_lock:
+            with map_exceptions(exc_map):
+                self.sock.settimeout(write_timeout)
+                self.sock.sendfile(file, offset, count)
+
     def close(self) -> None:
         with self.write_lock:
             with map_exceptions({socket.error: CloseError}):
                 self.sock.close()
 
     def is_connection_dropped(self) -> bool:
+        return self.is_readable()
+
+    def is_readable(self) -> bool:
         rready, _wready, _xready = select.select([self.sock], [], [], 0)
         return bool(rready)
 
+    def read_available(self, n: int) -> Optional[bytes]:
+        exc_map: Dict[Type[Exception], Type[Exception]] = {socket.error: ReadError}
+
+        with self.read_lock:
+            is_pending = isinstance(self.sock, SSLSocket) and self.sock.pending()
+            if not is_pending and not self.is_readable():
+                return None
+            with map_exceptions(exc_map):
+                self.sock.settimeout(0)
+                try:
+                    return self.sock.recv(n)
+                except (BlockingIOError, SSLWantReadError):
+                    # Only a TLS record which carries no data, such as a
+                    # session ticket, had been received.
+                    return None
+
 
 class SyncLock:
     def __init__(self) -> None:
@@ -103,6 +149,9 @@ class SyncLock:
     def acquire(self) -> None:
         self._lock.acquire()
 
+    def locked(self) -> bool:
+        return self._lock.locked()
+
 
 class SyncSemaphore:
     def __init__(self, max_value: int, exc_class: type) -> None:
@@ -118,6 +167,56 @@ class SyncSemaphore:
         self._semaphore.release()
 
 
+class SyncEvent:
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def set(self) -> None:
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._event.wait(timeout)
+
+
+class SyncTaskGroup:
+    """
+    Runs each task in its own thread. Threads cannot be cancelled, so tasks
+    which are already running are always waited on.
+    """
+
+    def __init__(self) -> None:
+        self._threads: List[threading.Thread] = []
+        self._errors: List[Exception] = []
+
+    def __enter__(self) -> "SyncTaskGroup":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        for thread in self._threads:
+            thread.join()
+        if exc_type is None and self._errors:
+            raise self._errors[0]
+
+    def start_soon(self, func: Callable[..., Any], *args: Any) -> None:
+        def run() -> None:
+            try:
+                func(*args)
+            except Exception as exc:
+                self._errors.append(exc)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+
 class SyncBackend:
     def open_tcp_stream(
         self,
@@ -127,7 +226,10 @@ class SyncBackend:
         timeout: TimeoutDict,
     ) -> SyncSocketStream:
         connect_timeout = timeout.get("connect")
-        exc_map = {socket.timeout: ConnectTimeout, socket.error: ConnectError}
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            socket.timeout: ConnectTimeout,
+            socket.error: ConnectError,
+        }
 
         with map_exceptions(exc_map):
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -145,5 +247,17 @@ class SyncBackend:
     def create_semaphore(self, max_value: int, exc_class: type) -> SyncSemaphore:
         return SyncSemaphore(max_value, exc_class=exc_class)
 
+    def create_event(self) -> SyncEvent:
+        return SyncEvent()
+
+    def create_task_group(self) -> SyncTaskGroup:
+        return SyncTaskGroup()
+
+    def start_background_task(self, func: Callable[..., Any], *args: Any) -> None:
+        threading.Thread(target=func, args=args, daemon=True).start()
+
     def time(self) -> float:
         return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
@@ -1,5 +1,6 @@
 from ssl import SSLContext
-from typing import Optional, Union
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, Union
 
 import trio
 
@@ -14,7 +15,18 @@ from .._exceptions import (
     map_exceptions,
 )
 from .._types import TimeoutDict
-from .base import AsyncBackend, AsyncLock, AsyncSemaphore, AsyncSocketStream
+from .base import (
+    AsyncBackend,
+    AsyncEvent,
+    AsyncLock,
+    AsyncSemaphore,
+    AsyncSocketStream,
+    AsyncTaskGroup,
+)
+
+# How long `read_available()` may take to decrypt data that is already on the
+# socket, before assuming that there is none.
+READ_AVAILABLE_TIMEOUT = 0.01
 
 
 def none_as_inf(value: Optional[float]) -> float:
@@ -22,6 +34,8 @@ def none_as_inf(value: Optional[float]) -> float:
 
 
 class SocketStream(AsyncSocketStream):
+    __slots__ = ("stream", "read_lock", "write_lock", "__dict__")
+
     def __init__(self, stream: Union[trio.SocketStream, trio.SSLStream]) -> None:
         self.stream = stream
         self.read_lock = trio.Lock()
@@ -81,6 +95,13 @@ class SocketStream(AsyncSocketStream):
                 await self.stream.aclose()
 
     def is_connection_dropped(self) -> bool:
+        # Counter-intuitively, what we really want to know here is whether the socket is
+        # *readable*, i.e. whether it would return immediately with empty bytes if we
+        # called `.recv()` on it, indicating that the other end has closed the socket.
+        # See: https://github.com/encode/httpx/pull/143#issuecomment-515181778
+        return self.is_readable()
+
+    def is_readable(self) -> bool:
         # Adapted from: https://github.com/encode/httpx/pull/143#issuecomment-515202982
         stream = self.stream
 
@@ -89,12 +110,23 @@ class SocketStream(AsyncSocketStream):
             stream = stream.transport_stream
         assert isinstance(stream, trio.SocketStream)
 
-        # Counter-intuitively, what we really want to know here is whether the socket is
-        # *readable*, i.e. whether it would return immediately with empty bytes if we
-        # called `.recv()` on it, indicating that the other end has closed the socket.
-        # See: https://github.com/encode/httpx/pull/143#issuecomment-515181778
         return stream.socket.is_readable()
 
+    async def read_available(self, n: int) -> Optional[bytes]:
+        if not self.is_readable():
+            return None
+
+        exc_map: Dict[Type[Exception], Type[Exception]] = {
+            trio.BrokenResourceError: ReadError
+        }
+        # A readable socket may only have a TLS record which carries no data,
+        # such as a session ticket, so give up on the read if it would wait.
+        with trio.move_on_after(READ_AVAILABLE_TIMEOUT):
+            async with self.read_lock:
+                with map_exceptions(exc_map):
+                    return await self.stream.receive_some(max_bytes=n)
+        return None
+
 
 class Lock(AsyncLock):
     def __init__(self) -> None:
@@ -106,6 +138,9 @@ class Lock(AsyncLock):
     async def acquire(self) -> None:
         await self._lock.acquire()
 
+    def locked(self) -> bool:
+        return self._lock.locked()
+
 
 class Semaphore(AsyncSemaphore):
     def __init__(self, max_value: int, exc_class: type):
@@ -131,6 +166,43 @@ class Semaphore(AsyncSemaphore):
         self.semaphore.release()
 
 
+class Event(AsyncEvent):
+    def __init__(self) -> None:
+        self._event = trio.Event()
+
+    def set(self) -> None:
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    async def wait(self, timeout: float = None) -> bool:
+        with trio.move_on_after(none_as_inf(timeout)):
+            await self._event.wait()
+            return True
+        return False
+
+
+class TaskGroup(AsyncTaskGroup):
+    def __init__(self) -> None:
+        self._nursery_manager = trio.open_nursery()
+
+    async def __aenter__(self) -> "TaskGroup":
+        self._nursery = await self._nursery_manager.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        await self._nursery_manager.__aexit__(exc_type, exc_value, traceback)
+
+    def start_soon(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        self._nursery.start_soon(func, *args)
+
+
 class TrioBackend(AsyncBackend):
     async def open_tcp_stream(
         self,
@@ -163,5 +235,19 @@ class TrioBackend(AsyncBackend):
     def create_semaphore(self, max_value: int, exc_class: type) -> AsyncSemaphore:
         return Semaphore(max_value, exc_class=exc_class)
 
+    def create_event(self) -> AsyncEvent:
+        return Event()
+
+    def create_task_group(self) -> AsyncTaskGroup:
+        return TaskGroup()
+
+    def start_background_task(
+        self, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> None:
+        trio.lowlevel.spawn_system_task(func, *args)
+
     def time(self) -> float:
         return trio.current_time()
+
+    async def sleep(self, seconds: float) -> None:
+        await trio.sleep(seconds)
@@ -0,0 +1,409 @@
+import email.utils
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ._types import URL, Headers
+
+# Responses which may be cached without explicit freshness information.
+# https://tools.ietf.org/html/rfc7231#section-6.1
+CACHEABLE_STATUS_CODES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+
+def cache_key(url: URL) -> bytes:
+    return b"%s://%s:%d%s" % url
+
+
+def get_header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def parse_cache_control(headers: Headers) -> Dict[bytes, Optional[bytes]]:
+    """
+    Return the `Cache-Control` directives, and their arguments, if any.
+    """
+    directives: Dict[bytes, Optional[bytes]] = {}
+    for key, value in headers:
+        if key.lower() == b"cache-control":
+            for directive in value.split(b","):
+                name, sep, argument = directive.strip().partition(b"=")
+                if name:
+                    directives[name.lower()] = argument.strip(b'"') if sep else None
+    return directives
+
+
+def parse_seconds(value: Optional[bytes]) -> Optional[int]:
+    if value is None or not value.strip().isdigit():
+        return None
+    return int(value)
+
+
+def parse_date(value: Optional[bytes]) -> Optional[float]:
+    if value is None:
+        return None
+    parsed = email.utils.parsedate_tz(value.decode("latin-1"))
+    return None if parsed is None else float(email.utils.mktime_tz(parsed))
+
+
+def vary_values(
+    request_headers: Headers, response_headers: Headers
+) -> Optional[List[Tuple[bytes, bytes]]]:
+    """
+    Return the values of the request headers which the response `Vary` header
+    names, or `None` if the response varies on anything, and cannot be reused.
+    """
+    names: List[bytes] = []
+    for key, value in response_headers:
+        if key.lower() == b"vary":
+            names.extend(name.strip().lower() for name in value.split(b","))
+    if b"*" in names:
+        return None
+    values = []
+    for name in names:
+        value = b", ".join(v for k, v in request_headers if k.lower() == name)
+        values.append((name, value))
+    return values
+
+
+class CachedResponse:
+    """
+    A stored response, along with the values of the request headers named by
+    its `Vary` header, and the time at which it was received or revalidated.
+
+    **Parameters:**
+
+    * **http_version** - `bytes` - The HTTP version of the response.
+    * **status_code** - `int` - The HTTP status code.
+    * **reason_phrase** - `bytes` - The HTTP reason phrase.
+    * **headers** - `List[Tuple[bytes, bytes]]` - The response headers.
+    * **content** - `Union[bytes, memoryview]` - The response body.
+    * **vary** - `List[Tuple[bytes, bytes]]` - The request headers which must
+    match for the response to be reused.
+    * **stored_at** - `float` - The time at which it was received, as seconds
+    since the epoch.
+    * **close_func** - `Optional[Callable]` - Called once the body has been
+    served, to release any resources it uses.
+    """
+
+    __slots__ = (
+        "http_version",
+        "status_code",
+        "reason_phrase",
+        "headers",
+        "content",
+        "vary",
+        "stored_at",
+        "close_func",
+    )
+
+    def __init__(
+        self,
+        http_version: bytes,
+        status_code: int,
+        reason_phrase: bytes,
+        headers: Headers,
+        content: Union[bytes, memoryview],
+        vary: List[Tuple[bytes, bytes]],
+        stored_at: float,
+        close_func: Callable[[], None] = None,
+    ) -> None:
+        self.http_version = http_version
+        self.status_code = status_code
+        self.reason_phrase = reason_phrase
+        self.headers = headers
+        self.content = content
+        self.vary = vary
+        self.stored_at = stored_at
+        self.close_func = close_func
+
+    def freshness_lifetime(self) -> float:
+        """
+        https://tools.ietf.org/html/rfc7234#section-4.2.1
+        """
+        max_age = parse_seconds(parse_cache_control(self.headers).get(b"max-age"))
+        if max_age is not None:
+            return max_age
+
+        date = parse_date(get_header(self.headers, b"date"))
+        date = self.stored_at if date is None else date
+        expires = get_header(self.headers, b"expires")
+        if expires is not None:
+            # An invalid date means that the response has already expired.
+            expires_at = parse_date(expires)
+            return 0.0 if expires_at is None else max(0.0, expires_at - date)
+
+        # Without explicit freshness, use 10% of the time since it was last
+        # modified, as suggested by RFC 7234.
+        last_modified = parse_date(get_header(self.headers, b"last-modified"))
+        if last_modified is not None and self.status_code in CACHEABLE_STATUS_CODES:
+            return max(0.0, (date - last_modified) / 10)
+        return 0.0
+
+    def age(self, now: float) -> float:
+        """
+        https://tools.ietf.org/html/rfc7234#section-4.2.3
+        """
+        age = parse_seconds(get_header(self.headers, b"age")) or 0
+        return age + max(0.0, now - self.stored_at)
+
+    def matches(self, request_headers: Headers) -> bool:
+        return vary_values(request_headers, self.headers) == self.vary
+
+    def close(self) -> None:
+        if self.close_func is not None:
+            self.close_func()
+
+
+def is_fresh(
+    response: CachedResponse,
+    request_cache_control: Dict[bytes, Optional[bytes]],
+    now: float,
+) -> bool:
+    """
+    Return `True` if a stored response may be served without revalidating it.
+    https://tools.ietf.org/html/rfc7234#section-4.2
+    """
+    response_cache_control = parse_cache_control(response.headers)
+    if b"no-cache" in request_cache_control or b"no-cache" in response_cache_control:
+        return False
+
+    lifetime = response.freshness_lifetime()
+    max_age = parse_seconds(request_cache_control.get(b"max-age"))
+    if max_age is not None:
+        lifetime = min(lifetime, max_age)
+    age = response.age(now)
+    age += parse_seconds(request_cache_control.get(b"min-fresh")) or 0
+    if age < lifetime:
+        return True
+
+    if (
+        b"max-stale" in request_cache_control
+        and b"must-revalidate" not in response_cache_control
+    ):
+        max_stale = request_cache_control[b"max-stale"]
+        if max_stale is None:
+            return True
+        return age - lifetime < (parse_seconds(max_stale) or 0)
+    return False
+
+
+def is_storable(
+    request_headers: Headers,
+    status_code: int,
+    response_headers: Headers,
+) -> bool:
+    """
+    Return `True` if a response to a `GET` request may be stored, and is worth
+    storing, because it is either fresh, or may be revalidated.
+    https://tools.ietf.org/html/rfc7234#section-3
+    """
+    request_cache_control = parse_cache_control(request_headers)
+    cache_control = parse_cache_control(response_headers)
+    if b"no-store" in request_cache_control or b"no-store" in cache_control:
+        return False
+    if get_header(request_headers, b"authorization") is not None and not (
+        b"public" in cache_control or b"must-revalidate" in cache_control
+    ):
+        return False
+
+    has_expiry = (
+        b"max-age" in cache_control
+        or get_header(response_headers, b"expires") is not None
+    )
+    if status_code not in CACHEABLE_STATUS_CODES and not (
+        has_expiry or b"public" in cache_control
+    ):
+        return False
+    return has_expiry or has_validators(response_headers)
+
+
+def has_validators(headers: Headers) -> bool:
+    return (
+        get_header(headers, b"etag") is not None
+        or get_header(headers, b"last-modified") is not None
+    )
+
+
+def conditional_headers(response: CachedResponse) -> Headers:
+    """
+    Return the headers which make a request conditional on whether the
+    stored response has changed.
+    https://tools.ietf.org/html/rfc7232#section-3
+    """
+    headers = []
+    etag = get_header(response.headers, b"etag")
+    if etag is not None:
+        headers.append((b"if-none-match", etag))
+    last_modified = get_header(response.headers, b"last-modified")
+    if last_modified is not None:
+        headers.append((b"if-modified-since", last_modified))
+    return headers
+
+
+def update_headers(stored_headers: Headers, new_headers: Headers) -> Headers:
+    """
+    Update the headers of a stored response with those of a `304 Not Modified`
+    response, which replace any stored headers with the same name.
+    https://tools.ietf.org/html/rfc7234#section-4.3.4
+    """
+    names = set(key.lower() for key, value in new_headers)
+    names.discard(b"content-length")
+    headers = [(k, v) for k, v in stored_headers if k.lower() not in names]
+    headers += [(k, v) for k, v in new_headers if k.lower() in names]
+    return headers
+
+
+class CacheStorage:
+    """
+    The base interface for storing cached responses, keyed by URL.
+    Implementations must be safe to use from several threads.
+    """
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        raise NotImplementedError()  # pragma: nocover
+
+    def set(self, key: bytes, response: CachedResponse) -> None:
+        raise NotImplementedError()  # pragma: nocover
+
+    def delete(self, key: bytes) -> None:
+        raise NotImplementedError()  # pragma: nocover
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryCache(CacheStorage):
+    """
+    Keeps responses in memory, discarding the least recently used ones once
+    their bodies and headers add up to more than `max_size` bytes.
+    """
+
+    def __init__(self, max_size: int = 2 ** 26) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._responses: "OrderedDict[bytes, Tuple[CachedResponse, int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._responses.get(key)
+            if item is None:
+                return None
+            self._responses.move_to_end(key)
+            return item[0]
+
+    def set(self, key: bytes, response: CachedResponse) -> None:
+        size = len(response.content) + sum(len(k) + len(v) for k, v in response.headers)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_size:
+                return
+            self._responses[key] = (response, size)
+            self.size += size
+            while self.size > self.max_size:
+                self._discard(next(iter(self._responses)))
+
+    def delete(self, key: bytes) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: bytes) -> None:
+        item = self._responses.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+
+
+class FileCache(CacheStorage):
+    """
+    Keeps each response in its own file within `directory`. Bodies are served
+    from a memory map of the file, rather than being read into memory.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: bytes) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key).hexdigest())
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        try:
+            file = open(self._path(key), "rb")
+        except FileNotFoundError:
+            return None
+        with file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size = int.from_bytes(mapped[:4], "big")
+        metadata = json.loads(mapped[4 : 4 + header_size].decode("ascii"))
+        if metadata["key"] != key.decode("latin-1"):
+            # A hash collision.
+            mapped.close()
+            return None
+        content = memoryview(mapped)[4 + header_size :]
+
+        def close() -> None:
+            content.release()
+            mapped.close()
+
+        return CachedResponse(
+            http_version=metadata["http_version"].encode("latin-1"),
+            status_code=metadata["status_code"],
+            reason_phrase=metadata["reason_phrase"].encode("latin-1"),
+            headers=[
+                (k.encode("latin-1"), v.encode("latin-1"))
+                for k, v in metadata["headers"]
+            ],
+            content=content,
+            vary=[
+                (k.encode("latin-1"), v.encode("latin-1"))
+                for k, v in metadata["vary"]
+            ],
+            stored_at=metadata["stored_at"],
+            close_func=close,
+        )
+
+    def set(self, key: bytes, response: CachedResponse) -> None:
+        metadata = {
+            "key": key.decode("latin-1"),
+            "http_version": response.http_version.decode("latin-1"),
+            "status_code": response.status_code,
+            "reason_phrase": response.reason_phrase.decode("latin-1"),
+            "headers": [
+                (k.decode("latin-1"), v.decode("latin-1")) for k, v in response.headers
+            ],
+            "vary": [
+                (k.decode("latin-1"), v.decode("latin-1")) for k, v in response.vary
+            ],
+            "stored_at": response.stored_at,
+        }
+        header = json.dumps(metadata).encode("ascii")
+
+        # Written to a temporary file first, so that readers never see a
+        # partially written response.
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(len(header).to_bytes(4, "big"))
+                file.write(header)
+                file.write(response.content)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def delete(self, key: bytes) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
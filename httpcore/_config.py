@@ -0,0 +1,171 @@
+from typing import TYPE_CHECKING, Any, FrozenSet, Hashable, Iterable, Optional
+
+from ._types import URL, Headers
+
+if TYPE_CHECKING:  # pragma: nocover
+    from h2.config import H2Configuration
+
+
+class Settings:
+    """
+    A base class for options, which are equal when all of their attributes
+    are, and are shown with them as keyword arguments.
+    """
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, self.__class__) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{key}={value!r}" for key, value in vars(self).items())
+        return f"{self.__class__.__name__}({args})"
+
+
+class HTTP2Settings(Settings):
+    """
+    Tuning options for HTTP/2 connections.
+
+    **Parameters:**
+
+    * **connection_window_size** - `int` - The receive flow-control window
+    for the connection as a whole.
+    * **stream_window_size** - `int` - The receive flow-control window for
+    each individual stream. Sent as `SETTINGS_INITIAL_WINDOW_SIZE`.
+    * **window_update_ratio** - `float` - The proportion of a window that must
+    be consumed before a `WINDOW_UPDATE` frame is sent to replenish it.
+    Higher values mean fewer frames and writes, at the risk of stalling a
+    fast sender on high-latency links.
+    * **ping_interval** - `Optional[float]` - If set, send a `PING` frame once
+    nothing has been received on a connection for this many seconds, either
+    while waiting on responses, or before reusing an idle connection.
+    * **ping_timeout** - `float` - The time to wait for a `PING` to be
+    acknowledged before treating the connection as dropped.
+    * **header_table_size** - `int` - The size of the HPACK dynamic table used
+    to decode response headers. Sent as `SETTINGS_HEADER_TABLE_SIZE`.
+    * **max_header_list_size** - `int` - The largest uncompressed header list
+    we will accept. Sent as `SETTINGS_MAX_HEADER_LIST_SIZE`.
+    * **max_concurrent_streams** - `int` - Sent as
+    `SETTINGS_MAX_CONCURRENT_STREAMS`.
+    * **max_frame_size** - `int` - The largest frame payload we will accept.
+    Sent as `SETTINGS_MAX_FRAME_SIZE`.
+    * **h2_config** - `Optional[H2Configuration]` - The `h2` configuration to
+    use, which must be client-side. Defaults to not validating inbound headers.
+    """
+
+    def __init__(
+        self,
+        connection_window_size: int = 2 ** 24,
+        stream_window_size: int = 2 ** 24,
+        window_update_ratio: float = 0.5,
+        ping_interval: float = None,
+        ping_timeout: float = 10.0,
+        header_table_size: int = 4096,
+        max_header_list_size: int = 65536,
+        max_concurrent_streams: int = 100,
+        max_frame_size: int = 2 ** 14,
+        h2_config: "H2Configuration" = None,
+    ) -> None:
+        if not 65535 <= connection_window_size <= 2 ** 31 - 1:
+            raise ValueError("connection_window_size must be in [65535, 2**31-1]")
+        # A zero window could never be replenished, since WINDOW_UPDATE frames
+        # are only sent once data has been received.
+        if not 1 <= stream_window_size <= 2 ** 31 - 1:
+            raise ValueError("stream_window_size must be in [1, 2**31-1]")
+        if not 0.0 < window_update_ratio <= 1.0:
+            raise ValueError("window_update_ratio must be in (0, 1]")
+        if ping_interval is not None and ping_interval <= 0:
+            raise ValueError("ping_interval must be positive")
+        if ping_timeout <= 0:
+            raise ValueError("ping_timeout must be positive")
+        if not 0 <= header_table_size <= 2 ** 32 - 1:
+            raise ValueError("header_table_size must be in [0, 2**32-1]")
+        if not 0 <= max_header_list_size <= 2 ** 32 - 1:
+            raise ValueError("max_header_list_size must be in [0, 2**32-1]")
+        if not 0 <= max_concurrent_streams <= 2 ** 32 - 1:
+            raise ValueError("max_concurrent_streams must be in [0, 2**32-1]")
+        if not 2 ** 14 <= max_frame_size <= 2 ** 24 - 1:
+            raise ValueError("max_frame_size must be in [2**14, 2**24-1]")
+        if h2_config is not None and not h2_config.client_side:
+            raise ValueError("h2_config must be a client-side configuration")
+
+        self.connection_window_size = connection_window_size
+        self.stream_window_size = stream_window_size
+        self.window_update_ratio = window_update_ratio
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.header_table_size = header_table_size
+        self.max_header_list_size = max_header_list_size
+        self.max_concurrent_streams = max_concurrent_streams
+        self.max_frame_size = max_frame_size
+        self.h2_config = h2_config
+
+
+class CoalescingSettings(Settings):
+    """
+    Options for coalescing identical concurrent requests. Only one of them is
+    sent, and its response is buffered and shared with all of the others.
+    Only `GET` and `HEAD` requests without a body are coalesced.
+
+    **Parameters:**
+
+    * **key_headers** - `Optional[Iterable[bytes]]` - The request headers that
+    must match, as well as the method and URL, for two requests to be treated
+    as identical. Defaults to all of them.
+    * **max_body_size** - `int` - The largest response body to buffer and
+    share. Requests waiting on a larger response send their own instead.
+    """
+
+    def __init__(
+        self, key_headers: Iterable[bytes] = None, max_body_size: int = 2 ** 20
+    ) -> None:
+        if max_body_size < 0:
+            raise ValueError("max_body_size must not be negative")
+
+        self.key_headers: Optional[FrozenSet[bytes]] = (
+            None
+            if key_headers is None
+            else frozenset(name.lower() for name in key_headers)
+        )
+        self.max_body_size = max_body_size
+
+    def request_key(self, method: bytes, url: URL, headers: Headers) -> Hashable:
+        """
+        Return a key which is equal for requests that may be coalesced.
+        """
+        headers = [(key.lower(), value) for key, value in headers]
+        if self.key_headers is not None:
+            headers = [item for item in headers if item[0] in self.key_headers]
+        return (method, url, tuple(sorted(headers)))
+
+
+class HedgingSettings(Settings):
+    """
+    Options for hedging idempotent requests without a body. If a request has
+    not received its response headers within a delay, the same request is
+    sent again on another connection, and whichever response arrives first
+    is used. The other is closed once its headers arrive. Each attempt is sent
+    by a background task, or a thread when using the sync pool.
+
+    **Parameters:**
+
+    * **delay** - `float` - The time to wait before sending the second
+    request, in seconds.
+    * **percentile** - `Optional[float]` - If set, wait for this percentile of
+    the time-to-first-byte latencies recorded for the origin instead, once at
+    least `min_samples` of them have been recorded.
+    * **min_samples** - `int` - The number of latencies to record for an
+    origin before `percentile` is used.
+    """
+
+    def __init__(
+        self, delay: float = 0.1, percentile: float = None, min_samples: int = 20
+    ) -> None:
+        if delay < 0:
+            raise ValueError("delay must not be negative")
+        if percentile is not None and not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if min_samples < 1:
+            raise ValueError("min_samples must be positive")
+
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
@@ -0,0 +1,102 @@
+"""
+A bounded log of recent connection events, for post-mortem debugging.
+"""
+import collections
+import threading
+import time
+from typing import Any, Deque, Dict, List, NamedTuple, TextIO
+
+from ._types import Origin
+
+
+class ConnectionEvent(NamedTuple):
+    timestamp: float
+    origin: Origin
+    connection_id: int
+    event: str
+    detail: str
+
+    def __str__(self) -> str:
+        scheme, host, port = self.origin
+        when = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        millis = int(self.timestamp % 1 * 1000)
+        return (
+            f"{when}.{millis:03d} {scheme.decode('ascii')}://"
+            f"{host.decode('ascii')}:{port} #{self.connection_id:x} "
+            f"{self.event} {self.detail}".rstrip()
+        )
+
+
+class EventLog:
+    """
+    A fixed-size ring buffer of recent connection events.
+
+    Records connections being opened, state transitions, requests and
+    responses, dropped and expired keep-alive connections, and errors.
+    Once `size` events have been recorded, the oldest are discarded.
+
+    **Parameters:**
+
+    * **size** - `int` - The maximum number of events to retain.
+    * **error_file** - `Optional[TextIO]` - If set, the log is dumped to this
+    file whenever an error is recorded. Use `sys.stderr` for a quick
+    post-mortem without having to catch and inspect exceptions.
+    """
+
+    def __init__(self, size: int = 1000, error_file: TextIO = None) -> None:
+        self._events: Deque[ConnectionEvent] = collections.deque(maxlen=size)
+        self._states: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.error_file = error_file
+
+    def record(self, connection: Any, event: str, detail: str = "") -> None:
+        entry = ConnectionEvent(
+            time.time(), connection.origin, id(connection), event, detail
+        )
+        self._events.append(entry)
+
+    def record_state(self, connection: Any) -> None:
+        """
+        Record the connection's `ConnectionState` if it has changed since
+        it was last observed.
+        """
+        state = connection.state.name
+        key = id(connection)
+        with self._lock:
+            previous = self._states.get(key)
+            if state == previous:
+                return
+            if state == "CLOSED":
+                self._states.pop(key, None)
+            else:
+                self._states[key] = state
+        self.record(connection, "state", f"{previous or 'NEW'} -> {state}")
+
+    def record_error(self, connection: Any, exc: BaseException) -> None:
+        self.record(connection, "error", repr(exc))
+        if self.error_file is not None:
+            print(self.dump(), file=self.error_file)
+
+    def forget(self, connection: Any) -> None:
+        with self._lock:
+            self._states.pop(id(connection), None)
+
+    def events(self) -> List[ConnectionEvent]:
+        """
+        Return a snapshot of the retained events, oldest first.
+        """
+        return list(self._events)
+
+    def dump(self) -> str:
+        """
+        Return the retained events formatted one per line, oldest first.
+        """
+        return "\n".join(str(event) for event in self.events())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
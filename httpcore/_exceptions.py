@@ -21,6 +21,10 @@ class ProxyError(Exception):
     pass
 
 
+class ResponseTooLarge(Exception):
+    pass
+
+
 # Timeout errors
 
 
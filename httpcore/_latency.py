@@ -0,0 +1,157 @@
+"""
+Fixed-memory latency histograms, for tracking percentiles per origin.
+"""
+import math
+import threading
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+from ._types import Origin
+
+# Values are recorded in integer microseconds into log-linear buckets.
+# Values below SUB_BUCKET_COUNT (2**7) get a bucket each, and every
+# power-of-two range above that is split into SUB_BUCKET_HALF (2**6) linear
+# sub-buckets, so any recorded value is reported to within ~1.6% (1/64) of
+# its true value.
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Values above 2**32 microseconds (a little over an hour) are clamped.
+MAX_VALUE = (1 << 32) - 1
+NUM_BUCKETS = SUB_BUCKET_COUNT + (32 - SUB_BUCKET_BITS) * SUB_BUCKET_HALF
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (
+        SUB_BUCKET_COUNT
+        + (shift - 1) * SUB_BUCKET_HALF
+        + ((value >> shift) - SUB_BUCKET_HALF)
+    )
+
+
+def bucket_range(index: int) -> Tuple[int, int]:
+    """
+    Return the lowest and highest values that map to a bucket.
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift, sub_bucket = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+    shift += 1
+    sub_bucket += SUB_BUCKET_HALF
+    return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    A log-linear histogram of durations, using a fixed-size array of counts.
+
+    Histograms with the same layout may be merged, so per-thread or per-pool
+    histograms can be combined before querying percentiles.
+    """
+
+    def __init__(self) -> None:
+        self.counts = array("Q", bytes(8 * NUM_BUCKETS))
+        self.total_count = 0
+        self.max_value = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Record a single duration, given in seconds.
+        """
+        value = min(max(int(seconds * 1_000_000), 0), MAX_VALUE)
+        index = bucket_index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total_count += 1
+            if value > self.max_value:
+                self.max_value = value
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Add the counts from another histogram into this one.
+        """
+        with other._lock:
+            counts = array("Q", other.counts)
+            total_count, max_value = other.total_count, other.max_value
+        with self._lock:
+            for index, count in enumerate(counts):
+                if count:
+                    self.counts[index] += count
+            self.total_count += total_count
+            self.max_value = max(self.max_value, max_value)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Return the duration in seconds below which the given percentage of
+        recorded values fall, or `0.0` if nothing has been recorded.
+        """
+        with self._lock:
+            if not self.total_count:
+                return 0.0
+            target = max(1, math.ceil(self.total_count * percent / 100))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    break
+            high = min(bucket_range(index)[1], self.max_value)
+        return high / 1_000_000
+
+    def __len__(self) -> int:
+        return self.total_count
+
+
+class LatencyHistograms:
+    """
+    Per-origin latency histograms for a connection pool.
+
+    Records, in seconds:
+
+    * **connect** - Time taken to establish new connections, including TLS.
+    * **ttfb** - Time from sending a request until the response headers have
+    been received, excluding any connection establishment.
+    * **total** - Time from issuing a request until its response stream
+    has been closed.
+    """
+
+    METRICS = ("connect", "ttfb", "total")
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Origin, Dict[str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, origin: Origin) -> Dict[str, Histogram]:
+        histograms = self._histograms.get(origin)
+        if histograms is None:
+            with self._lock:
+                histograms = self._histograms.setdefault(
+                    origin, {metric: Histogram() for metric in self.METRICS}
+                )
+        return histograms
+
+    def record(self, origin: Origin, metric: str, seconds: float) -> None:
+        self.get(origin)[metric].record(seconds)
+
+    def percentile(self, origin: Origin, metric: str, percent: float) -> float:
+        return self.get(origin)[metric].percentile(percent)
+
+    def origins(self) -> List[Origin]:
+        with self._lock:
+            return list(self._histograms)
+
+    def merge(self, other: "LatencyHistograms") -> None:
+        """
+        Add the counts from another set of histograms into this one.
+        """
+        for origin in other.origins():
+            histograms = self.get(origin)
+            for metric, histogram in other.get(origin).items():
+                histograms[metric].merge(histogram)
+
+    def __iter__(self) -> Iterator[Tuple[Origin, Dict[str, Histogram]]]:
+        for origin in self.origins():
+            yield origin, self.get(origin)
@@ -0,0 +1,131 @@
+"""
+Lightweight call counters for attributing time spent inside httpcore.
+
+Instrumentation is applied per-instance by replacing selected bound methods
+with timing wrappers, so there is no overhead at all when it is disabled.
+"""
+import atexit
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_ENV_VAR = "HTTPCORE_PROFILE"
+
+# `time.thread_time()` is not available on Python 3.6.
+cpu_time = getattr(time, "thread_time", time.process_time)
+
+
+class Profiler:
+    """
+    Collects call counts and cumulative wall-clock and CPU time for
+    instrumented methods.
+
+    CPU time is measured per-thread where the platform supports it. For async
+    methods this includes any CPU time used by other tasks on the same thread
+    while the method was suspended, so treat it as an upper bound.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[float]] = {}
+
+    def record(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                self._stats[name] = [1, wall, cpu]
+            else:
+                stat[0] += 1
+                stat[1] += wall
+                stat[2] += cpu
+
+    def instrument(self, obj: Any, method_name: str, label: str = None) -> None:
+        """
+        Replace `obj.<method_name>` with a wrapper that records its timings.
+        """
+        name = label or f"{type(obj).__name__}.{method_name}"
+        method = getattr(obj, method_name)
+        wrapper: Callable
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                wall, cpu = time.perf_counter(), cpu_time()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - wall, cpu_time() - cpu)
+
+        else:
+
+            @functools.wraps(method)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                wall, cpu = time.perf_counter(), cpu_time()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - wall, cpu_time() - cpu)
+
+        setattr(obj, method_name, wrapper)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return a snapshot of the collected counters, keyed by method name.
+        """
+        with self._lock:
+            return {
+                name: {"calls": calls, "wall": wall, "cpu": cpu}
+                for name, (calls, wall, cpu) in self._stats.items()
+            }
+
+    def summary(self) -> str:
+        """
+        Return the collected counters formatted as a table, ordered by
+        cumulative wall-clock time.
+        """
+        rows = sorted(self.stats().items(), key=lambda item: -item[1]["wall"])
+        width = max([len(name) for name, _ in rows] + [len("method")])
+        lines = [
+            f"{'method':<{width}} {'calls':>10} {'wall (s)':>12} "
+            f"{'cpu (s)':>12} {'wall/call (us)':>15}"
+        ]
+        for name, stat in rows:
+            per_call = stat["wall"] / stat["calls"] * 1e6 if stat["calls"] else 0.0
+            lines.append(
+                f"{name:<{width}} {int(stat['calls']):>10} {stat['wall']:>12.6f} "
+                f"{stat['cpu']:>12.6f} {per_call:>15.1f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_default_profiler: Optional[Profiler] = None
+
+
+def _dump_default_profiler() -> None:  # pragma: nocover
+    if _default_profiler is not None:
+        print(_default_profiler.summary(), file=sys.stderr)
+
+
+def get_default_profiler() -> Optional[Profiler]:
+    """
+    Return the process-wide profiler if the `HTTPCORE_PROFILE` environment
+    variable is set, or `None` otherwise. The process-wide profiler dumps
+    its summary to stderr on interpreter exit.
+    """
+    global _default_profiler
+
+    if not os.environ.get(PROFILE_ENV_VAR):
+        return None
+    if _default_profiler is None:
+        _default_profiler = Profiler()
+        atexit.register(_dump_default_profiler)
+    return _default_profiler
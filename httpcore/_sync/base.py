@@ -1,18 +1,77 @@
 import enum
+import mmap
+import os
 from types import TracebackType
-from typing import Iterator, Callable, List, Tuple, Type
+from typing import (
+    Iterator,
+    BinaryIO,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
+from .._exceptions import ProtocolError, ResponseTooLarge
 from .._types import URL, Headers, TimeoutDict
 
 
+# Methods which may be safely pipelined or retried, when sent without a body.
+IDEMPOTENT_METHODS = {b"GET", b"HEAD", b"OPTIONS", b"TRACE", b"PUT", b"DELETE"}
+
+
 def empty() -> Iterator:
     yield b""
 
 
+def write_all(file: Union[int, BinaryIO], data: bytearray) -> int:
+    """
+    Write all of `data` to a binary file object or file descriptor, either of
+    which may accept only part of it at a time.
+    """
+    written = 0
+    with memoryview(data) as view:
+        while written < len(data):
+            with view[written:] as remaining:
+                if isinstance(file, int):
+                    written += os.write(file, remaining)
+                else:
+                    written += file.write(remaining)
+    return written
+
+
+def read_chunks(chunks: "SyncByteStream", max_size: int = None) -> bytes:
+    """
+    Join an iterator of chunks, failing once more than `max_size` bytes have
+    been received. `b"".join()` sizes its result exactly, so collecting chunks
+    costs a single copy, the same as filling a preallocated buffer would.
+    """
+    body = []
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise ResponseTooLarge(f"Response body is larger than {max_size} bytes")
+        body.append(chunk)
+    return b"".join(body)
+
+
 class NewConnectionRequired(Exception):
     pass
 
 
+def has_body_headers(headers: Headers = None) -> bool:
+    """
+    Return `True` if the request headers indicate that a body will be sent.
+    """
+    for key, value in [] if headers is None else headers:
+        if key.lower() in (b"content-length", b"transfer-encoding"):
+            return key.lower() == b"transfer-encoding" or value.strip() != b"0"
+    return False
+
+
 class ConnectionState(enum.IntEnum):
     """
     PENDING  READY
@@ -44,18 +103,27 @@ class SyncByteStream:
     the `\\__iter__` method, and optionally the `close` method.
     """
 
+    __slots__ = ("iterator", "close_func", "read_func")
+
     def __init__(
-        self, iterator: Iterator[bytes] = None, close_func: Callable = None,
+        self,
+        iterator: Iterator[bytes] = None,
+        close_func: Callable = None,
+        read_func: Callable = None,
     ) -> None:
         self.iterator = empty() if iterator is None else iterator
         self.close_func = close_func
+        # An optional faster way of reading the whole stream, called with the
+        # maximum size, for the connection to read the body without iterating.
+        self.read_func = read_func
 
     def __iter__(self) -> Iterator[bytes]:
         """
-        Yield bytes representing the request or response body.
+        Return an iterator of bytes representing the request or response body.
+        This is the underlying iterator itself, rather than a generator
+        wrapping it, so that each chunk passes through one less frame.
         """
-        for chunk in self.iterator:
-            yield chunk
+        return self.iterator.__iter__()
 
     def close(self) -> None:
         """
@@ -64,6 +132,133 @@ class SyncByteStream:
         if self.close_func is not None:
             self.close_func()
 
+    def read(self, max_size: int = None) -> bytes:
+        """
+        Read the whole stream and close it, returning the bytes read. Raises
+        `ResponseTooLarge` as soon as more than `max_size` bytes are received.
+        """
+        # Subclasses may not call `__init__`, so `read_func` is optional.
+        read_func = getattr(self, "read_func", None)
+        try:
+            if read_func is not None:
+                return read_func(max_size)
+            return read_chunks(self, max_size)
+        finally:
+            self.close()
+
+    def copy_to(
+        self, file: Union[int, BinaryIO], buffer_size: int = 1024 * 1024
+    ) -> int:
+        """
+        Write the whole stream to a binary file object or file descriptor, and
+        close it, returning the number of bytes written. Chunks are collected
+        into writes of up to `buffer_size` bytes.
+        """
+        buffer = bytearray()
+        total = 0
+        try:
+            for chunk in self:
+                buffer += chunk
+                if len(buffer) >= buffer_size:
+                    total += write_all(file, buffer)
+                    buffer.clear()
+            total += write_all(file, buffer)
+        finally:
+            self.close()
+        return total
+
+    def into_mmap(self, path: str, size: int) -> Optional[mmap.mmap]:
+        """
+        Write the whole stream into a new file of exactly `size` bytes, such as
+        the response's `Content-Length`, through a memory map, and close it.
+        Returns the memory map, which the caller should close, or `None` if
+        `size` is zero, since an empty file cannot be mapped.
+        """
+        mapped = None
+        try:
+            with open(path, "w+b") as file:
+                file.truncate(size)
+                if size:
+                    mapped = mmap.mmap(file.fileno(), size)
+
+            offset = 0
+            for chunk in self:
+                end = offset + len(chunk)
+                if end > size:
+                    raise ProtocolError("Response body is larger than expected")
+                if mapped is not None:
+                    mapped[offset:end] = chunk
+                offset = end
+            if offset != size:
+                raise ProtocolError("Response body is smaller than expected")
+        except BaseException:
+            if mapped is not None:
+                mapped.close()
+            raise
+        finally:
+            self.close()
+        return mapped
+
+
+class FileSlice:
+    """
+    A region of a file, to be sent without reading it into memory.
+    """
+
+    __slots__ = ("file", "offset", "count")
+
+    def __init__(self, file: BinaryIO, offset: int, count: int) -> None:
+        self.file = file
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SyncFileByteStream(SyncByteStream):
+    """
+    A request body which is read from a file, opened in binary mode.
+
+    Plain HTTP/1.1 connections send the file with `sendfile()`, where the
+    backend supports it, so that it is never copied into Python memory.
+    Otherwise, such as for HTTP/2, the file is read in `chunk_size` pieces.
+    """
+
+    __slots__ = ("file", "offset", "count", "chunk_size")
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        offset: int = 0,
+        count: int = None,
+        chunk_size: int = 65536,
+        close_func: Callable = None,
+    ) -> None:
+        super().__init__(close_func=close_func)
+        self.file = file
+        self.offset = offset
+        if count is None:
+            count = os.fstat(file.fileno()).st_size - offset
+        self.count = count
+        self.chunk_size = chunk_size
+
+    def iter_slices(self, size: int) -> Iterable[FileSlice]:
+        """
+        Split the body into regions of the file, of at most `size` bytes.
+        """
+        end = self.offset + self.count
+        for offset in range(self.offset, end, size):
+            yield FileSlice(self.file, offset, min(size, end - offset))
+
+    def __iter__(self) -> Iterator[bytes]:
+        for file_slice in self.iter_slices(self.chunk_size):
+            self.file.seek(file_slice.offset)
+            chunk = self.file.read(file_slice.count)
+            if not chunk:
+                break
+            yield chunk
+
 
 class SyncHTTPTransport:
     """
@@ -73,6 +268,8 @@ class SyncHTTPTransport:
     the `request` method, and optionally the `close` method.
     """
 
+    __slots__ = ()
+
     def request(
         self,
         method: bytes,
@@ -1,7 +1,10 @@
 from ssl import SSLContext
-from typing import List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 from .._backends.auto import SyncLock, SyncSocketStream, SyncBackend
+from .._config import HTTP2Settings
+from .._eventlog import EventLog
+from .._profiling import Profiler
 from .._types import URL, Headers, Origin, TimeoutDict
 from .base import (
     SyncByteStream,
@@ -9,38 +12,78 @@ from .base import (
     ConnectionState,
     NewConnectionRequired,
 )
-from .http2 import SyncHTTP2Connection
-from .http11 import SyncHTTP11Connection
+from .http11 import SyncHTTP11Connection, SyncHTTP11PipelinedConnection
+
+if TYPE_CHECKING:  # pragma: nocover
+    from .http2 import SyncHTTP2Connection
 
 
 class SyncHTTPConnection(SyncHTTPTransport):
+    # Connections and sockets store their attributes in slots, to keep the
+    # per-connection overhead low. `__dict__` is only allocated if something
+    # else is set on an instance, such as the profiler's timing wrappers.
+    __slots__ = (
+        "origin",
+        "http2",
+        "ssl_context",
+        "socket",
+        "profiler",
+        "event_log",
+        "pipelining",
+        "http2_prior_knowledge",
+        "http2_settings",
+        "connection",
+        "is_http11",
+        "is_http2",
+        "connect_failed",
+        "expires_at",
+        "connect_time",
+        "backend",
+        "_request_lock",
+        "__dict__",
+    )
+
     def __init__(
         self,
         origin: Origin,
         http2: bool = False,
         ssl_context: SSLContext = None,
         socket: SyncSocketStream = None,
+        profiler: Profiler = None,
+        event_log: EventLog = None,
+        pipelining: int = None,
+        http2_prior_knowledge: bool = False,
+        http2_settings: HTTP2Settings = None,
     ):
         self.origin = origin
         self.http2 = http2
         self.ssl_context = SSLContext() if ssl_context is None else ssl_context
         self.socket = socket
+        self.profiler = profiler
+        self.event_log = event_log
+        self.pipelining = pipelining
+        self.http2_prior_knowledge = http2_prior_knowledge
+        self.http2_settings = http2_settings
 
         if self.http2:
             self.ssl_context.set_alpn_protocols(["http/1.1", "h2"])
 
-        self.connection: Union[None, SyncHTTP11Connection, SyncHTTP2Connection] = None
+        self.connection: Union[
+            None, SyncHTTP11Connection, "SyncHTTP2Connection"
+        ] = None
         self.is_http11 = False
         self.is_http2 = False
         self.connect_failed = False
         self.expires_at: Optional[float] = None
+        self.connect_time: Optional[float] = None
         self.backend = SyncBackend()
+        self._request_lock: Optional[SyncLock] = None
 
     @property
     def request_lock(self) -> SyncLock:
         # We do this lazily, to make sure backend autodetection always
         # runs within an async context.
-        if not hasattr(self, "_request_lock"):
+        if self._request_lock is None:
             self._request_lock = self.backend.create_lock()
         return self._request_lock
 
@@ -58,10 +101,14 @@ class SyncHTTPConnection(SyncHTTPTransport):
                 if not self.socket:
                     self.socket = self._open_socket(timeout)
                 self._create_connection(self.socket)
+                if self.event_log is not None:
+                    self._log_connected()
             elif self.state in (ConnectionState.READY, ConnectionState.IDLE):
                 pass
             elif self.state == ConnectionState.ACTIVE and self.is_http2:
                 pass
+            elif self.is_pipelining_available():
+                pass
             else:
                 raise NewConnectionRequired()
 
@@ -72,26 +119,70 @@ class SyncHTTPConnection(SyncHTTPTransport):
         scheme, hostname, port = self.origin
         timeout = {} if timeout is None else timeout
         ssl_context = self.ssl_context if scheme == b"https" else None
+        started = self.backend.time()
         try:
-            return self.backend.open_tcp_stream(
+            socket = self.backend.open_tcp_stream(
                 hostname, port, ssl_context, timeout
             )
+            self.connect_time = self.backend.time() - started
+            return socket
         except Exception:
             self.connect_failed = True
             raise
 
     def _create_connection(self, socket: SyncSocketStream) -> None:
         http_version = socket.get_http_version()
+        if self.http2_prior_knowledge and self.origin[0] == b"http":
+            # Cleartext HTTP/2 without an upgrade, for servers which are
+            # known to support it. https://tools.ietf.org/html/rfc7540#section-3.4
+            http_version = "HTTP/2"
+        if self.profiler is not None:
+            self._instrument_socket(socket)
         if http_version == "HTTP/2":
+            # The HTTP/2 stack is only imported once it is first needed.
+            from .http2 import SyncHTTP2Connection
+
             self.is_http2 = True
             self.connection = SyncHTTP2Connection(
-                socket=socket, backend=self.backend, ssl_context=self.ssl_context
+                socket=socket,
+                backend=self.backend,
+                ssl_context=self.ssl_context,
+                settings=self.http2_settings,
             )
+            if self.profiler is not None:
+                self.profiler.instrument(self.connection, "receive_events")
+        elif self.pipelining is not None and self.pipelining > 1:
+            self.is_http11 = True
+            self.connection = SyncHTTP11PipelinedConnection(
+                socket=socket,
+                backend=self.backend,
+                ssl_context=self.ssl_context,
+                max_pipelined=self.pipelining,
+            )
+            if self.profiler is not None:
+                self.profiler.instrument(self.connection, "_receive_event")
         else:
             self.is_http11 = True
             self.connection = SyncHTTP11Connection(
                 socket=socket, ssl_context=self.ssl_context
             )
+            if self.profiler is not None:
+                self.profiler.instrument(self.connection, "_receive_event")
+
+    def _log_connected(self) -> None:
+        assert self.event_log is not None
+        if self.connect_time is not None:
+            detail = "%.3fms" % (self.connect_time * 1000)
+            self.event_log.record(self, "connected", detail)
+        if self.origin[0] == b"https":
+            http_version = "HTTP/2" if self.is_http2 else "HTTP/1.1"
+            self.event_log.record(self, "tls_established", http_version)
+
+    def _instrument_socket(self, socket: SyncSocketStream) -> None:
+        assert self.profiler is not None
+        self.profiler.instrument(socket, "read", label="SocketStream.read")
+        self.profiler.instrument(socket, "write", label="SocketStream.write")
+        self.profiler.instrument(socket, "sendfile", label="SocketStream.sendfile")
 
     @property
     def state(self) -> ConnectionState:
@@ -104,6 +195,16 @@ class SyncHTTPConnection(SyncHTTPTransport):
     def is_connection_dropped(self) -> bool:
         return self.connection is not None and self.connection.is_connection_dropped()
 
+    def is_pipelining_available(self) -> bool:
+        """
+        Return `True` if this is an active HTTP/1.1 connection which can
+        accept another pipelined request.
+        """
+        return (
+            isinstance(self.connection, SyncHTTP11PipelinedConnection)
+            and self.connection.is_pipelining_available()
+        )
+
     def mark_as_ready(self) -> None:
         if self.connection is not None:
             self.connection.mark_as_ready()
@@ -112,3 +213,5 @@ class SyncHTTPConnection(SyncHTTPTransport):
         if self.connection is not None:
             self.connection.start_tls(hostname, timeout)
             self.socket = self.connection.socket
+            if self.profiler is not None:
+                self._instrument_socket(self.socket)
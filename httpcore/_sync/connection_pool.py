@@ -1,15 +1,44 @@
+import functools
+from collections import deque
 from ssl import SSLContext
-from typing import Iterator, Callable, Dict, Optional, Set, Tuple
+from types import TracebackType
+from typing import (
+    Any,
+    Iterator,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
-from .._backends.auto import SyncSemaphore, SyncBackend
+from .._backends.auto import (
+    SyncEvent,
+    SyncSemaphore,
+    SyncTaskGroup,
+    SyncBackend,
+)
+from .._config import CoalescingSettings, HedgingSettings, HTTP2Settings
+from .._eventlog import EventLog
 from .._exceptions import PoolTimeout
+from .._latency import LatencyHistograms
+from .._profiling import Profiler, get_default_profiler
 from .._threadlock import ThreadLock
 from .._types import URL, Headers, Origin, TimeoutDict
 from .base import (
+    IDEMPOTENT_METHODS,
     SyncByteStream,
     SyncHTTPTransport,
     ConnectionState,
     NewConnectionRequired,
+    has_body_headers,
 )
 from .connection import SyncHTTPConnection
 
@@ -26,6 +55,8 @@ class NullSemaphore(SyncSemaphore):
 
 
 class ResponseByteStream(SyncByteStream):
+    __slots__ = ("stream", "connection", "callback")
+
     def __init__(
         self,
         stream: SyncByteStream,
@@ -43,8 +74,7 @@ class ResponseByteStream(SyncByteStream):
         self.callback = callback
 
     def __iter__(self) -> Iterator[bytes]:
-        for chunk in self.stream:
-            yield chunk
+        return self.stream.__iter__()
 
     def close(self) -> None:
         try:
@@ -57,6 +87,218 @@ class ResponseByteStream(SyncByteStream):
             # This will be a call to `SyncConnectionPool._response_closed()`.
             self.callback(self.connection)
 
+    def read(self, max_size: int = None) -> bytes:
+        try:
+            return self.stream.read(max_size)
+        finally:
+            self.callback(self.connection)
+
+
+Response = Tuple[bytes, int, bytes, Headers, SyncByteStream]
+
+
+def buffered(content: bytes) -> Iterator[bytes]:
+    yield content
+
+
+def replay(
+    chunks: List[bytes], iterator: Iterator[bytes]
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+    for chunk in iterator:
+        yield chunk
+
+
+def read_up_to(
+    response: Response, max_size: int
+) -> Tuple[Optional[bytes], SyncByteStream]:
+    """
+    Read a response body into memory, if it is no larger than `max_size`.
+    Otherwise return a stream of the whole body, including any part of it that
+    has already been read.
+    """
+    stream = response[4]
+    for key, value in response[3]:
+        if key.lower() == b"content-length" and int(value) > max_size:
+            return None, stream
+
+    chunks: List[bytes] = []
+    size = 0
+    iterator = stream.__iter__()
+    try:
+        for chunk in iterator:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_size:
+                remaining = replay(chunks, iterator)
+                return None, SyncByteStream(remaining, close_func=stream.close)
+    except BaseException:
+        stream.close()
+        raise
+    stream.close()
+    content = b"".join(chunks)
+    return content, SyncByteStream(iterator=buffered(content))
+
+
+class CoalescedRequest:
+    """
+    A request which identical requests are waiting on, rather than being sent.
+    `response` is set, with the body in memory, if it may be shared with them.
+    """
+
+    __slots__ = ("done", "response")
+
+    def __init__(self, done: SyncEvent) -> None:
+        self.done = done
+        self.response: Optional[Tuple[bytes, int, bytes, Headers, bytes]] = None
+
+
+class RequestBatch:
+    """
+    The requests passed to `request_many()`, which are sent by its workers
+    while the batch is open, and their responses as they complete.
+
+    A worker keeps taking requests for the origin it last sent to, so that it
+    reuses the connection which that request has just released. Once those
+    run out it moves on to the origin with the most requests still pending.
+
+    The workers run in a task group which is entered and exited along with the
+    batch, so that they never outlive the caller's `with` block. When it
+    exits no more requests are sent, and those already in flight are finished
+    rather than cancelled, since a connection cannot be reused after a request
+    on it is cancelled.
+    """
+
+    def __init__(
+        self,
+        requests: Iterable[Sequence[Any]],
+        backend: SyncBackend,
+        worker: Callable[["RequestBatch"], Any],
+        concurrency: int,
+    ):
+        self.pending: Dict[Origin, Deque[Tuple[int, Sequence[Any]]]] = {}
+        self.total = 0
+        for request in requests:
+            request = tuple(request)
+            origin = request[1][:3]
+            self.pending.setdefault(origin, deque()).append((self.total, request))
+            self.total += 1
+        self.completed: Deque[Tuple[int, Union[Response, Exception]]] = deque()
+        self.stopped = False
+        self.backend = backend
+        self.worker = worker
+        self.concurrency = concurrency
+        self.tasks: Optional[SyncTaskGroup] = None
+        self.ready: Optional[SyncEvent] = None
+        self.thread_lock = ThreadLock()
+
+    def __enter__(self) -> "RequestBatch":
+        self.tasks = self.backend.create_task_group()
+        self.tasks.__enter__()
+        for _ in range(min(self.concurrency, self.total)):
+            self.tasks.start_soon(self.worker, self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        self.stopped = True
+        if self.tasks is not None:
+            # Exited without the exception, so that requests which are still
+            # in flight are waited on rather than cancelled.
+            self.tasks.__exit__(None, None, None)
+
+    def __iter__(self) -> Iterator[Tuple[int, Response]]:
+        for _ in range(self.total):
+            index, result = self.next_response()
+            if isinstance(result, Exception):
+                self.stopped = True
+                raise result
+            yield index, result
+
+    def next_request(
+        self, origin: Optional[Origin]
+    ) -> Optional[Tuple[int, Sequence[Any]]]:
+        with self.thread_lock:
+            if self.stopped or not self.pending:
+                return None
+            if origin not in self.pending:
+                origin = max(self.pending, key=lambda key: len(self.pending[key]))
+            requests = self.pending[origin]
+            item = requests.popleft()
+            if not requests:
+                del self.pending[origin]
+            return item
+
+    def complete(self, index: int, result: Union[Response, Exception]) -> None:
+        self.completed.append((index, result))
+        if self.ready is not None:
+            self.ready.set()
+
+    def next_response(self) -> Tuple[int, Union[Response, Exception]]:
+        while not self.completed:
+            # A new event for each wait, which is checked again after it is
+            # created, in case a worker completed in the meantime.
+            self.ready = self.backend.create_event()
+            if self.completed:
+                break
+            self.ready.wait()
+        return self.completed.popleft()
+
+
+class HedgedRequest:
+    """
+    The attempts at sending a hedged request. The first response to arrive is
+    the one used, and any others are closed.
+    """
+
+    __slots__ = ("done", "attempts", "response", "errors", "abandoned", "thread_lock")
+
+    def __init__(self, done: SyncEvent) -> None:
+        self.done = done
+        self.attempts = 0
+        self.response: Optional[Response] = None
+        self.errors: List[Exception] = []
+        self.abandoned = False
+        self.thread_lock = ThreadLock()
+
+    def add_attempt(self) -> bool:
+        with self.thread_lock:
+            if self.done.is_set():
+                return False
+            self.attempts += 1
+            return True
+
+    def complete(self, result: Union[Response, Exception]) -> bool:
+        """
+        Record the outcome of an attempt, returning `True` if its response is
+        the one to use. Once every attempt has failed, the request has failed.
+        """
+        with self.thread_lock:
+            if isinstance(result, Exception):
+                self.errors.append(result)
+                if len(self.errors) == self.attempts:
+                    self.done.set()
+                return False
+            if self.response is not None or self.abandoned:
+                return False
+            self.response = result
+            self.done.set()
+            return True
+
+    def abandon(self) -> Optional[Response]:
+        """
+        Stop waiting on the request, returning any response which has already
+        arrived, and must be closed.
+        """
+        with self.thread_lock:
+            self.abandoned = True
+            return self.response
+
 
 class SyncConnectionPool(SyncHTTPTransport):
     """
@@ -72,7 +314,32 @@ class SyncConnectionPool(SyncHTTPTransport):
     to allow before closing keep-alive connections.
     * **keepalive_expiry** - `Optional[float]` - The maximum time to allow
     before closing a keep-alive connection.
-    * **http2** - `bool` - Enable HTTP/2 support.
+    * **http2** - `bool` - Enable HTTP/2 support. HTTP/2 requests with an
+    RFC 9218 `Priority: u=N` header are sent with a matching stream weight,
+    and uploads sharing a connection are scheduled by that weight.
+    * **profiler** - `Optional[Profiler]` - Collect call counts and timings
+    for the transport hot paths. Defaults to a process-wide profiler if the
+    `HTTPCORE_PROFILE` environment variable is set.
+    * **latencies** - `Optional[LatencyHistograms]` - Record per-origin
+    connect, time-to-first-byte, and total request latencies.
+    * **event_log** - `Optional[EventLog]` - Keep a bounded log of recent
+    connection events, for post-mortem debugging.
+    * **pipelining** - `Optional[int]` - Enable HTTP/1.1 pipelining, allowing up
+    to this many requests in flight on a single connection. Only idempotent
+    requests without a body are pipelined.
+    * **http2_prior_knowledge** - `Union[bool, Iterable[Tuple[bytes, bytes, int]]]` -
+    Use HTTP/2 over cleartext TCP for `http://` origins, without upgrading
+    from HTTP/1.1. Either `True` for all origins, or a collection of
+    (scheme, host, port) origins that are known to support it.
+    * **http2_settings** - `Optional[HTTP2Settings]` - Flow-control tuning
+    for HTTP/2 connections.
+    * **coalescing** - `Optional[CoalescingSettings]` - Send only one of any
+    identical `GET` or `HEAD` requests that are in flight at the same time,
+    and share its response with the others.
+    * **hedging** - `Optional[HedgingSettings]` - Send idempotent requests
+    again on another connection if they are slow to respond, and use
+    whichever response arrives first. If the delay is based on a percentile,
+    then latencies are recorded even if `latencies` is not set.
     """
 
     def __init__(
@@ -82,6 +349,14 @@ class SyncConnectionPool(SyncHTTPTransport):
         max_keepalive: int = None,
         keepalive_expiry: float = None,
         http2: bool = False,
+        profiler: Profiler = None,
+        latencies: LatencyHistograms = None,
+        event_log: EventLog = None,
+        pipelining: int = None,
+        http2_prior_knowledge: Union[bool, Iterable[Origin]] = False,
+        http2_settings: HTTP2Settings = None,
+        coalescing: CoalescingSettings = None,
+        hedging: HedgingSettings = None,
     ):
         self._ssl_context = SSLContext() if ssl_context is None else ssl_context
         self._max_connections = max_connections
@@ -92,6 +367,25 @@ class SyncConnectionPool(SyncHTTPTransport):
         self._thread_lock = ThreadLock()
         self._backend = SyncBackend()
         self._next_keepalive_check = 0.0
+        self._profiler = get_default_profiler() if profiler is None else profiler
+        self._latencies = latencies
+        self._event_log = event_log
+        self._pipelining = pipelining
+        self._http2_prior_knowledge: Union[bool, Set[Origin]] = (
+            http2_prior_knowledge
+            if isinstance(http2_prior_knowledge, bool)
+            else set(http2_prior_knowledge)
+        )
+        self._http2_settings = http2_settings
+        self._coalescing = coalescing
+        self._coalesced_requests: Dict[Hashable, CoalescedRequest] = {}
+        self._hedging = hedging
+        if hedging is not None and hedging.percentile is not None and latencies is None:
+            self._latencies = LatencyHistograms()
+
+        if self._profiler is not None:
+            self._profiler.instrument(self, "request")
+            self._profiler.instrument(self, "_get_connection_from_pool")
 
     @property
     def _connection_semaphore(self) -> SyncSemaphore:
@@ -115,43 +409,282 @@ class SyncConnectionPool(SyncHTTPTransport):
         stream: SyncByteStream = None,
         timeout: TimeoutDict = None,
     ) -> Tuple[bytes, int, bytes, Headers, SyncByteStream]:
+        if (
+            self._coalescing is not None
+            and method in (b"GET", b"HEAD")
+            and not has_body_headers(headers)
+        ):
+            return self._coalesced_request(method, url, headers, stream, timeout)
+        return self._send_request(method, url, headers, stream, timeout)
+
+    def _coalesced_request(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Optional[Headers],
+        stream: Optional[SyncByteStream],
+        timeout: Optional[TimeoutDict],
+    ) -> Response:
+        """
+        Send a request, unless an identical one is already in flight, in which
+        case wait for it and share its response.
+        """
+        assert self._coalescing is not None
+        key = self._coalescing.request_key(method, url, headers or [])
+        with self._thread_lock:
+            coalesced = self._coalesced_requests.get(key)
+            if coalesced is None:
+                coalesced = CoalescedRequest(self._backend.create_event())
+                self._coalesced_requests[key] = coalesced
+                is_waiting = False
+            else:
+                is_waiting = True
+
+        if is_waiting:
+            coalesced.done.wait()
+            if coalesced.response is None:
+                # The request failed, or its response was too large to share.
+                return self._send_request(method, url, headers, stream, timeout)
+            shared = coalesced.response
+            stream = SyncByteStream(iterator=buffered(shared[4]))
+            return shared[0], shared[1], shared[2], list(shared[3]), stream
+
+        try:
+            response = self._send_request(method, url, headers, stream, timeout)
+            content, stream = read_up_to(response, self._coalescing.max_body_size)
+            if content is not None:
+                coalesced.response = response[:4] + (content,)
+            return response[0], response[1], response[2], response[3], stream
+        finally:
+            with self._thread_lock:
+                del self._coalesced_requests[key]
+            coalesced.done.set()
+
+    def _send_request(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Optional[Headers],
+        stream: Optional[SyncByteStream],
+        timeout: Optional[TimeoutDict],
+    ) -> Response:
+        if (
+            self._hedging is not None
+            and method in IDEMPOTENT_METHODS
+            and not has_body_headers(headers)
+        ):
+            return self._hedged_request(method, url, headers, stream, timeout)
+        return self._send_on_connection(method, url, headers, stream, timeout)
+
+    def _hedged_request(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Optional[Headers],
+        stream: Optional[SyncByteStream],
+        timeout: Optional[TimeoutDict],
+    ) -> Response:
+        """
+        Send a request, and if it has not been responded to within the hedging
+        delay, send it again on another connection. Both are sent by background
+        tasks, so that the slower one may be closed once it has a response,
+        without being waited on.
+
+        The first attempt is not sent inline, because the caller could then
+        only return a faster second response once the first had finished, and
+        cancelling it instead would leave its connection unusable. The cost is
+        a task for every hedged request, which is a thread on the sync backend,
+        and is why hedging only applies to pools which enable it.
+        """
+        hedged = HedgedRequest(self._backend.create_event())
+        args = (hedged, method, url, headers, stream, timeout)
+        hedged.add_attempt()
+        self._backend.start_background_task(self._hedged_attempt, *args, True)
+        try:
+            if not hedged.done.wait(self._hedging_delay(url[:3])):
+                if hedged.add_attempt():
+                    self._backend.start_background_task(
+                        self._hedged_attempt, *args, False
+                    )
+                hedged.done.wait()
+        except BaseException:
+            response = hedged.abandon()
+            if response is not None:
+                self._backend.start_background_task(response[4].close)
+            raise
+
+        if hedged.response is None:
+            raise hedged.errors[0]
+        return hedged.response
+
+    def _hedged_attempt(
+        self,
+        hedged: HedgedRequest,
+        method: bytes,
+        url: URL,
+        headers: Optional[Headers],
+        stream: Optional[SyncByteStream],
+        timeout: Optional[TimeoutDict],
+        can_share: bool,
+    ) -> None:
+        try:
+            response = self._send_on_connection(
+                method, url, headers, stream, timeout, can_share=can_share
+            )
+        except Exception as exc:
+            hedged.complete(exc)
+            return
+        if not hedged.complete(response):
+            try:
+                response[4].close()
+            except Exception:
+                pass
+
+    def _hedging_delay(self, origin: Origin) -> float:
+        assert self._hedging is not None
+        if self._hedging.percentile is not None and self._latencies is not None:
+            ttfb = self._latencies.get(origin)["ttfb"]
+            if len(ttfb) >= self._hedging.min_samples:
+                return ttfb.percentile(self._hedging.percentile)
+        return self._hedging.delay
+
+    def _send_on_connection(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Optional[Headers],
+        stream: Optional[SyncByteStream],
+        timeout: Optional[TimeoutDict],
+        can_share: bool = True,
+    ) -> Response:
+        """
+        Send a request on a connection from the pool, or a new one. Unless
+        `can_share` is set, connections which are already in use are not
+        shared with the request, by HTTP/2 multiplexing or pipelining.
+        """
         timeout = {} if timeout is None else timeout
         origin = url[:3]
 
         if self._keepalive_expiry is not None:
             self._keepalive_sweep()
 
+        if self._latencies is not None:
+            started = self._backend.time()
+
+        can_pipeline = (
+            can_share
+            and self._pipelining is not None
+            and method in IDEMPOTENT_METHODS
+            and not has_body_headers(headers)
+        )
+
         connection: Optional[SyncHTTPConnection] = None
         while connection is None:
-            connection = self._get_connection_from_pool(origin)
+            connection = self._get_connection_from_pool(
+                origin, can_pipeline=can_pipeline, can_share=can_share
+            )
+            is_new_connection = connection is None
 
             if connection is None:
                 connection = SyncHTTPConnection(
-                    origin=origin, http2=self._http2, ssl_context=self._ssl_context,
+                    origin=origin,
+                    http2=self._http2,
+                    ssl_context=self._ssl_context,
+                    profiler=self._profiler,
+                    event_log=self._event_log,
+                    pipelining=self._pipelining,
+                    http2_prior_knowledge=self._uses_prior_knowledge(origin),
+                    http2_settings=self._http2_settings,
                 )
                 self._add_to_pool(connection, timeout=timeout)
 
+            if self._latencies is not None:
+                sent = self._backend.time()
+
             try:
                 response = connection.request(
                     method, url, headers=headers, stream=stream, timeout=timeout
                 )
             except NewConnectionRequired:
+                if connection.state == ConnectionState.CLOSED:
+                    self._remove_from_pool(connection)
                 connection = None
-            except Exception:
+            except Exception as exc:
+                if self._event_log is not None:
+                    self._event_log.record_error(connection, exc)
                 self._remove_from_pool(connection)
                 raise
 
+        if self._event_log is not None:
+            self._event_log.record_state(connection)
+            self._event_log.record(connection, "request", f"{method!r} {url[3]!r}")
+
+        callback = self._response_closed
+        if self._latencies is not None:
+            callback = self._record_latencies(
+                origin, connection, started, sent, is_new_connection
+            )
+
         wrapped_stream = ResponseByteStream(
-            response[4], connection=connection, callback=self._response_closed
+            response[4], connection=connection, callback=callback
         )
         return response[0], response[1], response[2], response[3], wrapped_stream
 
+    def request_many(
+        self,
+        requests: Iterable[Sequence[Any]],
+        concurrency: int = 10,
+        timeout: TimeoutDict = None,
+    ) -> RequestBatch:
+        """
+        Send a batch of requests, with at most `concurrency` of them in flight
+        at once, and iterate over each `(index, response)` as it completes:
+
+            with http.request_many(requests) as responses:
+                for index, response in responses:
+                    ...
+
+        Each request is a sequence of the positional arguments to `request()`,
+        such as `(method, url, headers)`, or a `RequestTemplate`. Requests for
+        the same origin are kept together, so that each worker reuses its
+        keep-alive connection, or shares an HTTP/2 connection with the others.
+
+        Response bodies are read in full before they are returned, which frees
+        up their connection for the next request straight away. No more
+        requests are sent once the `with` block exits, or once a request
+        fails, in which case its exception is raised. Either way, the block
+        waits for any requests already in flight to finish before it exits.
+        """
+        worker = functools.partial(self._batch_worker, timeout=timeout)
+        return RequestBatch(requests, self._backend, worker, concurrency)
+
+    def _batch_worker(
+        self, batch: RequestBatch, timeout: Optional[TimeoutDict]
+    ) -> None:
+        origin: Optional[Origin] = None
+        while True:
+            item = batch.next_request(origin)
+            if item is None:
+                return
+            index, request = item
+            arguments = dict(zip(("method", "url", "headers", "stream"), request))
+            origin = request[1][:3]
+            try:
+                response = self.request(**arguments, timeout=timeout)
+                content = response[4].read()
+            except Exception as exc:
+                batch.complete(index, exc)
+                return
+            stream = SyncByteStream(iterator=buffered(content))
+            batch.complete(index, response[:4] + (stream,))
+
     def _get_connection_from_pool(
-        self, origin: Origin
+        self, origin: Origin, can_pipeline: bool = False, can_share: bool = True
     ) -> Optional[SyncHTTPConnection]:
         # Determine expired keep alive connections on this origin.
         seen_http11 = False
         pending_connection = None
+        pipeline_connection = None
         reuse_connection = None
         connections_to_close = set()
 
@@ -163,15 +696,25 @@ class SyncConnectionPool(SyncHTTPTransport):
                 if connection.is_connection_dropped():
                     # IDLE connections that have been dropped should be
                     # removed from the pool.
+                    if self._event_log is not None:
+                        self._event_log.record(connection, "dropped")
                     connections_to_close.add(connection)
                     self._remove_from_pool(connection)
                 else:
                     # IDLE connections that are still maintained may
                     # be reused.
                     reuse_connection = connection
-            elif connection.state == ConnectionState.ACTIVE and connection.is_http2:
+            elif (
+                can_share
+                and connection.state == ConnectionState.ACTIVE
+                and connection.is_http2
+            ):
                 # HTTP/2 connections may be reused.
                 reuse_connection = connection
+            elif can_pipeline and connection.is_pipelining_available():
+                # Active HTTP/1.1 connections may have requests pipelined
+                # onto them, if we do not have an idle connection.
+                pipeline_connection = connection
             elif connection.state == ConnectionState.PENDING:
                 # Pending connections may potentially be reused.
                 pending_connection = connection
@@ -181,7 +724,16 @@ class SyncConnectionPool(SyncHTTPTransport):
             # that if it is HTTP/1.1 then it should not be re-acquired.
             reuse_connection.mark_as_ready()
             reuse_connection.expires_at = None
-        elif self._http2 and pending_connection is not None and not seen_http11:
+            if self._event_log is not None:
+                self._event_log.record_state(reuse_connection)
+        elif pipeline_connection is not None:
+            reuse_connection = pipeline_connection
+        elif (
+            can_share
+            and (self._http2 or self._uses_prior_knowledge(origin))
+            and pending_connection is not None
+            and not seen_http11
+        ):
             # If we have a PENDING connection, and no HTTP/1.1 connections
             # on this origin, then we can attempt to share the connection.
             reuse_connection = pending_connection
@@ -192,10 +744,21 @@ class SyncConnectionPool(SyncHTTPTransport):
 
         return reuse_connection
 
+    def _uses_prior_knowledge(self, origin: Origin) -> bool:
+        if origin[0] != b"http":
+            return False
+        elif isinstance(self._http2_prior_knowledge, bool):
+            return self._http2_prior_knowledge
+        return origin in self._http2_prior_knowledge
+
     def _response_closed(self, connection: SyncHTTPConnection) -> None:
         remove_from_pool = False
         close_connection = False
 
+        if self._event_log is not None:
+            self._event_log.record(connection, "response_closed")
+            self._event_log.record_state(connection)
+
         if connection.state == ConnectionState.CLOSED:
             remove_from_pool = True
         elif connection.state == ConnectionState.IDLE:
@@ -206,6 +769,8 @@ class SyncConnectionPool(SyncHTTPTransport):
             ):
                 remove_from_pool = True
                 close_connection = True
+                if self._event_log is not None:
+                    self._event_log.record(connection, "max_keepalive_exceeded")
             elif self._keepalive_expiry is not None:
                 now = self._backend.time()
                 connection.expires_at = now + self._keepalive_expiry
@@ -216,6 +781,34 @@ class SyncConnectionPool(SyncHTTPTransport):
         if close_connection:
             connection.close()
 
+    def _record_latencies(
+        self,
+        origin: Origin,
+        connection: SyncHTTPConnection,
+        started: float,
+        sent: float,
+        is_new_connection: bool,
+    ) -> Callable:
+        """
+        Record the connect and time-to-first-byte latencies for a response,
+        and return a close callback that records its total latency.
+        """
+        assert self._latencies is not None
+        ttfb = self._backend.time() - sent
+        if is_new_connection and connection.connect_time is not None:
+            self._latencies.record(origin, "connect", connection.connect_time)
+            ttfb -= connection.connect_time
+        self._latencies.record(origin, "ttfb", ttfb)
+        return functools.partial(self._timed_response_closed, origin, started)
+
+    def _timed_response_closed(
+        self, origin: Origin, started: float, connection: SyncHTTPConnection
+    ) -> None:
+        assert self._latencies is not None
+        total = self._backend.time() - started
+        self._latencies.record(origin, "total", total)
+        self._response_closed(connection)
+
     def _keepalive_sweep(self) -> None:
         """
         Remove any IDLE connections that have expired past their keep-alive time.
@@ -235,6 +828,8 @@ class SyncConnectionPool(SyncHTTPTransport):
                 and connection.expires_at is not None
                 and now > connection.expires_at
             ):
+                if self._event_log is not None:
+                    self._event_log.record(connection, "keepalive_expired")
                 connections_to_close.add(connection)
                 self._remove_from_pool(connection)
 
@@ -259,6 +854,10 @@ class SyncConnectionPool(SyncHTTPTransport):
                 if not self._connections[connection.origin]:
                     del self._connections[connection.origin]
 
+                if self._event_log is not None:
+                    self._event_log.record(connection, "removed_from_pool")
+                    self._event_log.forget(connection)
+
     def _connections_for_origin(self, origin: Origin) -> Set[SyncHTTPConnection]:
         return set(self._connections.get(origin, set()))
 
@@ -1,12 +1,30 @@
+import functools
+from collections import deque
 from ssl import SSLContext
-from typing import Iterator, List, Tuple, Union
+from typing import Iterator, Deque, List, Optional, Tuple, Union
 
 import h11
 
-from .._backends.auto import SyncSocketStream
-from .._exceptions import ProtocolError, map_exceptions
+from .._backends.auto import SyncEvent, SyncLock, SyncSocketStream, SyncBackend
+from .._exceptions import (
+    NetworkError,
+    ProtocolError,
+    ReadTimeout,
+    ResponseTooLarge,
+    map_exceptions,
+)
+from .._templates import PreparedHeaders
 from .._types import URL, Headers, TimeoutDict
-from .base import SyncByteStream, SyncHTTPTransport, ConnectionState
+from .base import (
+    IDEMPOTENT_METHODS,
+    SyncByteStream,
+    SyncFileByteStream,
+    SyncHTTPTransport,
+    ConnectionState,
+    FileSlice,
+    NewConnectionRequired,
+    has_body_headers,
+)
 
 H11Event = Union[
     h11.Request,
@@ -18,8 +36,53 @@ H11Event = Union[
 ]
 
 
+def build_request_event(method: bytes, url: URL, headers: Headers) -> h11.Request:
+    """
+    Return the `h11` event for a request, reusing the one already validated by
+    a `RequestTemplate` where it matches.
+    """
+    _scheme, _host, _port, target = url
+    if isinstance(headers, PreparedHeaders):
+        event = headers.h11_request
+        if event.method == method and event.target == target:
+            return event
+    return h11.Request(method=method, target=target, headers=headers)
+
+
+def iter_request_body(
+    stream: SyncByteStream, slice_size: int
+) -> Iterator[Union[bytes, FileSlice]]:
+    """
+    Iterate over a request body, as regions of the file if it is file-backed,
+    so that those can be sent with `sendfile()`.
+    """
+    if isinstance(stream, SyncFileByteStream):
+        for file_slice in stream.iter_slices(slice_size):
+            yield file_slice
+    else:
+        for chunk in stream:
+            yield chunk
+
+
+def expects_continue(headers: Headers) -> bool:
+    for key, value in headers:
+        if key.lower() == b"expect":
+            return value.strip().lower() == b"100-continue"
+    return False
+
+
 class SyncHTTP11Connection(SyncHTTPTransport):
+    __slots__ = ("socket", "ssl_context", "h11_state", "state", "is_reused", "__dict__")
+
     READ_NUM_BYTES = 4096
+    # Response bodies are read in larger pieces, to cut the per-read overhead
+    # of large downloads.
+    BODY_READ_NUM_BYTES = 65536
+    # File-backed request bodies are sent in slices of this size, so that the
+    # write timeout applies to each slice, rather than to the whole file.
+    SENDFILE_SLICE_SIZE = 1024 * 1024
+    # How long to wait for a `100 Continue` before sending the body anyway.
+    EXPECT_CONTINUE_TIMEOUT = 1.0
 
     def __init__(
         self, socket: SyncSocketStream, ssl_context: SSLContext = None,
@@ -30,6 +93,8 @@ class SyncHTTP11Connection(SyncHTTPTransport):
         self.h11_state = h11.Connection(our_role=h11.CLIENT)
 
         self.state = ConnectionState.ACTIVE
+        # Set once a response has completed, and the connection kept alive.
+        self.is_reused = False
 
     def mark_as_ready(self) -> None:
         if self.state == ConnectionState.IDLE:
@@ -49,17 +114,43 @@ class SyncHTTP11Connection(SyncHTTPTransport):
 
         self.state = ConnectionState.ACTIVE
 
-        self._send_request(method, url, headers, timeout)
-        self._send_request_body(stream, timeout)
-        (
-            http_version,
-            status_code,
-            reason_phrase,
-            headers,
-        ) = self._receive_response(timeout)
+        headers_sent = False
+        try:
+            self._send_request(method, url, headers, timeout)
+            headers_sent = True
+            early_response = None
+            if expects_continue(headers):
+                early_response = self._wait_for_continue(timeout)
+            if early_response is None:
+                early_response = self._send_request_body(stream, timeout)
+            (
+                http_version,
+                status_code,
+                reason_phrase,
+                headers,
+            ) = self._receive_response(timeout, early_response)
+        except (NetworkError, ProtocolError):
+            # A kept-alive connection may have been closed by the server while
+            # it was idle. If no part of the response was received, then the
+            # request can be resent on another connection, so long as it is
+            # idempotent, or the server cannot have seen all of its headers.
+            # https://tools.ietf.org/html/rfc7230#section-6.3.1
+            retry = (
+                self.is_reused
+                and not self.h11_state.trailing_data[0]
+                and (
+                    not headers_sent
+                    or (method in IDEMPOTENT_METHODS and not has_body_headers(headers))
+                )
+            )
+            if retry:
+                self.close()
+                raise NewConnectionRequired()
+            raise
         stream = SyncByteStream(
             iterator=self._receive_response_data(timeout),
             close_func=self._response_closed,
+            read_func=functools.partial(self._read_response_body, timeout),
         )
         return (http_version, status_code, reason_phrase, headers, stream)
 
@@ -73,24 +164,37 @@ class SyncHTTP11Connection(SyncHTTPTransport):
         """
         Send the request line and headers.
         """
-        _scheme, _host, _port, target = url
-        event = h11.Request(method=method, target=target, headers=headers)
+        event = build_request_event(method, url, headers)
         self._send_event(event, timeout)
 
     def _send_request_body(
         self, stream: SyncByteStream, timeout: TimeoutDict
-    ) -> None:
+    ) -> Optional[h11.Response]:
         """
-        Send the request body.
+        Send the request body, while watching for an early response from the
+        server. If the server responds with an error before the body has been
+        sent, then stop sending it, and return the response.
+        https://tools.ietf.org/html/rfc7230#section-6.5
         """
+        response = None
+
         # Send the request body.
-        for chunk in stream:
-            event = h11.Data(data=chunk)
-            self._send_event(event, timeout)
+        for chunk in iter_request_body(stream, self.SENDFILE_SLICE_SIZE):
+            if response is None and chunk:
+                response = self._receive_early_response()
+                if response is not None and response.status_code >= 400:
+                    # The connection is closed once the response has been read.
+                    return response
+            if isinstance(chunk, FileSlice):
+                self._send_file_slice(chunk, timeout)
+            else:
+                event = h11.Data(data=chunk)
+                self._send_event(event, timeout)
 
         # Finalize sending the request.
         event = h11.EndOfMessage()
         self._send_event(event, timeout)
+        return response
 
     def _send_event(self, event: H11Event, timeout: TimeoutDict) -> None:
         """
@@ -100,19 +204,79 @@ class SyncHTTP11Connection(SyncHTTPTransport):
         bytes_to_send = self.h11_state.send(event)
         self.socket.write(bytes_to_send, timeout)
 
+    def _send_file_slice(
+        self, file_slice: FileSlice, timeout: TimeoutDict
+    ) -> None:
+        """
+        Send a region of a file as request data, along with any framing that
+        `h11` adds around it.
+        https://h11.readthedocs.io/en/latest/api.html#support-for-sendfile
+        """
+        event = h11.Data(data=file_slice)  # type: ignore
+        for data in self.h11_state.send_with_data_passthrough(event) or []:
+            if isinstance(data, FileSlice):
+                self.socket.sendfile(data.file, data.offset, data.count, timeout)
+            else:
+                self.socket.write(data, timeout)
+
     def _receive_response(
-        self, timeout: TimeoutDict
+        self, timeout: TimeoutDict, event: Optional[h11.Response] = None
     ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]]]:
         """
-        Read the response status and headers from the network.
+        Read the response status and headers from the network, unless they
+        have already been received.
         """
-        while True:
-            event = self._receive_event(timeout)
-            if isinstance(event, h11.Response):
-                break
+        while event is None:
+            received = self._receive_event(timeout)
+            if isinstance(received, h11.Response):
+                event = received
         http_version = b"HTTP/" + event.http_version
         return http_version, event.status_code, event.reason, event.headers
 
+    def _wait_for_continue(self, timeout: TimeoutDict) -> Optional[h11.Response]:
+        """
+        Wait for the server to accept the request body with `100 Continue`,
+        returning `None`, or to reject it early with a final response. If the
+        server sends neither before `EXPECT_CONTINUE_TIMEOUT`, then we assume
+        it doesn't support `Expect: 100-continue`, and send the body anyway.
+        https://tools.ietf.org/html/rfc7231#section-5.1.1
+        """
+        read_timeout = timeout.get("read")
+        if read_timeout is None or read_timeout > self.EXPECT_CONTINUE_TIMEOUT:
+            read_timeout = self.EXPECT_CONTINUE_TIMEOUT
+        continue_timeout = dict(timeout, read=read_timeout)
+
+        while True:
+            try:
+                event = self._receive_event(continue_timeout)
+            except ReadTimeout:
+                return None
+            if isinstance(event, h11.InformationalResponse):
+                if event.status_code == 100:
+                    return None
+            elif isinstance(event, h11.Response):
+                # The body will not be sent, so the connection is closed once
+                # the response has been read.
+                return event
+
+    def _receive_early_response(self) -> Optional[h11.Response]:
+        """
+        Read any data that the server has already sent, while the request body
+        is being sent, returning the response once its head has been received.
+        """
+        data = self.socket.read_available(self.READ_NUM_BYTES)
+        if data is None:
+            return None
+        self.h11_state.receive_data(data)
+        while True:
+            with map_exceptions({h11.RemoteProtocolError: ProtocolError}):
+                event = self.h11_state.next_event()
+
+            if isinstance(event, h11.Response):
+                return event
+            elif event is h11.NEED_DATA:
+                return None
+
     def _receive_response_data(
         self, timeout: TimeoutDict
     ) -> Iterator[bytes]:
@@ -120,22 +284,49 @@ class SyncHTTP11Connection(SyncHTTPTransport):
         Read the response data from the network.
         """
         while True:
-            event = self._receive_event(timeout)
+            event = self._receive_event(timeout, self.BODY_READ_NUM_BYTES)
             if isinstance(event, h11.Data):
                 yield bytes(event.data)
             elif isinstance(event, (h11.EndOfMessage, h11.PAUSED)):
                 break
 
-    def _receive_event(self, timeout: TimeoutDict) -> H11Event:
+    def _read_response_body(
+        self, timeout: TimeoutDict, max_size: int = None
+    ) -> bytes:
+        """
+        Read the whole response body straight from the `h11` events, rather
+        than iterating over it.
+        """
+        body = []
+        size = 0
+        while True:
+            event = self._receive_event(timeout, self.BODY_READ_NUM_BYTES)
+            if isinstance(event, h11.Data):
+                size += len(event.data)
+                if max_size is not None and size > max_size:
+                    raise ResponseTooLarge(
+                        f"Response body is larger than {max_size} bytes"
+                    )
+                body.append(event.data)
+            elif isinstance(event, (h11.EndOfMessage, h11.PAUSED)):
+                break
+        return b"".join(body)
+
+    def _receive_event(
+        self, timeout: TimeoutDict, read_num_bytes: int = None
+    ) -> H11Event:
         """
         Read a single `h11` event, reading more data from the network if needed.
         """
+        if read_num_bytes is None:
+            read_num_bytes = self.READ_NUM_BYTES
+
         while True:
             with map_exceptions({h11.RemoteProtocolError: ProtocolError}):
                 event = self.h11_state.next_event()
 
             if event is h11.NEED_DATA:
-                data = self.socket.read(self.READ_NUM_BYTES, timeout)
+                data = self.socket.read(read_num_bytes, timeout)
                 self.h11_state.receive_data(data)
             else:
                 assert event is not h11.NEED_DATA
@@ -149,6 +340,7 @@ class SyncHTTP11Connection(SyncHTTPTransport):
         ):
             self.h11_state.start_next_cycle()
             self.state = ConnectionState.IDLE
+            self.is_reused = True
         else:
             self.close()
 
@@ -164,3 +356,249 @@ class SyncHTTP11Connection(SyncHTTPTransport):
 
     def is_connection_dropped(self) -> bool:
         return self.socket.is_connection_dropped()
+
+
+class PipelinedRequest:
+    __slots__ = ("h11_state", "turn", "method", "has_body")
+
+    def __init__(
+        self, h11_state: h11.Connection, turn: SyncEvent, method: bytes, has_body: bool
+    ) -> None:
+        # Each pipelined request has its own `h11` state, which is used to
+        # serialize the request, and then to parse the matching response.
+        self.h11_state = h11_state
+        # Set once all earlier responses on the connection have been read.
+        self.turn = turn
+        self.method = method
+        self.has_body = has_body
+
+    @property
+    def can_pipeline_behind(self) -> bool:
+        # Requests must not be pipelined behind a non-idempotent request, and
+        # would otherwise wait for a request body to finish uploading.
+        # https://tools.ietf.org/html/rfc7230#section-6.3.2
+        return self.method in IDEMPOTENT_METHODS and not self.has_body
+
+
+class SyncHTTP11PipelinedConnection(SyncHTTP11Connection):
+    """
+    An HTTP/1.1 connection that allows bodyless idempotent requests to be
+    written while earlier requests are still in flight.
+
+    Responses are read strictly in the order that requests were sent. If the
+    connection is closed before a pipelined request has received any part of
+    its response, that request raises `NewConnectionRequired`, so that the
+    connection pool resends it on another connection. The same applies to an
+    idempotent request at the head of the pipeline, since the server may
+    have reset the connection in response to the requests written behind it.
+    """
+
+    __slots__ = (
+        "backend",
+        "max_pipelined",
+        "pipeline",
+        "trailing_data",
+        "will_close",
+        "has_pipelined",
+        "_send_lock",
+    )
+
+    def __init__(
+        self,
+        socket: SyncSocketStream,
+        backend: SyncBackend,
+        ssl_context: SSLContext = None,
+        max_pipelined: int = 2,
+    ):
+        super().__init__(socket=socket, ssl_context=ssl_context)
+        self.backend = backend
+        self.max_pipelined = max_pipelined
+        self.pipeline: Deque[PipelinedRequest] = deque()
+        # Any data received past the end of the most recent response.
+        self.trailing_data = b""
+        self.will_close = False
+        # Set once any request has been written behind another.
+        self.has_pipelined = False
+        self._send_lock: Optional[SyncLock] = None
+
+    @property
+    def send_lock(self) -> SyncLock:
+        # We do this lazily, to make sure backend autodetection always
+        # runs within an async context.
+        if self._send_lock is None:
+            self._send_lock = self.backend.create_lock()
+        return self._send_lock
+
+    def is_pipelining_available(self) -> bool:
+        return (
+            self.state == ConnectionState.ACTIVE
+            and not self.will_close
+            and len(self.pipeline) < self.max_pipelined
+            and all(entry.can_pipeline_behind for entry in self.pipeline)
+        )
+
+    def request(
+        self,
+        method: bytes,
+        url: URL,
+        headers: Headers = None,
+        stream: SyncByteStream = None,
+        timeout: TimeoutDict = None,
+    ) -> Tuple[bytes, int, bytes, List[Tuple[bytes, bytes]], SyncByteStream]:
+        headers = [] if headers is None else headers
+        stream = SyncByteStream() if stream is None else stream
+        timeout = {} if timeout is None else timeout
+
+        with self.send_lock:
+            if self.state == ConnectionState.CLOSED or (
+                self.pipeline and not self.is_pipelining_available()
+            ):
+                raise NewConnectionRequired()
+
+            entry = PipelinedRequest(
+                h11.Connection(our_role=h11.CLIENT),
+                self.backend.create_event(),
+                method,
+                has_body_headers(headers),
+            )
+            is_pipelined = bool(self.pipeline)
+            self.has_pipelined = self.has_pipelined or is_pipelined
+            self.pipeline.append(entry)
+            self.state = ConnectionState.ACTIVE
+            if not is_pipelined:
+                self._start_response(entry)
+
+            try:
+                self._send_pipelined_request(
+                    entry.h11_state, method, url, headers, stream, timeout
+                )
+            except NetworkError:
+                self.close()
+                if is_pipelined:
+                    # The server closed the connection behind an earlier
+                    # response, so the request can be resent elsewhere.
+                    raise NewConnectionRequired()
+                raise
+            except BaseException:
+                self.close()
+                raise
+
+        if is_pipelined:
+            try:
+                # Bounded by the read timeout, since a caller that never closes
+                # an earlier response would otherwise hold up every request
+                # pipelined behind it.
+                if not entry.turn.wait(timeout.get("read")):
+                    raise ReadTimeout("Timed out waiting for an earlier response")
+            except BaseException:
+                self.close()
+                raise
+            if not self.pipeline or self.pipeline[0] is not entry:
+                # The connection closed before we got a response.
+                raise NewConnectionRequired()
+
+        try:
+            (
+                http_version,
+                status_code,
+                reason_phrase,
+                headers,
+            ) = self._receive_response(timeout)
+        except (NetworkError, ProtocolError):
+            # If no part of the response was received, and other requests
+            # were pipelined onto the connection, then the server may have
+            # closed or reset it before handling this request. Idempotent
+            # requests can then safely be resent on another connection.
+            retry = (
+                self.has_pipelined
+                and entry.h11_state.their_state is h11.SEND_RESPONSE
+                and method in IDEMPOTENT_METHODS
+                and not has_body_headers(headers)
+            )
+            self.close()
+            if retry:
+                raise NewConnectionRequired()
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+        stream = SyncByteStream(
+            iterator=self._receive_response_data(timeout),
+            close_func=self._response_closed,
+            read_func=functools.partial(self._read_response_body, timeout),
+        )
+        return (http_version, status_code, reason_phrase, headers, stream)
+
+    def _send_pipelined_request(
+        self,
+        h11_state: h11.Connection,
+        method: bytes,
+        url: URL,
+        headers: Headers,
+        stream: SyncByteStream,
+        timeout: TimeoutDict,
+    ) -> None:
+        """
+        Send the request line, headers and body, using the `h11` state of
+        this particular request.
+        """
+        event = build_request_event(method, url, headers)
+        data = self._serialize(h11_state, event)
+        for chunk in stream:
+            data += self._serialize(h11_state, h11.Data(data=chunk))
+            if len(data) >= self.READ_NUM_BYTES:
+                self.socket.write(data, timeout)
+                data = b""
+        data += self._serialize(h11_state, h11.EndOfMessage())
+        self.socket.write(data, timeout)
+
+        if h11_state.our_state is h11.MUST_CLOSE:
+            self.will_close = True
+
+    def _serialize(self, h11_state: h11.Connection, event: H11Event) -> bytes:
+        data = h11_state.send(event)
+        assert data is not None
+        return data
+
+    def _start_response(self, entry: PipelinedRequest) -> None:
+        """
+        Make `entry` the request whose response is read next.
+        """
+        self.h11_state = entry.h11_state
+        if self.trailing_data:
+            self.h11_state.receive_data(self.trailing_data)
+            self.trailing_data = b""
+        entry.turn.set()
+
+    def _response_closed(self) -> None:
+        if self.state == ConnectionState.CLOSED:
+            return
+
+        if (
+            self.h11_state.our_state is h11.DONE
+            and self.h11_state.their_state is h11.DONE
+        ):
+            trailing_data, closed = self.h11_state.trailing_data
+            if closed:
+                self.close()
+                return
+
+            self.pipeline.popleft()
+            self.trailing_data = trailing_data
+            if self.pipeline:
+                self._start_response(self.pipeline[0])
+            else:
+                self.state = ConnectionState.IDLE
+        else:
+            self.will_close = True
+            self.close()
+
+    def close(self) -> None:
+        # Wake any pipelined requests that are waiting for a response, so
+        # that they can be resent on another connection.
+        waiting = list(self.pipeline)
+        self.pipeline.clear()
+        for entry in waiting:
+            entry.turn.set()
+        super().close()
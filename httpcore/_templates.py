@@ -0,0 +1,62 @@
+from typing import Any, Iterator, Optional, Tuple
+
+import h11
+
+from ._types import URL, Headers
+
+
+class PreparedHeaders(list):
+    """
+    Request headers which have already been validated, along with the `h11`
+    request event built from them. HTTP/1.1 connections send that event as-is,
+    rather than validating the headers again, and HTTP/2 connections cache
+    their own header block here on first use.
+
+    Must not be modified once created, or the cached events will be stale.
+    """
+
+    __slots__ = ("h11_request", "h2_request")
+
+    def __init__(self, method: bytes, url: URL, headers: Headers) -> None:
+        super().__init__(headers)
+        _scheme, _host, _port, target = url
+        self.h11_request = h11.Request(method=method, target=target, headers=headers)
+        # Set by HTTP/2 connections to `((method, url), header_block, ...)`.
+        self.h2_request: Optional[Tuple[Any, ...]] = None
+
+
+class RequestTemplate:
+    """
+    A request method, URL and headers which are validated once and prepared
+    for sending many times, such as a polling request or an API call that is
+    repeated with different bodies.
+
+    Unpacks into the arguments of `request()`:
+
+    ```python
+    template = httpcore.RequestTemplate(b"GET", url, headers)
+    response = await http.request(*template, stream=stream, timeout=timeout)
+    ```
+
+    **Parameters:**
+
+    * **method** - `bytes` - The HTTP method, such as `b'GET'`.
+    * **url** - `Tuple[bytes, bytes, Optional[int], bytes]` - The URL as a
+    4-tuple of (scheme, host, port, path).
+    * **headers** - `Optional[List[Tuple[bytes, bytes]]]` - Any HTTP headers
+    to send with the request.
+    """
+
+    __slots__ = ("method", "url", "headers")
+
+    def __init__(self, method: bytes, url: URL, headers: Headers = None) -> None:
+        headers = [] if headers is None else headers
+        self.method = method
+        self.url = url
+        self.headers = PreparedHeaders(method, url, headers)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self.method, self.url, self.headers))
+
+    def __repr__(self) -> str:
+        return f"<RequestTemplate [{self.method!r} {self.url!r}]>"
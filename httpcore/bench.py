@@ -0,0 +1,402 @@
+"""
+A small load generator for validating connection pool settings.
+
+Usage:
+
+    python -m httpcore.bench http://127.0.0.1:8000/ -n 10000 -c 50 --http2
+
+Requests are issued by `--concurrency` workers, either as tasks on an async
+backend, or as threads sharing a `SyncConnectionPool` when `--sync` is used.
+If `--rps` is given, request start times are paced to that target rate and
+latencies are measured from the scheduled start time, so that a stalled
+server is not hidden by workers simply issuing fewer requests.
+
+With `--memory`, `--concurrency` requests are instead held open at once, to
+report the memory allocated per in-flight request and per idle connection.
+"""
+import argparse
+import bisect
+import math
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+from urllib.parse import urlsplit
+
+from ._async.connection_pool import AsyncConnectionPool
+from ._sync.connection_pool import SyncConnectionPool
+from ._types import URL, Headers
+
+
+def parse_url(url: str) -> URL:
+    split = urlsplit(url)
+    if split.scheme not in ("http", "https") or not split.hostname:
+        raise ValueError(f"Invalid URL {url!r}")
+    default_port = {"http": 80, "https": 443}[split.scheme]
+    target = split.path or "/"
+    if split.query:
+        target += "?" + split.query
+    return (
+        split.scheme.encode("ascii"),
+        split.hostname.encode("ascii"),
+        split.port or default_port,
+        target.encode("ascii"),
+    )
+
+
+class Results:
+    """
+    Collects per-request latencies and errors from all workers.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[int, int] = {}
+        self.started = 0.0
+        self.finished = 0.0
+        self._lock = threading.Lock()
+
+    def add_response(self, status_code: int, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def add_error(self, exc: Exception) -> None:
+        with self._lock:
+            name = type(exc).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def percentile(self, sorted_latencies: List[float], percent: float) -> float:
+        index = max(0, math.ceil(len(sorted_latencies) * percent / 100.0) - 1)
+        return sorted_latencies[index]
+
+    def report(self, file: TextIO) -> None:
+        duration = self.finished - self.started
+        completed = len(self.latencies)
+        total_errors = sum(self.errors.values())
+
+        total = completed + total_errors
+        print(f"Requests:    {total} ({total_errors} errors)", file=file)
+        print(f"Duration:    {duration:.3f}s", file=file)
+        if duration > 0:
+            print(f"Throughput:  {completed / duration:.1f} req/s", file=file)
+        for status_code, count in sorted(self.status_codes.items()):
+            print(f"Status {status_code}:  {count}", file=file)
+        for name, count in sorted(self.errors.items()):
+            print(f"Error {name}:  {count}", file=file)
+
+        if not completed:
+            return
+
+        ordered = sorted(self.latencies)
+        print("Latency (ms):", file=file)
+        for label, value in [
+            ("min", ordered[0]),
+            ("p50", self.percentile(ordered, 50)),
+            ("p90", self.percentile(ordered, 90)),
+            ("p99", self.percentile(ordered, 99)),
+            ("p99.9", self.percentile(ordered, 99.9)),
+            ("max", ordered[-1]),
+        ]:
+            print(f"  {label:<6} {value * 1000:10.3f}", file=file)
+
+        # A power-of-two bucketed histogram, in milliseconds.
+        print("Histogram (ms):", file=file)
+        bound = 2 ** math.floor(math.log2(max(ordered[0] * 1000, 0.001)))
+        upper = 2 ** math.ceil(math.log2(max(ordered[-1] * 1000, 0.001)))
+        previous = 0
+        while True:
+            count = bisect.bisect_right(ordered, bound / 1000) - previous
+            previous += count
+            bar = "#" * math.ceil(40 * count / completed)
+            print(f"  <= {bound:10.3f} {count:8d} {bar}", file=file)
+            if bound >= upper:
+                break
+            bound *= 2
+
+
+class Schedule:
+    """
+    Hands out request indexes to workers, along with their scheduled start
+    time when pacing to a target request rate.
+    """
+
+    def __init__(self, total: int, rps: Optional[float], duration: Optional[float]):
+        self.total = total
+        self.rps = rps
+        self.duration = duration
+        self.index = 0
+        self.start = 0.0
+        self._lock = threading.Lock()
+
+    def next(self, now: float) -> Optional[float]:
+        """
+        Return the scheduled start time for the next request, or `None`
+        once the run is complete.
+        """
+        with self._lock:
+            if self.duration is not None:
+                if now - self.start >= self.duration:
+                    return None
+            elif self.index >= self.total:
+                return None
+            index = self.index
+            self.index += 1
+        if self.rps is None:
+            return now
+        return self.start + index / self.rps
+
+
+def pool_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "http2": args.http2,
+        "max_connections": args.max_connections,
+        "max_keepalive": args.max_keepalive,
+        "keepalive_expiry": args.keepalive_expiry,
+    }
+
+
+async def run_async(
+    args: argparse.Namespace, url: URL, headers: Headers, results: Results
+) -> None:
+    schedule = Schedule(args.requests, args.rps, args.duration)
+    timeout = {"connect": args.timeout, "read": args.timeout, "pool": args.timeout}
+
+    async with AsyncConnectionPool(**pool_kwargs(args)) as http:
+
+        async def worker() -> None:
+            while True:
+                now = time.perf_counter()
+                scheduled = schedule.next(now)
+                if scheduled is None:
+                    return
+                if scheduled > now:
+                    await sleep(scheduled - now)
+                try:
+                    response = await http.request(
+                        args.method.encode("ascii"), url, headers, timeout=timeout
+                    )
+                    stream = response[4]
+                    try:
+                        async for _ in stream:
+                            pass
+                    finally:
+                        await stream.aclose()
+                except Exception as exc:
+                    results.add_error(exc)
+                else:
+                    results.add_response(response[1], time.perf_counter() - scheduled)
+
+        results.started = schedule.start = time.perf_counter()
+        await gather([worker for _ in range(args.concurrency)])
+        results.finished = time.perf_counter()
+
+
+async def measure_memory(
+    args: argparse.Namespace, url: URL, headers: Headers, file: TextIO
+) -> None:
+    """
+    Report the memory allocated for each in-flight request, once its response
+    headers have been received but not its body, and for each idle keep-alive
+    connection that is left behind.
+    """
+    timeout = {"connect": args.timeout, "read": args.timeout, "pool": args.timeout}
+    method = args.method.encode("ascii")
+
+    async def read_response(response: Any) -> None:
+        stream = response[4]
+        try:
+            async for _ in stream:
+                pass
+        finally:
+            await stream.aclose()
+
+    http = AsyncConnectionPool(**pool_kwargs(args))
+    async with http:
+        # Warm up, so that one-off allocations such as lazily created locks
+        # are not counted.
+        await read_response(await http.request(method, url, headers, timeout=timeout))
+        connections_before = len(http._connections.get(url[:3], ()))
+        responses: List[Any] = []
+
+        async def worker() -> None:
+            response = await http.request(method, url, headers, timeout=timeout)
+            responses.append(response)
+
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            await gather([worker for _ in range(args.concurrency)])
+            in_flight = tracemalloc.get_traced_memory()[0]
+            for response in responses:
+                await read_response(response)
+            responses.clear()
+            idle = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        connections = len(http._connections.get(url[:3], ())) - connections_before
+
+    per_request = (in_flight - idle) / args.concurrency
+    print(f"In-flight requests:          {args.concurrency}", file=file)
+    print(f"Bytes per in-flight request: {per_request:.0f}", file=file)
+    print(f"New idle connections:        {connections}", file=file)
+    if connections:
+        per_connection = (idle - baseline) / connections
+        print(f"Bytes per idle connection:   {per_connection:.0f}", file=file)
+
+
+async def sleep(seconds: float) -> None:
+    import sniffio
+
+    if sniffio.current_async_library() == "trio":
+        import trio
+
+        await trio.sleep(seconds)
+    else:
+        import asyncio
+
+        await asyncio.sleep(seconds)
+
+
+async def gather(workers: List[Any]) -> None:
+    import sniffio
+
+    if sniffio.current_async_library() == "trio":
+        import trio
+
+        async with trio.open_nursery() as nursery:
+            for worker in workers:
+                nursery.start_soon(worker)
+    else:
+        import asyncio
+
+        await asyncio.gather(*[worker() for worker in workers])
+
+
+def run_sync(
+    args: argparse.Namespace, url: URL, headers: Headers, results: Results
+) -> None:
+    schedule = Schedule(args.requests, args.rps, args.duration)
+    timeout = {"connect": args.timeout, "read": args.timeout, "pool": args.timeout}
+
+    with SyncConnectionPool(**pool_kwargs(args)) as http:
+
+        def worker() -> None:
+            while True:
+                now = time.perf_counter()
+                scheduled = schedule.next(now)
+                if scheduled is None:
+                    return
+                if scheduled > now:
+                    time.sleep(scheduled - now)
+                try:
+                    response = http.request(
+                        args.method.encode("ascii"), url, headers, timeout=timeout
+                    )
+                    stream = response[4]
+                    try:
+                        for _ in stream:
+                            pass
+                    finally:
+                        stream.close()
+                except Exception as exc:
+                    results.add_error(exc)
+                else:
+                    results.add_response(response[1], time.perf_counter() - scheduled)
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results.started = schedule.start = time.perf_counter()
+            futures = [executor.submit(worker) for _ in range(args.concurrency)]
+            for future in futures:
+                future.result()
+            results.finished = time.perf_counter()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m httpcore.bench",
+        description="Drive an httpcore connection pool against a URL.",
+    )
+    parser.add_argument("url")
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument(
+        "-d", "--duration", type=float, help="Run for a number of seconds instead."
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("--rps", type=float, help="Target requests per second.")
+    parser.add_argument("-X", "--method", default="GET")
+    parser.add_argument(
+        "-H", "--header", action="append", default=[], help="'Name: value'"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--backend", choices=["asyncio", "trio"], default="asyncio")
+    parser.add_argument(
+        "--sync", action="store_true", help="Use SyncConnectionPool with threads."
+    )
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--max-connections", type=int)
+    parser.add_argument("--max-keepalive", type=int)
+    parser.add_argument("--keepalive-expiry", type=float)
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Report memory per in-flight request and idle connection instead.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] = None, file: TextIO = None) -> int:
+    args = build_parser().parse_args(argv)
+    file = sys.stdout if file is None else file
+    url = parse_url(args.url)
+
+    scheme, host, port, _ = url
+    default_port = {b"http": 80, b"https": 443}[scheme]
+    headers = [(b"host", host if port == default_port else b"%s:%d" % (host, port))]
+    for header in args.header:
+        name, _, value = header.partition(":")
+        headers.append((name.strip().encode("ascii"), value.strip().encode("ascii")))
+
+    if args.memory:
+        if args.sync:
+            print("--memory is only supported with async backends", file=sys.stderr)
+            return 2
+        if args.backend == "trio":
+            import trio
+
+            trio.run(measure_memory, args, url, headers, file)
+        else:
+            import asyncio
+
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(measure_memory(args, url, headers, file))
+            finally:
+                loop.close()
+        return 0
+
+    results = Results()
+    if args.sync:
+        run_sync(args, url, headers, results)
+    elif args.backend == "trio":
+        import trio
+
+        trio.run(run_async, args, url, headers, results)
+    else:
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run_async(args, url, headers, results))
+        finally:
+            loop.close()
+
+    results.report(file)
+    return 1 if results.errors else 0
+
+
+if __name__ == "__main__":  # pragma: nocover
+    sys.exit(main())
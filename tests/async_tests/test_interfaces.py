@@ -1,5 +1,11 @@
+import os
+import socket
+import ssl
+import tempfile
+import time
 import typing
 
+import h11
 import pytest
 
 import httpcore
@@ -199,3 +205,678 @@ async def test_http_proxy(
         assert http_version == b"HTTP/1.1"
         assert status_code == 200
         assert reason == b"OK"
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_profiler(server: typing.Tuple[bytes, bytes, int]) -> None:
+    profiler = httpcore.Profiler()
+    async with httpcore.AsyncConnectionPool(profiler=profiler) as http:
+        method = b"GET"
+        url = server + (b"/",)
+        headers = [(b"host", b"127.0.0.1")]
+        for _ in range(2):
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            await read_body(stream)
+            assert status_code == 200
+
+    stats = profiler.stats()
+    assert stats["AsyncConnectionPool.request"]["calls"] == 2
+    assert stats["AsyncConnectionPool._get_connection_from_pool"]["calls"] == 2
+    assert stats["SocketStream.write"]["calls"] >= 2
+    assert stats["SocketStream.read"]["calls"] >= 2
+    assert stats["AsyncHTTP11Connection._receive_event"]["calls"] >= 4
+    assert "AsyncConnectionPool.request" in profiler.summary()
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_latency_histograms(server: typing.Tuple[bytes, bytes, int]) -> None:
+    latencies = httpcore.LatencyHistograms()
+    async with httpcore.AsyncConnectionPool(latencies=latencies) as http:
+        method = b"GET"
+        url = server + (b"/",)
+        headers = [(b"host", b"127.0.0.1")]
+        for _ in range(3):
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            await read_body(stream)
+            assert status_code == 200
+
+    histograms = latencies.get(server)
+    assert len(histograms["connect"]) == 1
+    assert len(histograms["ttfb"]) == 3
+    assert len(histograms["total"]) == 3
+    assert latencies.percentile(server, "total", 99) > 0
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_forward_proxy_latency_histograms(
+    server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    # The local server answers forwarded requests as if it were the proxy.
+    latencies = httpcore.LatencyHistograms()
+    async with httpcore.AsyncHTTPProxy(
+        server, proxy_mode="FORWARD_ONLY", latencies=latencies
+    ) as http:
+        method = b"GET"
+        url = (b"http", b"example.org", 80, b"/")
+        headers = [(b"host", b"example.org")]
+        for _ in range(2):
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            await read_body(stream)
+            assert status_code == 200
+
+    assert latencies.origins() == [url[:3]]
+    histograms = latencies.get(url[:3])
+    assert len(histograms["connect"]) == 1
+    assert len(histograms["ttfb"]) == 2
+    assert len(histograms["total"]) == 2
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_event_log(server: typing.Tuple[bytes, bytes, int]) -> None:
+    event_log = httpcore.EventLog()
+    async with httpcore.AsyncConnectionPool(event_log=event_log) as http:
+        method = b"GET"
+        url = server + (b"/",)
+        headers = [(b"host", b"127.0.0.1")]
+        for _ in range(2):
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            await read_body(stream)
+            assert status_code == 200
+
+    events = [(event.event, event.detail) for event in event_log.events()]
+    assert events[0][0] == "connected"
+    assert events[1:] == [
+        ("state", "NEW -> ACTIVE"),
+        ("request", "b'GET' b'/'"),
+        ("response_closed", ""),
+        ("state", "ACTIVE -> IDLE"),
+        ("state", "IDLE -> READY"),
+        ("state", "READY -> ACTIVE"),
+        ("request", "b'GET' b'/'"),
+        ("response_closed", ""),
+        ("state", "ACTIVE -> IDLE"),
+        ("removed_from_pool", ""),
+    ]
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_prior_knowledge(
+    h2c_server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=[h2c_server]) as http:
+        method = b"GET"
+        url = h2c_server + (b"/",)
+        headers = [(b"host", b"127.0.0.1")]
+        http_version, status_code, reason, headers, stream = await http.request(
+            method, url, headers
+        )
+        body = await read_body(stream)
+
+        assert http_version == b"HTTP/2"
+        assert status_code == 200
+        assert reason == b"OK"
+        assert body == b"Hello, world! /"
+        assert len(http._connections[url[:3]]) == 1  # type: ignore
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_flow_control(h2c_server: typing.Tuple[bytes, bytes, int]) -> None:
+    settings = httpcore.HTTP2Settings(
+        connection_window_size=65535, stream_window_size=65535
+    )
+    async with httpcore.AsyncConnectionPool(
+        http2_prior_knowledge=True, http2_settings=settings
+    ) as http:
+        method = b"GET"
+        url = h2c_server + (b"/large",)
+        headers = [(b"host", b"127.0.0.1")]
+        http_version, status_code, reason, headers, stream = await http.request(
+            method, url, headers
+        )
+        body = await read_body(stream)
+
+        assert http_version == b"HTTP/2"
+        assert status_code == 200
+        assert body == b"x" * 1024 * 1024
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_ping(h2c_server: typing.Tuple[bytes, bytes, int]) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+        method = b"GET"
+        url = h2c_server + (b"/",)
+        headers = [(b"host", b"127.0.0.1")]
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        await read_body(stream)
+        assert status_code == 200
+
+        connection = list(http._connections[url[:3]])[0]  # type: ignore
+        rtt = await connection.connection.ping(timeout={})
+        assert rtt is not None
+        assert rtt == connection.connection.rtt
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_ping_unacknowledged() -> None:
+    # A server which accepts connections, but never responds.
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        origin = (b"http", b"127.0.0.1", server.getsockname()[1])
+
+        settings = httpcore.HTTP2Settings(ping_interval=0.05, ping_timeout=0.05)
+        async with httpcore.AsyncConnectionPool(
+            http2_prior_knowledge=True, http2_settings=settings
+        ) as http:
+            method = b"GET"
+            url = origin + (b"/",)
+            headers = [(b"host", b"127.0.0.1")]
+            with pytest.raises(httpcore.ReadError):
+                await http.request(method, url, headers, timeout={"read": 5.0})
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_graceful_goaway(
+    h2c_server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+        method = b"GET"
+        url = h2c_server + (b"/drain",)
+        headers = [(b"host", b"127.0.0.1")]
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        body = await read_body(stream)
+
+        # The in-flight stream completes, and the connection is then closed.
+        assert status_code == 200
+        assert body == b"Hello, world! /drain"
+        assert len(http._connections.get(url[:3], [])) == 0  # type: ignore
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_goaway_retries_unprocessed_stream(
+    h2c_server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+        method = b"GET"
+        url = h2c_server + (b"/goaway",)
+        headers = [(b"host", b"127.0.0.1")]
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        body = await read_body(stream)
+
+        # The refused stream is sent again on a new connection.
+        assert status_code == 200
+        assert body == b"Hello, world! /goaway"
+        assert len(http._connections[url[:3]]) == 1  # type: ignore
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_settings(h2c_server: typing.Tuple[bytes, bytes, int]) -> None:
+    settings = httpcore.HTTP2Settings(
+        header_table_size=65536, max_header_list_size=2 ** 20, max_frame_size=2 ** 20
+    )
+    async with httpcore.AsyncConnectionPool(
+        http2_prior_knowledge=True, http2_settings=settings
+    ) as http:
+        method = b"GET"
+        url = h2c_server + (b"/large",)
+        headers = [(b"host", b"127.0.0.1")]
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        body = await read_body(stream)
+
+        assert status_code == 200
+        assert body == b"x" * 1024 * 1024
+
+        connection = list(http._connections[url[:3]])[0]  # type: ignore
+        h2_state = connection.connection.h2_state
+        assert h2_state.max_inbound_frame_size == 2 ** 20
+        assert h2_state.decoder.max_allowed_table_size == 65536
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_priority(h2c_server: typing.Tuple[bytes, bytes, int]) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+        method = b"GET"
+        url = h2c_server + (b"/priority",)
+        for priority, weight in [(b"u=0", b"128"), (b"u=5, i", b"4"), (None, b"16")]:
+            headers = [(b"host", b"127.0.0.1")]
+            if priority is not None:
+                headers.append((b"priority", priority))
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            body = await read_body(stream)
+
+            assert status_code == 200
+            assert body == weight
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_http2_goaway_during_liveness_check(
+    h2c_server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    settings = httpcore.HTTP2Settings(ping_interval=0.05)
+    async with httpcore.AsyncConnectionPool(
+        http2_prior_knowledge=True, http2_settings=settings
+    ) as http:
+        method = b"GET"
+        url = h2c_server + (b"/goaway-on-ping",)
+        headers = [(b"host", b"127.0.0.1")]
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        await read_body(stream)
+        assert status_code == 200
+        connection = list(http._connections[url[:3]])[0]  # type: ignore
+
+        # The idle connection is checked with a PING, which is answered with
+        # a GOAWAY, so the next request is sent on a new connection.
+        await http._backend.sleep(0.1)
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        await read_body(stream)
+        assert status_code == 200
+        assert connection not in http._connections[url[:3]]  # type: ignore
+        assert len(http._connections[url[:3]]) == 1  # type: ignore
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_expect_continue(server: typing.Tuple[bytes, bytes, int]) -> None:
+    async with httpcore.AsyncConnectionPool() as http:
+        for path, expected_status, expected_sent in [
+            (b"/", 200, True),
+            (b"/reject", 413, False),
+        ]:
+            sent = []
+
+            async def upload() -> typing.AsyncIterator[bytes]:
+                sent.append(True)
+                yield b"Hello, world!"
+
+            method = b"POST"
+            url = server + (path,)
+            headers = [
+                (b"host", b"127.0.0.1"),
+                (b"content-length", b"13"),
+                (b"expect", b"100-continue"),
+            ]
+            stream = httpcore.AsyncByteStream(iterator=upload())
+            _, status_code, _, _, stream = await http.request(
+                method, url, headers, stream
+            )
+            await read_body(stream)
+
+            assert status_code == expected_status
+            assert bool(sent) == expected_sent
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_early_response_stops_upload(
+    server: typing.Tuple[bytes, bytes, int],
+    h2c_server: typing.Tuple[bytes, bytes, int],
+) -> None:
+    for origin, http2 in [(server, False), (h2c_server, True)]:
+        async with httpcore.AsyncConnectionPool(http2_prior_knowledge=http2) as http:
+            sent = []
+
+            async def upload() -> typing.AsyncIterator[bytes]:
+                for _ in range(32):
+                    sent.append(True)
+                    yield b"x" * 1024
+                    await http._backend.sleep(0.01)
+
+            method = b"POST"
+            url = origin + (b"/reject-upload",)
+            headers = [(b"host", b"127.0.0.1"), (b"content-length", b"32768")]
+            stream = httpcore.AsyncByteStream(iterator=upload())
+            _, status_code, _, _, stream = await http.request(
+                method, url, headers, stream
+            )
+            await read_body(stream)
+
+            assert status_code == 413
+            assert len(sent) < 32
+
+            # HTTP/2 connections can still be used once the stream is reset.
+            url = origin + (b"/",)
+            _, status_code, _, _, stream = await http.request(b"GET", url, headers[:1])
+            await read_body(stream)
+            assert status_code == 200
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_https_upload(
+    https_server: typing.Tuple[bytes, bytes, int], cert_file: str
+) -> None:
+    # TLS 1.3 session tickets arrive after the handshake, while the body is
+    # being sent, and must not be mistaken for the start of an early response.
+    ssl_context = ssl.create_default_context(cafile=cert_file)
+    async with httpcore.AsyncConnectionPool(ssl_context=ssl_context) as http:
+
+        async def upload() -> typing.AsyncIterator[bytes]:
+            for _ in range(8):
+                yield b"x" * 1024
+
+        method = b"POST"
+        url = https_server + (b"/echo",)
+        headers = [(b"host", b"127.0.0.1"), (b"content-length", b"8192")]
+        stream = httpcore.AsyncByteStream(iterator=upload())
+        _, status_code, _, _, stream = await http.request(
+            method, url, headers, stream, timeout={"read": 5.0}
+        )
+        body = await read_body(stream)
+
+        assert status_code == 200
+        assert body == b"x" * 8192
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_file_upload(
+    server: typing.Tuple[bytes, bytes, int],
+    h2c_server: typing.Tuple[bytes, bytes, int],
+) -> None:
+    content = bytes(range(256)) * 12 * 1024
+    with tempfile.TemporaryFile() as file:
+        file.write(content)
+
+        # Large enough to be sent in several slices.
+        async with httpcore.AsyncConnectionPool() as http:
+            method = b"POST"
+            url = server + (b"/echo",)
+            content_length = b"%d" % (len(content) - 100)
+            headers = [(b"host", b"127.0.0.1"), (b"content-length", content_length)]
+            stream = httpcore.AsyncFileByteStream(file, offset=100)
+            _, status_code, _, _, stream = await http.request(
+                method, url, headers, stream
+            )
+            body = await read_body(stream)
+
+            assert status_code == 200
+            assert body == content[100:]
+
+        # HTTP/2 connections read the file instead.
+        async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+            url = h2c_server + (b"/",)
+            headers = [(b"host", b"127.0.0.1"), (b"content-length", b"1000")]
+            stream = httpcore.AsyncFileByteStream(file, offset=100, count=1000)
+            _, status_code, _, _, stream = await http.request(
+                method, url, headers, stream
+            )
+            await read_body(stream)
+
+            assert status_code == 200
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_copy_response_to_file(
+    server: typing.Tuple[bytes, bytes, int], tmp_path: typing.Any
+) -> None:
+    async with httpcore.AsyncConnectionPool() as http:
+        method = b"GET"
+        url = server + (b"/large",)
+        headers = [(b"host", b"127.0.0.1")]
+
+        with tempfile.TemporaryFile() as file:
+            _, _, _, _, stream = await http.request(method, url, headers)
+            assert await stream.copy_to(file) == 1024 * 1024
+            file.seek(0)
+            assert file.read() == b"x" * 1024 * 1024
+
+            _, _, _, _, stream = await http.request(method, url, headers)
+            assert await stream.copy_to(file.fileno(), buffer_size=1000) == 1024 * 1024
+            assert os.fstat(file.fileno()).st_size == 2 * 1024 * 1024
+
+        path = str(tmp_path / "large")
+        _, _, _, response_headers, stream = await http.request(method, url, headers)
+        size = int(dict(response_headers)[b"content-length"])
+        mapped = await stream.into_mmap(path, size)
+        assert mapped is not None
+        try:
+            assert mapped[:] == b"x" * 1024 * 1024
+        finally:
+            mapped.close()
+
+        # An empty body cannot be mapped, but is still written, and the
+        # connection is released for the next request.
+        url = server + (b"/empty",)
+        _, _, _, _, stream = await http.request(method, url, headers)
+        assert await stream.into_mmap(path, 0) is None
+        assert os.path.getsize(path) == 0
+        connections = http._connections[url[:3]]  # type: ignore
+        assert [c.state.name for c in connections] == ["IDLE"]
+        url = server + (b"/large",)
+
+        _, _, _, _, stream = await http.request(method, url, headers)
+        with pytest.raises(httpcore.ProtocolError):
+            await stream.into_mmap(path, 1000)
+
+        # The connection was closed, and the pool is still usable.
+        _, status_code, _, _, stream = await http.request(method, url, headers)
+        await read_body(stream)
+        assert status_code == 200
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_read_response(
+    server: typing.Tuple[bytes, bytes, int],
+    h2c_server: typing.Tuple[bytes, bytes, int],
+) -> None:
+    for origin, http2 in [(server, False), (h2c_server, True)]:
+        async with httpcore.AsyncConnectionPool(http2_prior_knowledge=http2) as http:
+            method = b"GET"
+            url = origin + (b"/large",)
+            headers = [(b"host", b"127.0.0.1")]
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            body = await stream.aread(max_size=1024 * 1024)
+
+            assert status_code == 200
+            assert body == b"x" * 1024 * 1024
+
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            with pytest.raises(httpcore.ResponseTooLarge):
+                await stream.aread(max_size=1000)
+
+            # The connection was released, and the pool is still usable.
+            _, status_code, _, _, stream = await http.request(method, url, headers)
+            assert len(await stream.aread()) == 1024 * 1024
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_request_template(
+    server: typing.Tuple[bytes, bytes, int],
+    h2c_server: typing.Tuple[bytes, bytes, int],
+) -> None:
+    for origin, http2 in [(server, False), (h2c_server, True)]:
+        async with httpcore.AsyncConnectionPool(http2_prior_knowledge=http2) as http:
+            headers = [(b"host", b"127.0.0.1")]
+            template = httpcore.RequestTemplate(b"GET", origin + (b"/",), headers)
+            for _ in range(3):
+                _, status_code, _, _, stream = await http.request(*template)
+                assert status_code == 200
+                assert (await read_body(stream)).startswith(b"Hello, world!")
+
+            # The prepared headers may also be sent with a different URL.
+            url = origin + (b"/large",)
+            _, status_code, _, _, stream = await http.request(
+                b"GET", url, template.headers
+            )
+            assert len(await read_body(stream)) == 1024 * 1024
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_request_many(
+    server: typing.Tuple[bytes, bytes, int],
+    h2c_server: typing.Tuple[bytes, bytes, int],
+) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=[h2c_server]) as http:
+        headers = [(b"host", b"127.0.0.1")]
+        requests: typing.List[typing.Any] = []
+        for index in range(10):
+            requests.append((b"GET", server + (b"/",), headers))
+            requests.append((b"GET", h2c_server + (b"/%d" % index,), headers))
+        template = httpcore.RequestTemplate(b"GET", server + (b"/large",), headers)
+        requests.append(template)
+
+        bodies = {}
+        async with http.request_many(requests, concurrency=4) as responses:
+            async for index, response in responses:
+                _, status_code, _, _, stream = response
+                assert status_code == 200
+                bodies[index] = await read_body(stream)
+
+        assert sorted(bodies) == list(range(len(requests)))
+        assert bodies[0] == b"Hello, world!"
+        assert bodies[19] == b"Hello, world! /9"
+        assert len(bodies[20]) == 1024 * 1024
+        # Each worker kept reusing its connection, rather than opening more.
+        assert len(http._get_all_connections()) <= 4  # type: ignore
+
+        # A failed request stops the batch, and is raised.
+        requests = [(b"GET", server + (b"/",), [])] * 3
+        with pytest.raises(h11.LocalProtocolError):
+            async with http.request_many(requests, concurrency=1) as responses:
+                async for index, response in responses:
+                    pass  # pragma: nocover
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_request_many_early_exit(
+    server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    profiler = httpcore.Profiler()
+    async with httpcore.AsyncConnectionPool(profiler=profiler) as http:
+        profiler.instrument(http, "_send_request")
+        requests = [(b"GET", server + (b"/slow",), [(b"host", b"127.0.0.1")])] * 20
+
+        received = 0
+        async with http.request_many(requests, concurrency=4) as responses:
+            async for _, response in responses:
+                received += 1
+                if received == 2:
+                    break
+
+        # No more requests were sent once the batch exited, beyond the one that
+        # each worker may have taken before then, and those which were in
+        # flight have finished and released their connections.
+        stats = profiler.stats()
+        assert stats["AsyncConnectionPool._send_request"]["calls"] <= 2 * 4
+        connections = http._get_all_connections()  # type: ignore
+        assert [c.state.name for c in connections] == ["IDLE"] * len(connections)
+
+        # The same applies when the block exits with an exception.
+        with pytest.raises(RuntimeError):
+            async with http.request_many(requests, concurrency=4) as responses:
+                async for _, response in responses:
+                    raise RuntimeError()
+        connections = http._get_all_connections()  # type: ignore
+        assert [c.state.name for c in connections] == ["IDLE"] * len(connections)
+
+        # And the pool can still be used afterwards.
+        _, status_code, _, _, stream = await http.request(*requests[0])
+        assert status_code == 200
+        assert await read_body(stream) == b"Hello, world!"
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_request_coalescing(server: typing.Tuple[bytes, bytes, int]) -> None:
+    url = server + (b"/slow",)
+    requests = [
+        (b"GET", url, [(b"host", b"127.0.0.1"), (b"user-agent", b"%d" % index)])
+        for index in range(4)
+    ]
+
+    for max_body_size, sent in [(1024, 1), (10, 4)]:
+        profiler = httpcore.Profiler()
+        coalescing = httpcore.CoalescingSettings(
+            key_headers=[b"Host"], max_body_size=max_body_size
+        )
+        async with httpcore.AsyncConnectionPool(
+            profiler=profiler, coalescing=coalescing
+        ) as http:
+            profiler.instrument(http, "_send_request")
+            async with http.request_many(requests, concurrency=4) as responses:
+                async for _, response in responses:
+                    assert response[1] == 200
+                    assert await read_body(response[4]) == b"Hello, world!"
+
+        # Only one request is sent, unless the response is too large to share.
+        stats = profiler.stats()
+        assert stats["AsyncConnectionPool._send_request"]["calls"] == sent
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_retry_on_stale_connection(
+    server: typing.Tuple[bytes, bytes, int]
+) -> None:
+    # Each connection is dropped by the server when it is next reused.
+    url = server + (b"/drop-next",)
+    headers = [(b"host", b"127.0.0.1")]
+    async with httpcore.AsyncConnectionPool() as http:
+        for _ in range(3):
+            _, status_code, _, _, stream = await http.request(b"GET", url, headers)
+            assert status_code == 200
+            assert await read_body(stream) == b"Hello, world!"
+
+        # Requests which are not idempotent are not resent, once sent.
+        with pytest.raises((httpcore.NetworkError, httpcore.ProtocolError)):
+            await http.request(b"POST", url, headers + [(b"content-length", b"0")])
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_request_hedging(server: typing.Tuple[bytes, bytes, int]) -> None:
+    # The server is slow to respond to the first request for this URL only.
+    url = server + (b"/slow-once?%s" % os.urandom(8).hex().encode(),)
+    hedging = httpcore.HedgingSettings(delay=0.05)
+    async with httpcore.AsyncConnectionPool(hedging=hedging) as http:
+        started = time.monotonic()
+        _, status_code, _, _, stream = await http.request(
+            b"GET", url, [(b"host", b"127.0.0.1")]
+        )
+        assert status_code == 200
+        assert await read_body(stream) == b"Hello, world!"
+        assert time.monotonic() - started < 0.4
+
+        # The hedged request was sent on a second connection.
+        assert len(http._connections[url[:3]]) == 2  # type: ignore
+
+
+@pytest.mark.usefixtures("async_environment")
+async def test_cache_transport(server: typing.Tuple[bytes, bytes, int]) -> None:
+    host = [(b"host", b"127.0.0.1")]
+    with tempfile.TemporaryDirectory() as directory:
+        for storage in [httpcore.InMemoryCache(), httpcore.FileCache(directory)]:
+            profiler = httpcore.Profiler()
+            pool = httpcore.AsyncConnectionPool(profiler=profiler)
+            async with httpcore.AsyncCacheTransport(pool, storage=storage) as http:
+                # A fresh response is served from the cache.
+                url = server + (b"/cached",)
+                for _ in range(2):
+                    _, status_code, _, headers, stream = await http.request(
+                        b"GET", url, host
+                    )
+                    assert status_code == 200
+                    assert await read_body(stream) == b"Hello, world!"
+                assert (b"age", b"0") in headers
+
+                # A stale response is revalidated, and served after a 304.
+                for _ in range(2):
+                    _, status_code, _, _, stream = await http.request(
+                        b"GET", server + (b"/revalidate",), host
+                    )
+                    assert status_code == 200
+                    assert await read_body(stream) == b"Hello, world!"
+
+                # Requests may bypass the cache, or insist on using it.
+                no_cache = host + [(b"cache-control", b"no-cache")]
+                _, _, _, _, stream = await http.request(b"GET", url, no_cache)
+                await read_body(stream)
+                only_if_cached = host + [(b"cache-control", b"only-if-cached")]
+                _, status_code, _, _, stream = await http.request(
+                    b"GET", server + (b"/",), only_if_cached
+                )
+                await read_body(stream)
+                assert status_code == 504
+
+                # An unsafe request invalidates the stored response.
+                post = host + [(b"content-length", b"0")]
+                _, _, _, _, stream = await http.request(b"POST", url, post)
+                await read_body(stream)
+                _, _, _, _, stream = await http.request(b"GET", url, host)
+                await read_body(stream)
+
+            stats = profiler.stats()
+            assert stats["AsyncConnectionPool.request"]["calls"] == 6
@@ -1,8 +1,23 @@
 import asyncio
+import datetime
+import ipaddress
+import socket
+import socketserver
+import ssl
 import threading
+import time
 import typing
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
+import h2.config
+import h2.connection
+import h2.events
 import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from hyperframe.frame import GoAwayFrame
 from mitmproxy import master, options, proxy
 from mitmproxy.tools.dump import DumpMaster
 
@@ -86,3 +101,301 @@ def proxy_server() -> typing.Iterable[typing.Tuple[bytes, bytes, int]]:
         yield (b"http", PROXY_HOST.encode(), PROXY_PORT)
     finally:
         thread.join()
+
+
+class LocalServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalRequestHandler(BaseHTTPRequestHandler):
+    """A minimal keep-alive HTTP/1.1 handler, for tests that avoid the network."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # Paths under `/slow-once` which have been requested, and so are fast now.
+    slow_once: typing.Set[str] = set()
+    # Set by `/drop-next`, so that the next request on the connection is
+    # dropped, as if the server had closed the connection while it was idle.
+    drop_next = False
+
+    def handle_one_request(self) -> None:
+        if not self.drop_next:
+            super().handle_one_request()
+            return
+        self.rfile.readline()
+        self.close_connection = True
+
+    def do_GET(self) -> None:
+        if self.path == "/slow":
+            time.sleep(0.2)
+        elif self.path.startswith("/slow-once") and self.path not in self.slow_once:
+            self.slow_once.add(self.path)
+            time.sleep(0.5)
+        if self.path == "/revalidate" and self.headers["If-None-Match"] == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        if self.path == "/large":
+            body = b"x" * 1024 * 1024
+        elif self.path == "/empty":
+            body = b""
+        else:
+            body = b"Hello, world!"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/cached":
+            self.send_header("Cache-Control", "max-age=60")
+        elif self.path == "/revalidate":
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("ETag", '"v1"')
+        if self.path == "/close":
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        elif self.path == "/drop-next":
+            self.drop_next = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_expect_100(self) -> bool:
+        if self.path == "/reject":
+            self.send_response(413)
+            self.send_header("Content-Length", "0")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            return False
+        return super().handle_expect_100()
+
+    def do_POST(self) -> None:
+        if self.path == "/reject-upload":
+            self.send_response(413)
+            self.send_header("Content-Length", "0")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            # Discard the body until the client stops sending it, rather than
+            # resetting the connection.
+            self.close_connection = True
+            while self.connection.recv(65536):
+                pass
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/echo":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.do_GET()
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> typing.Iterator[typing.Tuple[bytes, bytes, int]]:
+    """Starts a local HTTP server on a different thread and returns its origin tuple."""
+    httpd = LocalServer(("127.0.0.1", 0), LocalRequestHandler)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield (b"http", b"127.0.0.1", httpd.server_address[1])
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture(scope="session")
+def cert_file(tmp_path_factory: typing.Any) -> str:
+    """A self-signed certificate for 127.0.0.1, along with its key."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    path = tmp_path_factory.mktemp("certs") / "cert.pem"
+    path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        + cert.public_bytes(serialization.Encoding.PEM)
+    )
+    return str(path)
+
+
+class LocalTLSServer(LocalServer):
+    def __init__(self, cert_file: str) -> None:
+        super().__init__(("127.0.0.1", 0), LocalRequestHandler)
+        self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.ssl_context.load_cert_chain(cert_file)
+
+    def finish_request(self, request: typing.Any, client_address: typing.Any) -> None:
+        # Handshake on the request thread, rather than while accepting.
+        request = self.ssl_context.wrap_socket(request, server_side=True)
+        super().finish_request(request, client_address)
+
+
+@pytest.fixture
+def https_server(cert_file: str) -> typing.Iterator[typing.Tuple[bytes, bytes, int]]:
+    """Starts a local HTTPS server, with a certificate from `cert_file`."""
+    httpd = LocalTLSServer(cert_file)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield (b"https", b"127.0.0.1", httpd.server_address[1])
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+class H2CRequestHandler(socketserver.BaseRequestHandler):
+    """
+    A minimal cleartext HTTP/2 handler, for prior knowledge connections.
+
+    Requests for `/large` receive a 1MB body, sent as flow control allows.
+    Requests for `/drain` are completed after a graceful GOAWAY, and the first
+    request for `/goaway` is refused with a GOAWAY. Requests for `/priority`
+    receive the weight they were sent with, and uploads to `/upload` receive
+    the order in which their bodies were completed. Uploads to `/reject-upload`
+    are refused with a 413 response, without reading the body. After a request
+    for `/goaway-on-ping`, the next PING is answered with a GOAWAY.
+    """
+
+    def handle(self) -> None:
+        config = h2.config.H2Configuration(client_side=False)
+        conn = h2.connection.H2Connection(config=config)
+        conn.initiate_connection()
+        self.request.sendall(conn.data_to_send())
+        pending: typing.Dict[int, bytes] = {}
+        uploads: typing.Set[int] = set()
+        goaway_on_ping = False
+
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    headers = dict(event.headers)
+                    if headers[b":path"] == b"/goaway" and not self.server.refused:
+                        self.server.refused = True
+                        last_stream_id = max(event.stream_id - 2, 0)
+                        goaway = GoAwayFrame(0, last_stream_id=last_stream_id)
+                        self.request.sendall(conn.data_to_send() + goaway.serialize())
+                        continue
+                    if headers[b":path"] == b"/goaway-on-ping":
+                        goaway_on_ping = True
+                    if headers[b":path"] == b"/upload":
+                        uploads.add(event.stream_id)
+                        continue
+                    if headers[b":path"] == b"/reject-upload":
+                        conn.send_headers(
+                            event.stream_id,
+                            [(b":status", b"413"), (b"content-length", b"0")],
+                            end_stream=True,
+                        )
+                        conn.reset_stream(event.stream_id)
+                        continue
+                    if headers[b":path"] == b"/large":
+                        body = b"x" * 1024 * 1024
+                    elif headers[b":path"] == b"/priority":
+                        priority = event.priority_updated
+                        weight = 16 if priority is None else priority.weight
+                        body = b"%d" % weight
+                    else:
+                        body = b"Hello, world! " + headers[b":path"]
+                    conn.send_headers(
+                        event.stream_id,
+                        [(b":status", b"200"), (b"content-length", b"%d" % len(body))],
+                    )
+                    pending[event.stream_id] = body
+                    if headers[b":path"] == b"/drain":
+                        goaway = GoAwayFrame(0, last_stream_id=event.stream_id)
+                        self.request.sendall(conn.data_to_send() + goaway.serialize())
+                elif isinstance(event, h2.events.PingReceived) and goaway_on_ping:
+                    last_stream_id = conn.highest_inbound_stream_id
+                    goaway = GoAwayFrame(0, last_stream_id=last_stream_id)
+                    self.request.sendall(goaway.serialize())
+                elif isinstance(event, h2.events.DataReceived):
+                    conn.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif (
+                    isinstance(event, h2.events.StreamEnded)
+                    and event.stream_id in uploads
+                ):
+                    with self.server.lock:
+                        body = b"%d" % self.server.completed_uploads
+                        self.server.completed_uploads += 1
+                    conn.send_headers(
+                        event.stream_id,
+                        [(b":status", b"200"), (b"content-length", b"%d" % len(body))],
+                    )
+                    pending[event.stream_id] = body
+                elif isinstance(event, h2.events.StreamReset):
+                    pending.pop(event.stream_id, None)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            for stream_id, body in list(pending.items()):
+                while True:
+                    size = min(
+                        len(body),
+                        conn.local_flow_control_window(stream_id),
+                        conn.max_outbound_frame_size,
+                    )
+                    if size == len(body):
+                        conn.send_data(stream_id, body, end_stream=True)
+                        del pending[stream_id]
+                        break
+                    elif not size:
+                        pending[stream_id] = body
+                        break
+                    conn.send_data(stream_id, body[:size])
+                    body = body[size:]
+            self.request.sendall(conn.data_to_send())
+
+
+class LocalH2CServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    refused = False
+    completed_uploads = 0
+    lock = threading.Lock()
+
+    def server_bind(self) -> None:
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().server_bind()
+
+
+@pytest.fixture
+def h2c_server() -> typing.Iterator[typing.Tuple[bytes, bytes, int]]:
+    """Starts a local cleartext HTTP/2 server and returns its origin tuple."""
+    server = LocalH2CServer(("127.0.0.1", 0), H2CRequestHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield (b"http", b"127.0.0.1", server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,48 @@
+import io
+import typing
+
+import pytest
+
+from httpcore.bench import main, parse_url
+
+
+def test_parse_url() -> None:
+    assert parse_url("http://example.org") == (b"http", b"example.org", 80, b"/")
+    assert parse_url("https://example.org:8443/a?b=c") == (
+        b"https",
+        b"example.org",
+        8443,
+        b"/a?b=c",
+    )
+    with pytest.raises(ValueError):
+        parse_url("ftp://example.org/")
+
+
+@pytest.mark.parametrize(
+    "mode", [["--sync"], ["--backend", "asyncio"], ["--backend", "trio"]]
+)
+def test_bench(server: typing.Tuple[bytes, bytes, int], mode: typing.List[str]) -> None:
+    url = "http://127.0.0.1:%d/" % server[2]
+    output = io.StringIO()
+    argv = [url, "-n", "20", "-c", "4", "--max-connections", "4", "--rps", "1000"]
+
+    assert main(argv + mode, file=output) == 0
+
+    report = output.getvalue()
+    assert "Requests:    20 (0 errors)" in report
+    assert "Status 200:  20" in report
+    assert "p99" in report
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_bench_memory(server: typing.Tuple[bytes, bytes, int], backend: str) -> None:
+    url = "http://127.0.0.1:%d/" % server[2]
+    output = io.StringIO()
+
+    assert main([url, "-c", "4", "--memory", "--backend", backend], file=output) == 0
+
+    report = output.getvalue()
+    assert "In-flight requests:          4" in report
+    assert "Bytes per in-flight request:" in report
+    assert "New idle connections:        3" in report
+    assert "Bytes per idle connection:" in report
@@ -0,0 +1,106 @@
+import tempfile
+
+from httpcore import CachedResponse, FileCache, InMemoryCache
+from httpcore._cache import is_fresh, is_storable, parse_cache_control
+
+DATE = b"Sun, 18 Oct 2026 12:00:00 GMT"
+NOW = 1792324800.0  # The time in `DATE`.
+
+
+def cached_response(
+    headers: list, content: bytes = b"Hello, world!", stored_at: float = NOW
+) -> CachedResponse:
+    return CachedResponse(
+        b"HTTP/1.1", 200, b"OK", [(b"date", DATE)] + headers, content, [], stored_at
+    )
+
+
+def test_parse_cache_control() -> None:
+    headers = [(b"Cache-Control", b'max-age=60, no-cache="Set-Cookie"'), (b"x", b"y")]
+    assert parse_cache_control(headers) == {
+        b"max-age": b"60",
+        b"no-cache": b"Set-Cookie",
+    }
+
+
+def test_freshness() -> None:
+    response = cached_response([(b"cache-control", b"max-age=60")])
+    assert is_fresh(response, {}, NOW + 59)
+    assert not is_fresh(response, {}, NOW + 61)
+    assert not is_fresh(response, {b"max-age": b"10"}, NOW + 11)
+    assert not is_fresh(response, {b"min-fresh": b"30"}, NOW + 31)
+    assert is_fresh(response, {b"max-stale": None}, NOW + 3600)
+    assert is_fresh(response, {b"max-stale": b"10"}, NOW + 65)
+
+    response = cached_response([(b"expires", b"Sun, 18 Oct 2026 12:01:00 GMT")])
+    assert is_fresh(response, {}, NOW + 59)
+    assert not is_fresh(response, {}, NOW + 61)
+
+    # Heuristic freshness, of 10% of the time since the last modification.
+    last_modified = (b"last-modified", b"Sun, 18 Oct 2026 11:00:00 GMT")
+    response = cached_response([last_modified])
+    assert is_fresh(response, {}, NOW + 359)
+    assert not is_fresh(response, {}, NOW + 361)
+
+    response = cached_response([(b"cache-control", b"max-age=60, no-cache")])
+    assert not is_fresh(response, {}, NOW)
+    response = cached_response([(b"cache-control", b"max-age=60"), (b"age", b"50")])
+    assert not is_fresh(response, {}, NOW + 11)
+
+
+def test_storable() -> None:
+    assert is_storable([], 200, [(b"cache-control", b"max-age=60")])
+    assert is_storable([], 200, [(b"etag", b'"v1"')])
+    assert not is_storable([], 200, [])
+    assert not is_storable([], 201, [(b"etag", b'"v1"')])
+    assert not is_storable([], 200, [(b"cache-control", b"no-store, max-age=60")])
+    assert not is_storable(
+        [(b"cache-control", b"no-store")], 200, [(b"cache-control", b"max-age=60")]
+    )
+    assert not is_storable(
+        [(b"authorization", b"secret")], 200, [(b"cache-control", b"max-age=60")]
+    )
+    assert is_storable(
+        [(b"authorization", b"secret")],
+        200,
+        [(b"cache-control", b"public, max-age=60")],
+    )
+
+
+def test_vary() -> None:
+    response = cached_response([(b"vary", b"Accept")])
+    response.vary = [(b"accept", b"text/html")]
+    assert response.matches([(b"Accept", b"text/html")])
+    assert not response.matches([(b"Accept", b"application/json")])
+    assert not response.matches([])
+
+
+def test_in_memory_cache_is_bounded() -> None:
+    storage = InMemoryCache(max_size=200)
+    for key in (b"a", b"b", b"c"):
+        storage.set(key, cached_response([], content=b"x" * 60))
+    assert storage.get(b"a") is None
+    assert storage.get(b"b") is not None
+    assert storage.get(b"c") is not None
+    assert storage.size <= 200
+
+    # Responses which could never fit are not stored.
+    storage.set(b"d", cached_response([], content=b"x" * 300))
+    assert storage.get(b"d") is None
+
+
+def test_file_cache() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        storage = FileCache(directory)
+        storage.set(b"a", cached_response([(b"etag", b'"v1"')]))
+
+        response = storage.get(b"a")
+        assert response is not None
+        assert response.headers == [(b"date", DATE), (b"etag", b'"v1"')]
+        assert bytes(response.content) == b"Hello, world!"
+        assert response.stored_at == NOW
+        response.close()
+
+        storage.delete(b"a")
+        assert storage.get(b"a") is None
+        assert storage.get(b"b") is None
@@ -0,0 +1,78 @@
+import pytest
+from h2.config import H2Configuration
+
+from httpcore import CoalescingSettings, HedgingSettings, HTTP2Settings
+
+
+def test_http2_settings() -> None:
+    settings = HTTP2Settings(stream_window_size=65535)
+    assert settings.connection_window_size == 2 ** 24
+    assert settings.stream_window_size == 65535
+    assert settings.window_update_ratio == 0.5
+    assert settings == HTTP2Settings(stream_window_size=65535)
+    assert settings != HTTP2Settings()
+    assert repr(settings) == (
+        "HTTP2Settings(connection_window_size=16777216, "
+        "stream_window_size=65535, window_update_ratio=0.5, "
+        "ping_interval=None, ping_timeout=10.0, header_table_size=4096, "
+        "max_header_list_size=65536, max_concurrent_streams=100, "
+        "max_frame_size=16384, h2_config=None)"
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"connection_window_size": 1024},
+        {"connection_window_size": 2 ** 31},
+        {"stream_window_size": -1},
+        {"stream_window_size": 0},
+        {"window_update_ratio": 0},
+        {"window_update_ratio": 1.5},
+        {"ping_interval": 0},
+        {"ping_timeout": -1},
+        {"header_table_size": -1},
+        {"max_header_list_size": 2 ** 32},
+        {"max_concurrent_streams": -1},
+        {"max_frame_size": 1024},
+        {"max_frame_size": 2 ** 24},
+        {"h2_config": H2Configuration(client_side=False)},
+    ],
+)
+def test_http2_settings_validation(kwargs: dict) -> None:
+    with pytest.raises(ValueError):
+        HTTP2Settings(**kwargs)
+
+
+def test_coalescing_settings() -> None:
+    settings = CoalescingSettings(key_headers=[b"Accept"])
+    url = (b"http", b"example.org", 80, b"/")
+    assert settings.request_key(
+        b"GET", url, [(b"accept", b"*/*"), (b"user-agent", b"a")]
+    ) == settings.request_key(b"GET", url, [(b"ACCEPT", b"*/*")])
+    assert settings.request_key(
+        b"GET", url, [(b"accept", b"*/*")]
+    ) != settings.request_key(b"GET", url, [(b"accept", b"text/html")])
+    assert CoalescingSettings().request_key(
+        b"GET", url, [(b"user-agent", b"a")]
+    ) != CoalescingSettings().request_key(b"GET", url, [(b"user-agent", b"b")])
+    assert repr(CoalescingSettings()) == (
+        "CoalescingSettings(key_headers=None, max_body_size=1048576)"
+    )
+
+    with pytest.raises(ValueError):
+        CoalescingSettings(max_body_size=-1)
+
+
+def test_hedging_settings() -> None:
+    assert HedgingSettings(percentile=95) == HedgingSettings(percentile=95)
+    assert repr(HedgingSettings()) == (
+        "HedgingSettings(delay=0.1, percentile=None, min_samples=20)"
+    )
+
+    with pytest.raises(ValueError):
+        HedgingSettings(delay=-1)
+    with pytest.raises(ValueError):
+        HedgingSettings(percentile=0)
+    with pytest.raises(ValueError):
+        HedgingSettings(min_samples=0)
@@ -0,0 +1,63 @@
+import io
+import typing
+
+from httpcore._eventlog import EventLog
+
+
+class State:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class Connection:
+    origin = (b"http", b"example.org", 80)
+
+    def __init__(self) -> None:
+        self.state = State("ACTIVE")
+
+
+def event_names(event_log: EventLog) -> typing.List[str]:
+    return [event.event for event in event_log.events()]
+
+
+def test_ring_buffer_is_bounded() -> None:
+    event_log = EventLog(size=3)
+    connection = Connection()
+    for index in range(5):
+        event_log.record(connection, "request", str(index))
+
+    assert len(event_log) == 3
+    assert [event.detail for event in event_log.events()] == ["2", "3", "4"]
+
+    event_log.clear()
+    assert len(event_log) == 0
+
+
+def test_state_transitions() -> None:
+    event_log = EventLog()
+    connection = Connection()
+
+    event_log.record_state(connection)
+    event_log.record_state(connection)
+    connection.state = State("IDLE")
+    event_log.record_state(connection)
+    connection.state = State("CLOSED")
+    event_log.record_state(connection)
+
+    details = [event.detail for event in event_log.events()]
+    assert details == ["NEW -> ACTIVE", "ACTIVE -> IDLE", "IDLE -> CLOSED"]
+
+
+def test_dump_on_error() -> None:
+    output = io.StringIO()
+    event_log = EventLog(error_file=output)
+    connection = Connection()
+
+    event_log.record(connection, "request", "b'GET' b'/'")
+    event_log.record_error(connection, ValueError("nope"))
+
+    assert event_names(event_log) == ["request", "error"]
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 2
+    assert "http://example.org:80" in lines[0]
+    assert lines[1].endswith("error ValueError('nope')")
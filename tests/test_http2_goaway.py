@@ -0,0 +1,35 @@
+import h2.config
+import h2.connection
+import h2.events
+from h2.errors import ErrorCodes
+
+from httpcore._async.http2 import GracefulH2Connection, create_h2_connection
+
+
+def test_graceful_goaway() -> None:
+    # `GracefulH2Connection` overrides a private h2 method, so check that it
+    # still works with the installed version of h2.
+    client = create_h2_connection(h2.config.H2Configuration(client_side=True))
+    assert isinstance(client, GracefulH2Connection)
+    server = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False)
+    )
+
+    client.initiate_connection()
+    client.send_headers(
+        1,
+        [(":method", "GET"), (":authority", "a"), (":scheme", "http"), (":path", "/")],
+        end_stream=True,
+    )
+    server.initiate_connection()
+    server.receive_data(client.data_to_send())
+    server.data_to_send()
+    server.send_headers(1, [(":status", "200")], end_stream=True)
+    response = server.data_to_send()
+    server.close_connection(ErrorCodes.NO_ERROR, last_stream_id=1)
+    goaway = server.data_to_send()
+
+    # A stream up to `last_stream_id` can still complete after the GOAWAY.
+    events = client.receive_data(goaway + response)
+    assert any(isinstance(e, h2.events.ConnectionTerminated) for e in events)
+    assert any(isinstance(e, h2.events.StreamEnded) for e in events)
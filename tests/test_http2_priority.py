@@ -0,0 +1,88 @@
+import asyncio
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import httpcore
+
+Origin = typing.Tuple[bytes, bytes, int]
+
+CONTENT = b"x" * 1024 * 1024
+
+
+def upload_headers(priority: bytes) -> typing.List[typing.Tuple[bytes, bytes]]:
+    return [
+        (b"host", b"127.0.0.1"),
+        (b"content-length", b"%d" % len(CONTENT)),
+        (b"priority", priority),
+    ]
+
+
+async def async_upload(
+    http: httpcore.AsyncConnectionPool, origin: Origin, priority: bytes
+) -> bytes:
+    async def content() -> typing.AsyncIterator[bytes]:
+        for offset in range(0, len(CONTENT), 65536):
+            yield CONTENT[offset : offset + 65536]
+
+    stream = httpcore.AsyncByteStream(iterator=content())
+    _, status_code, _, _, stream = await http.request(
+        b"POST", origin + (b"/upload",), upload_headers(priority), stream
+    )
+    try:
+        assert status_code == 200
+        return b"".join([chunk async for chunk in stream])
+    finally:
+        await stream.aclose()
+
+
+def sync_upload(
+    http: httpcore.SyncConnectionPool, origin: Origin, priority: bytes
+) -> bytes:
+    def content() -> typing.Iterator[bytes]:
+        for offset in range(0, len(CONTENT), 65536):
+            yield CONTENT[offset : offset + 65536]
+
+    stream = httpcore.SyncByteStream(iterator=content())
+    _, status_code, _, _, stream = http.request(
+        b"POST", origin + (b"/upload",), upload_headers(priority), stream
+    )
+    try:
+        assert status_code == 200
+        return b"".join([chunk for chunk in stream])
+    finally:
+        stream.close()
+
+
+@pytest.mark.asyncio
+async def test_async_upload_scheduling(h2c_server: Origin) -> None:
+    async with httpcore.AsyncConnectionPool(http2_prior_knowledge=True) as http:
+        # Open the connection first, so that both uploads share it.
+        _, _, _, _, stream = await http.request(
+            b"GET", h2c_server + (b"/",), [(b"host", b"127.0.0.1")]
+        )
+        await stream.aclose()
+
+        bodies = await asyncio.gather(
+            async_upload(http, h2c_server, b"u=7"),
+            async_upload(http, h2c_server, b"u=0"),
+        )
+
+        # The more urgent upload completes first, despite starting second.
+        assert bodies == [b"1", b"0"]
+
+
+def test_sync_upload_scheduling(h2c_server: Origin) -> None:
+    with httpcore.SyncConnectionPool(http2_prior_knowledge=True) as http:
+        _, _, _, _, stream = http.request(
+            b"GET", h2c_server + (b"/",), [(b"host", b"127.0.0.1")]
+        )
+        stream.close()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            low = executor.submit(sync_upload, http, h2c_server, b"u=7")
+            high = executor.submit(sync_upload, http, h2c_server, b"u=0")
+
+            assert high.result() == b"0"
+            assert low.result() == b"1"
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import typing
+
+import pytest
+
+
+def imported_modules(code: str) -> typing.Set[str]:
+    """
+    Run `code` in a fresh interpreter, and return the modules it imported.
+    """
+    script = code + "\nimport sys; print('\\n'.join(sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return set(output.decode("ascii").split())
+
+
+def is_loaded(modules: typing.Set[str], package: str) -> bool:
+    return any(name == package or name.startswith(package + ".") for name in modules)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Requires module __getattr__")
+def test_import_is_lazy() -> None:
+    modules = imported_modules("import httpcore")
+    assert not is_loaded(modules, "httpcore._async")
+    assert not is_loaded(modules, "httpcore._sync")
+    assert not is_loaded(modules, "h11")
+    assert not is_loaded(modules, "h2")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Requires module __getattr__")
+def test_http2_is_not_imported_until_used() -> None:
+    modules = imported_modules(
+        "import httpcore; httpcore.AsyncConnectionPool; httpcore.SyncConnectionPool"
+    )
+    assert is_loaded(modules, "h11")
+    assert not is_loaded(modules, "h2")
+    assert not is_loaded(modules, "hpack")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Requires -X importtime")
+def test_import_time() -> None:
+    """
+    Benchmark the cost of `import httpcore` plus a connection pool class,
+    using the interpreter's own import timing.
+    """
+    code = "import httpcore; httpcore.AsyncConnectionPool"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.decode("ascii").splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                timings[name.strip()] = int(cumulative)
+
+    assert "httpcore" in timings
+    assert not any(name.startswith("h2") for name in timings), (
+        "import httpcore: %.1fms" % (timings["httpcore"] / 1000)
+    )
@@ -0,0 +1,46 @@
+from httpcore._latency import (
+    NUM_BUCKETS,
+    Histogram,
+    LatencyHistograms,
+    bucket_index,
+    bucket_range,
+)
+
+
+def test_bucket_layout() -> None:
+    for value in [0, 1, 127, 128, 255, 256, 1000, 123456, 2 ** 32 - 1]:
+        index = bucket_index(value)
+        low, high = bucket_range(index)
+        assert low <= value <= high
+        assert (high - low) <= max(1, value // 64)
+    assert bucket_index(2 ** 32 - 1) == NUM_BUCKETS - 1
+
+
+def test_histogram_percentiles() -> None:
+    histogram = Histogram()
+    assert histogram.percentile(99) == 0.0
+
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+
+    assert len(histogram) == 1000
+    assert abs(histogram.percentile(50) - 0.5) < 0.5 * 0.02
+    assert abs(histogram.percentile(99) - 0.99) < 0.99 * 0.02
+    assert histogram.percentile(100) == 1.0
+
+
+def test_histogram_merge() -> None:
+    first = LatencyHistograms()
+    second = LatencyHistograms()
+    origin = (b"http", b"example.org", 80)
+    first.record(origin, "total", 0.001)
+    second.record(origin, "total", 2.0)
+    second.record(origin, "connect", 0.5)
+
+    first.merge(second)
+
+    assert first.origins() == [origin]
+    assert len(first.get(origin)["total"]) == 2
+    assert first.percentile(origin, "total", 100) == 2.0
+    assert first.percentile(origin, "connect", 50) == 0.5
+    assert dict(first)[origin]["ttfb"].percentile(50) == 0.0
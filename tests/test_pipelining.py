@@ -0,0 +1,122 @@
+import asyncio
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import httpcore
+
+Origin = typing.Tuple[bytes, bytes, int]
+
+
+async def async_get(
+    http: httpcore.AsyncConnectionPool, origin: Origin, path: bytes
+) -> bytes:
+    headers = [(b"host", b"127.0.0.1")]
+    _, status_code, _, _, stream = await http.request(b"GET", origin + (path,), headers)
+    try:
+        assert status_code == 200
+        return b"".join([chunk async for chunk in stream])
+    finally:
+        await stream.aclose()
+
+
+def sync_get(http: httpcore.SyncConnectionPool, origin: Origin, path: bytes) -> bytes:
+    headers = [(b"host", b"127.0.0.1")]
+    _, status_code, _, _, stream = http.request(b"GET", origin + (path,), headers)
+    try:
+        assert status_code == 200
+        return b"".join([chunk for chunk in stream])
+    finally:
+        stream.close()
+
+
+def connections(http: typing.Any, origin: Origin) -> typing.Set[typing.Any]:
+    return http._connections.get(origin, set())
+
+
+@pytest.mark.asyncio
+async def test_async_pipelining(server: Origin) -> None:
+    async with httpcore.AsyncConnectionPool(pipelining=4) as http:
+        assert await async_get(http, server, b"/") == b"Hello, world!"
+        connection = list(connections(http, server))[0]
+
+        bodies = await asyncio.gather(
+            *[async_get(http, server, b"/") for _ in range(4)]
+        )
+
+        assert bodies == [b"Hello, world!"] * 4
+        assert connections(http, server) == {connection}
+        assert connection.state == httpcore._async.base.ConnectionState.IDLE
+
+
+@pytest.mark.asyncio
+async def test_async_pipelining_server_closes(server: Origin) -> None:
+    async with httpcore.AsyncConnectionPool(pipelining=4) as http:
+        assert await async_get(http, server, b"/") == b"Hello, world!"
+        connection = list(connections(http, server))[0]
+
+        # The server closes the connection after the first response, so the
+        # requests pipelined behind it must be resent on a new connection.
+        paths = [b"/close", b"/", b"/"]
+        bodies = await asyncio.gather(*[async_get(http, server, p) for p in paths])
+
+        assert bodies == [b"Hello, world!"] * 3
+        assert connection not in connections(http, server)
+
+
+@pytest.mark.asyncio
+async def test_async_no_pipelining_behind_post(server: Origin) -> None:
+    async with httpcore.AsyncConnectionPool(pipelining=4) as http:
+        headers = [(b"host", b"127.0.0.1"), (b"content-length", b"4")]
+        stream = httpcore.AsyncByteStream(iterator=async_iter([b"data"]))
+        _, status_code, _, _, post_stream = await http.request(
+            b"POST", server + (b"/",), headers, stream
+        )
+        assert status_code == 200
+
+        # The GET is not pipelined behind the POST, but uses a new connection.
+        assert await async_get(http, server, b"/") == b"Hello, world!"
+        assert len(connections(http, server)) == 2
+        await post_stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_pipelining_read_timeout(server: Origin) -> None:
+    async with httpcore.AsyncConnectionPool(pipelining=4) as http:
+        headers = [(b"host", b"127.0.0.1")]
+        url = server + (b"/",)
+        _, _, _, _, first_stream = await http.request(b"GET", url, headers)
+
+        # The earlier response is never closed, so the pipelined request
+        # times out waiting for its turn.
+        with pytest.raises(httpcore.ReadTimeout):
+            await http.request(b"GET", url, headers, timeout={"read": 0.1})
+        await first_stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_pipelining_profiler(server: Origin) -> None:
+    profiler = httpcore.Profiler()
+    async with httpcore.AsyncConnectionPool(pipelining=2, profiler=profiler) as http:
+        assert await async_get(http, server, b"/") == b"Hello, world!"
+
+    stats = profiler.stats()
+    assert stats["AsyncHTTP11PipelinedConnection._receive_event"]["calls"] >= 2
+
+
+async def async_iter(chunks: typing.List[bytes]) -> typing.AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+def test_sync_pipelining(server: Origin) -> None:
+    with httpcore.SyncConnectionPool(pipelining=4, max_connections=1) as http:
+        assert sync_get(http, server, b"/") == b"Hello, world!"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(sync_get, http, server, b"/") for _ in range(8)]
+            bodies = [future.result(timeout=10) for future in futures]
+
+        assert bodies == [b"Hello, world!"] * 8
+        assert len(connections(http, server)) == 1
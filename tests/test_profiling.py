@@ -0,0 +1,46 @@
+import pytest
+
+from httpcore._profiling import Profiler, get_default_profiler
+
+
+class Example:
+    def method(self) -> int:
+        return 1
+
+    async def async_method(self) -> int:
+        return 2
+
+
+def test_instrument_sync_method() -> None:
+    profiler = Profiler()
+    obj = Example()
+    profiler.instrument(obj, "method")
+
+    assert obj.method() == 1
+    assert obj.method() == 1
+    assert profiler.stats()["Example.method"]["calls"] == 2
+
+    profiler.reset()
+    assert profiler.stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_instrument_async_method() -> None:
+    profiler = Profiler()
+    obj = Example()
+    profiler.instrument(obj, "async_method", label="custom")
+
+    assert await obj.async_method() == 2
+    assert profiler.stats()["custom"]["calls"] == 1
+    assert profiler.summary().splitlines()[1].startswith("custom")
+
+
+def test_default_profiler(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("httpcore._profiling._default_profiler", None)
+    monkeypatch.delenv("HTTPCORE_PROFILE", raising=False)
+    assert get_default_profiler() is None
+
+    monkeypatch.setenv("HTTPCORE_PROFILE", "1")
+    profiler = get_default_profiler()
+    assert profiler is not None
+    assert get_default_profiler() is profiler
@@ -12,6 +12,7 @@ SUBS = [
     ('async for', 'for'),
     ('await ', ''),
     ('aclose', 'close'),
+    ('aread', 'read'),
     ('__aenter__', '__enter__'),
     ('__aexit__', '__exit__'),
     ('__aiter__', '__iter__'),